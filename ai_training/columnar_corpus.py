@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Columnar Behavior Training Corpus
+Stores training sessions column by column: one row per session with its scalar fields and
+metrics, and for each event stream one flat array per event field plus per-session offsets
+(the Arrow list layout). Written as zstd-compressed Parquet, one row group per batch, when
+pyarrow is installed, otherwise as a compressed NumPy .npz archive with the same columns.
+Training reads it straight into ColumnarEvents payloads, so features are extracted from the
+arrays without a dict ever being built per event.
+"""
+
+import os
+import sys
+from itertools import repeat
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scripts.behavior_features import ColumnarEvents
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: Parquet corpora
+    pa = pq = None
+
+PARQUET_EXTENSIONS = ('.parquet',)
+NPZ_EXTENSIONS = ('.npz',)
+COLUMNAR_EXTENSIONS = PARQUET_EXTENSIONS + NPZ_EXTENSIONS
+PARQUET_COMPRESSION = 'zstd'
+# Extension for columnar corpora written by default
+DEFAULT_COLUMNAR_EXTENSION = PARQUET_EXTENSIONS[0] if pq is not None else NPZ_EXTENSIONS[0]
+
+# Column types: f8 = float64, i8 = int64, bool, str. Timestamps and positions that some
+# generators emit as ints and others as floats are stored as float64.
+DTYPES = {'f8': np.float64, 'i8': np.int64, 'bool': np.bool_, 'str': np.str_}
+DEFAULTS = {'f8': 0.0, 'i8': 0, 'bool': False, 'str': ''}
+
+SESSION_FIELDS = (
+    ('userId', 'str'), ('timestamp', 'f8'), ('session_duration', 'i8'), ('label', 'str'),
+    ('trust_score', 'f8'), ('is_human', 'bool')
+)
+METRIC_FIELDS = (
+    ('mouse_velocity_variance', 'f8'), ('keystroke_interval_variance', 'f8'), ('mouse_jitter', 'f8'),
+    ('total_corrections', 'i8'), ('total_hesitations', 'i8'), ('focus_changes', 'i8'),
+    ('click_accuracy', 'f8'), ('typing_rhythm_consistency', 'f8')
+)
+STREAM_FIELDS = {
+    'mouse_movements': (('timestamp', 'f8'), ('x', 'f8'), ('y', 'f8'), ('velocity', 'f8'),
+                        ('acceleration', 'f8'), ('pressure', 'f8')),
+    'keystrokes': (('timestamp', 'f8'), ('key', 'str'), ('keyCode', 'i8'), ('interval', 'f8'),
+                   ('dwellTime', 'i8'), ('isCorrection', 'bool')),
+    # Stored as a list; sessions key it by fieldType
+    'form_interactions': (('focusTime', 'i8'), ('inputCount', 'i8'), ('corrections', 'i8'), ('hesitations', 'i8'),
+                          ('focusCount', 'i8'), ('fieldType', 'str'), ('completionTime', 'i8')),
+    'clicks': (('timestamp', 'i8'), ('x', 'f8'), ('y', 'f8'), ('accuracy', 'f8'), ('button', 'i8'),
+               ('pressure', 'f8')),
+    'scroll_events': (('timestamp', 'i8'), ('deltaY', 'i8'), ('deltaX', 'i8'), ('smoothness', 'f8')),
+    'window_events': (('type', 'str'), ('timestamp', 'i8')),
+    'suspicious_patterns': (('type', 'str'), ('severity', 'str')),
+}
+
+
+def is_columnar(path):
+    return path.endswith(COLUMNAR_EXTENSIONS)
+
+
+def _ranges(starts, lengths):
+    """Concatenated index ranges [start, start + length) for every (start, length)"""
+    ends = np.cumsum(lengths)
+    return np.repeat(starts - (ends - lengths), lengths) + np.arange(int(ends[-1]) if len(ends) else 0)
+
+
+def _records(names, columns):
+    """Event dicts from equal-length column arrays"""
+    columns = [column.tolist() for column in columns]
+    return list(map(dict, map(zip, repeat(names), zip(*columns))))
+
+
+def stream_events(stream, columns, counts):
+    """Per-session event dicts of one stream from its columns, typed by the corpus schema"""
+    schema = STREAM_FIELDS[stream]
+    records = _records([name for name, _ in schema],
+                       [np.asarray(columns[name], dtype=DTYPES[kind]) for name, kind in schema])
+    ends = np.cumsum(counts).tolist()
+    return [records[start:end] for start, end in zip([0] + ends[:-1], ends)]
+
+
+def _categories(values):
+    """(codes, distinct values) for ColumnarEvents categorical fields"""
+    distinct, codes = np.unique(values, return_inverse=True)
+    return codes.reshape(-1), distinct.tolist()
+
+
+class SessionColumns:
+    """A batch of training sessions held as columns.
+
+    fields maps session and 'metrics.<name>' fields to one value per session; streams maps
+    each event stream to ({field: values of every event}, offsets), where session i's events
+    are rows offsets[i]:offsets[i + 1].
+    """
+
+    def __init__(self, fields, streams):
+        self.fields = fields
+        self.streams = streams
+
+    def __len__(self):
+        return len(self.fields['label'])
+
+    @classmethod
+    def from_counts(cls, fields, streams):
+        """Build from {stream: (columns, events per session)}, casting every column to its schema type"""
+        fields = {name: np.asarray(fields[name], dtype=DTYPES[kind])
+                  for name, kind in SESSION_FIELDS + tuple((f"metrics.{m}", k) for m, k in METRIC_FIELDS)}
+        columns = {}
+        for stream, schema in STREAM_FIELDS.items():
+            values, counts = streams[stream]
+            offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+            columns[stream] = ({name: np.asarray(values[name], dtype=DTYPES[kind]) for name, kind in schema}, offsets)
+        return cls(fields, columns)
+
+    @classmethod
+    def from_sessions(cls, sessions):
+        """Columns of a list of session dicts (generate_training_data.py layout)"""
+        fields = {name: [session.get(name, DEFAULTS[kind]) for session in sessions] for name, kind in SESSION_FIELDS}
+        for name, kind in METRIC_FIELDS:
+            fields[f"metrics.{name}"] = [session.get('metrics', {}).get(name, DEFAULTS[kind]) for session in sessions]
+
+        streams = {}
+        for stream, schema in STREAM_FIELDS.items():
+            events = [session.get(stream, []) for session in sessions]
+            events = [list(e.values()) if isinstance(e, dict) else e for e in events]
+            values = {name: [event.get(name, DEFAULTS[kind]) for session_events in events for event in session_events]
+                      for name, kind in schema}
+            streams[stream] = (values, [len(session_events) for session_events in events])
+        return cls.from_counts(fields, streams)
+
+    @classmethod
+    def concat(cls, batches):
+        batches = list(batches)
+        fields = {name: np.concatenate([batch.fields[name] for batch in batches]) for name in batches[0].fields}
+        streams = {}
+        for stream in batches[0].streams:
+            columns = {name: np.concatenate([batch.streams[stream][0][name] for batch in batches])
+                       for name in batches[0].streams[stream][0]}
+            counts = np.concatenate([np.diff(batch.streams[stream][1]) for batch in batches])
+            streams[stream] = (columns, np.concatenate(([0], np.cumsum(counts))).astype(np.int64))
+        return cls(fields, streams)
+
+    def take(self, indices):
+        """Sessions at indices, in that order"""
+        indices = np.asarray(indices, dtype=np.intp)
+        streams = {}
+        for stream, (columns, offsets) in self.streams.items():
+            lengths = np.diff(offsets)[indices]
+            rows = _ranges(offsets[indices], lengths)
+            streams[stream] = ({name: values[rows] for name, values in columns.items()},
+                               np.concatenate(([0], np.cumsum(lengths))).astype(np.int64))
+        return SessionColumns({name: values[indices] for name, values in self.fields.items()}, streams)
+
+    def to_sessions(self):
+        """Session dicts in the generate_training_data.py layout"""
+        events = {stream: stream_events(stream, columns, np.diff(offsets))
+                  for stream, (columns, offsets) in self.streams.items()}
+        events['form_interactions'] = [{field['fieldType']: field for field in fields}
+                                       for fields in events['form_interactions']]
+        metric_names = [name for name, _ in METRIC_FIELDS]
+        metrics = _records(metric_names, [self.fields[f"metrics.{name}"] for name in metric_names])
+        fields = {name: values.tolist() for name, values in self.fields.items()}
+
+        return [{
+            'userId': fields['userId'][i],
+            'timestamp': fields['timestamp'][i],
+            'session_duration': fields['session_duration'][i],
+            'mouse_movements': events['mouse_movements'][i],
+            'keystrokes': events['keystrokes'][i],
+            'form_interactions': events['form_interactions'][i],
+            'clicks': events['clicks'][i],
+            'scroll_events': events['scroll_events'][i],
+            'window_events': events['window_events'][i],
+            'metrics': metrics[i],
+            'suspicious_patterns': events['suspicious_patterns'][i],
+            'label': fields['label'][i],
+            'trust_score': fields['trust_score'][i],
+            'is_human': fields['is_human'][i]
+        } for i in range(len(self))]
+
+    def payloads(self):
+        """Labelled /predict-ai payloads with ColumnarEvents streams (session_to_payload on columns).
+
+        Event streams are views into this batch's arrays; every payload carries its session's
+        'label', so train_behavior_model.extract_chunk can consume them like raw sessions.
+        """
+        mouse, mouse_offsets = self.streams['mouse_movements']
+        keys, key_offsets = self.streams['keystrokes']
+        clicks, click_offsets = self.streams['clicks']
+        forms, form_offsets = self.streams['form_interactions']
+        scrolls, scroll_offsets = self.streams['scroll_events']
+        windows, window_offsets = self.streams['window_events']
+
+        key_categories = _categories(keys['key'])
+        button_categories = _categories(clicks['button'])
+        interaction_types = _categories(np.where(forms['fieldType'] == 'message', 'textarea', 'input'))
+        form_columns = {
+            'focusTime': forms['focusTime'],
+            'dwellTime': forms['completionTime'] - forms['focusTime'],
+            'changeCount': forms['inputCount'],
+            'validationErrors': forms['corrections'],
+        }
+        session_ids = np.repeat(np.arange(len(self)), np.diff(scroll_offsets))
+        scroll_distance = np.bincount(session_ids, weights=np.abs(scrolls['deltaY']), minlength=len(self))
+        window_ids = np.repeat(np.arange(len(self)), np.diff(window_offsets))
+        focus_events = np.bincount(window_ids, weights=windows['type'] == 'focus', minlength=len(self))
+        blur_events = np.bincount(window_ids, weights=windows['type'] == 'blur', minlength=len(self))
+        suspicious = np.diff(self.streams['suspicious_patterns'][1])
+
+        def events(columns, offsets, i, categories=None):
+            rows = slice(offsets[i], offsets[i + 1])
+            return ColumnarEvents(
+                int(offsets[i + 1] - offsets[i]),
+                {name: values[rows] for name, values in columns.items()},
+                {name: (codes[rows], values) for name, (codes, values) in (categories or {}).items()}
+            )
+
+        fields = {name: values.tolist() for name, values in self.fields.items()}
+        for i in range(len(self)):
+            yield {
+                'mouseMovements': events({name: mouse[name] for name in ('velocity', 'acceleration', 'pressure')},
+                                         mouse_offsets, i),
+                'keystrokes': events({'timestamp': keys['timestamp']}, key_offsets, i, {'key': key_categories}),
+                'clicks': events({name: clicks[name] for name in ('timestamp', 'accuracy', 'pressure', 'x', 'y')},
+                                 click_offsets, i, {'button': button_categories}),
+                'formInteractions': events(form_columns, form_offsets, i, {'interactionType': interaction_types}),
+                'pageViewTime': fields['session_duration'][i],
+                'suspiciousPatternCount': int(suspicious[i]),
+                'scrollDistance': float(scroll_distance[i]),
+                'focusEvents': ColumnarEvents(int(focus_events[i])),
+                'blurEvents': ColumnarEvents(int(blur_events[i])),
+                'mouseJitter': fields['metrics.mouse_jitter'][i],
+                'clickAccuracy': fields['metrics.click_accuracy'][i],
+                'typingRhythm': fields['metrics.typing_rhythm_consistency'][i],
+                'label': fields['label'][i]
+            }
+
+    def to_arrow(self):
+        """pyarrow Table: scalar columns, a metrics struct column and a list<struct> column per stream"""
+        columns = {name: pa.array(self.fields[name]) for name, _ in SESSION_FIELDS}
+        columns['metrics'] = pa.StructArray.from_arrays(
+            [pa.array(self.fields[f"metrics.{name}"]) for name, _ in METRIC_FIELDS],
+            names=[name for name, _ in METRIC_FIELDS])
+        for stream, (values, offsets) in self.streams.items():
+            names = [name for name, _ in STREAM_FIELDS[stream]]
+            events = pa.StructArray.from_arrays([pa.array(values[name]) for name in names], names=names)
+            columns[stream] = pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), events)
+        return pa.table(columns)
+
+    @classmethod
+    def from_arrow(cls, table):
+        fields = {name: table.column(name).to_numpy() for name, _ in SESSION_FIELDS}
+        metrics = table.column('metrics').combine_chunks()
+        for name, _ in METRIC_FIELDS:
+            fields[f"metrics.{name}"] = metrics.field(name).to_numpy(zero_copy_only=False)
+
+        streams = {}
+        for stream, schema in STREAM_FIELDS.items():
+            events = table.column(stream).combine_chunks()
+            offsets = events.offsets.to_numpy()
+            values = events.flatten()
+            streams[stream] = ({name: values.field(name).to_numpy(zero_copy_only=False) for name, _ in schema},
+                               np.diff(offsets))
+        return cls.from_counts(fields, streams)
+
+    def to_npz(self):
+        """Arrays for np.savez: fields by name, stream columns as '<stream>.<field>' plus '<stream>.offsets'"""
+        arrays = dict(self.fields)
+        for stream, (values, offsets) in self.streams.items():
+            arrays[f"{stream}.offsets"] = offsets
+            arrays.update({f"{stream}.{name}": column for name, column in values.items()})
+        return arrays
+
+    @classmethod
+    def from_npz(cls, arrays):
+        fields = {name: arrays[name] for name in arrays if '.' not in name or name.startswith('metrics.')}
+        streams = {stream: ({name: arrays[f"{stream}.{name}"] for name, _ in schema}, np.diff(arrays[f"{stream}.offsets"]))
+                   for stream, schema in STREAM_FIELDS.items()}
+        return cls.from_counts(fields, streams)
+
+
+def write_columnar(batches, path):
+    """Write SessionColumns batches to a .parquet (one row group per batch) or .npz corpus; returns the session count"""
+    if path.endswith(PARQUET_EXTENSIONS):
+        if pq is None:
+            raise ImportError(f"Writing {path} requires pyarrow; use a .npz or .ndjson corpus instead")
+        count = 0
+        writer = None
+        try:
+            for batch in batches:
+                table = batch.to_arrow()
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression=PARQUET_COMPRESSION)
+                writer.write_table(table)
+                count += len(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+    # .npz archives are written in one go; the columns of a batch are far smaller than its dicts
+    batches = list(batches)
+    if not batches:
+        batches = [SessionColumns.from_sessions([])]
+    columns = SessionColumns.concat(batches)
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, **columns.to_npz())
+    return len(columns)
+
+
+def iter_columnar(path):
+    """Yield the SessionColumns batches of a columnar corpus (a row group at a time for Parquet)"""
+    if path.endswith(PARQUET_EXTENSIONS):
+        if pq is None:
+            raise ImportError(f"Reading {path} requires pyarrow")
+        parquet_file = pq.ParquetFile(path)
+        for row_group in range(parquet_file.num_row_groups):
+            yield SessionColumns.from_arrow(parquet_file.read_row_group(row_group))
+        return
+
+    with np.load(path) as arrays:
+        yield SessionColumns.from_npz({name: arrays[name] for name in arrays.files})
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Feature Matrix Cache
+Stores the feature matrix and labels extracted from a training corpus as .npy files, keyed
+by a hash of the corpus contents, FEATURE_SCHEMA_VERSION and the source of the extraction
+and corpus-reading code. Re-running training or CV experiments on the same corpus then skips extraction and
+memory-maps the cached matrix, and any change to the corpus or the extractor misses the
+cache instead of reusing stale features.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import scripts.behavior_features
+from scripts.behavior_features import FEATURE_SCHEMA_VERSION
+from ai_training import columnar_corpus, training_corpus
+from ai_training.training_corpus import is_sharded, read_manifest
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def _hash_file(digest, path):
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+
+
+def corpus_fingerprint(path):
+    """sha256 of a corpus file's bytes, or of a sharded corpus's shard files in manifest order"""
+    digest = hashlib.sha256()
+    if is_sharded(path):
+        for shard in read_manifest(path)['shards']:
+            digest.update(os.path.basename(shard['path']).encode())
+            _hash_file(digest, shard['path'])
+    else:
+        _hash_file(digest, path)
+    return digest.hexdigest()
+
+
+def extractor_fingerprint(*sources):
+    """sha256 of FEATURE_SCHEMA_VERSION and the source code of the shared feature extractor,
+    the corpus readers, the columnar payload mapping and any further modules/functions the
+    caller extracts with"""
+    digest = hashlib.sha256(f"schema-v{FEATURE_SCHEMA_VERSION}".encode())
+    for source in (scripts.behavior_features, training_corpus, columnar_corpus) + sources:
+        digest.update(inspect.getsource(source).encode())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Extracted (X, y) per corpus and extractor, as memory-mappable .npy files under cache_dir"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def key(self, corpus_path, extractor):
+        return hashlib.sha256(f"{corpus_fingerprint(corpus_path)}:{extractor}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:32])
+
+    def load(self, key):
+        """Cached (X, y) as read-only memory maps, or None"""
+        path = self._path(key)
+        if not os.path.exists(os.path.join(path, 'meta.json')):
+            return None
+        return (np.load(os.path.join(path, 'X.npy'), mmap_mode='r'),
+                np.load(os.path.join(path, 'y.npy'), mmap_mode='r'))
+
+    def store(self, key, X, y, **meta):
+        """Write (X, y) under key; the entry only becomes visible once complete"""
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(temp_path, exist_ok=True)
+        np.save(os.path.join(temp_path, 'X.npy'), X)
+        np.save(os.path.join(temp_path, 'y.npy'), y)
+        # meta.json marks the entry complete
+        with open(os.path.join(temp_path, 'meta.json'), 'w') as f:
+            json.dump(dict(meta, key=key, rows=len(X), feature_schema_version=FEATURE_SCHEMA_VERSION), f, indent=2)
+        try:
+            os.replace(temp_path, path)
+        except OSError:
+            # Another run stored the same entry first
+            shutil.rmtree(temp_path, ignore_errors=True)
+        return path
@@ -1,18 +1,97 @@
 #!/usr/bin/env python3
 """
 Behavior Data Generator for AI Training
-Generates realistic dummy data for training custom behavior detection model
+Generates realistic dummy data for training custom behavior detection model.
+Sessions are drawn a batch at a time as NumPy arrays from one seeded np.random.Generator,
+so no event is built in a per-event Python loop and a seed reproduces the same dataset.
+Batches are written to columnar corpora (columnar_corpus.py) without building a dict per
+event. Large corpora are generated as shards by a pool of worker processes, each with its own
+seed derived from the run's seed, and streamed straight to disk with a manifest.
 """
 
+import argparse
 import numpy as np
 import pandas as pd
-import json
-import random
-from datetime import datetime, timedelta
-import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai_training.columnar_corpus import DEFAULT_COLUMNAR_EXTENSION, SessionColumns, is_columnar, stream_events
+from ai_training.training_corpus import write_batches, write_manifest, write_sessions
+from ai_training.training_orchestrator import resolve_n_jobs
+
+# Sessions drawn per vectorized batch by generate_training_dataset
+BATCH_SIZE = 1000
+# Shards in a sharded corpus unless given; fixed so a seed means the same corpus on any host
+DEFAULT_SHARDS = 16
+
+HUMAN_TEXT_SAMPLES = (
+    "hello world this is a test message",
+    "user@example.com",
+    "John Smith",
+    "1234567890",
+    "Please enter your information here",
+    "The quick brown fox jumps over the lazy dog"
+)
+BOT_TEXT_SAMPLES = (
+    "bot_user_123",
+    "automated@test.com",
+    "Bot Name",
+    "1111111111"
+)
+PUNCTUATION = list('.,!?')
+FORM_FIELDS = ('name', 'email', 'phone', 'company', 'message')
+WINDOW_EVENT_TYPES = ('focus', 'blur', 'visibility_change')
+
+# Seeded generators date their sessions from here instead of the clock, so the seed alone fixes the output
+SEEDED_START_TIME = 1_700_000_000_000.0
+DAY_MS = 86_400_000
+
+
+def _session_ids(counts):
+    """Session index of every event, for events stored back to back per session"""
+    return np.repeat(np.arange(len(counts)), counts)
+
+
+def _segment_cumsum(values, counts):
+    """Running sum of values that restarts at each session"""
+    totals = np.concatenate(([0], np.cumsum(values)))
+    starts = np.cumsum(counts) - counts
+    return totals[1:] - np.repeat(totals[starts], counts)
+
+
+def _segment_std(values, ids, n, mask=None):
+    """Per-session population standard deviation (NaN for sessions with no values)"""
+    if mask is not None:
+        values, ids = values[mask], ids[mask]
+    counts = np.bincount(ids, minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.bincount(ids, weights=values, minlength=n) / counts
+        return np.sqrt(np.bincount(ids, weights=(values - means[ids]) ** 2, minlength=n) / counts)
+
+
+def _from_end(counts):
+    """1-based position of every event counted from the end of its session"""
+    starts = np.cumsum(counts) - counts
+    return np.repeat(starts + counts, counts) - np.arange(int(np.sum(counts)))
+
+
+def _columns_of(events, names):
+    """Column arrays and per-session counts for one session's event dicts (the batch engines' layout)"""
+    columns = {name: np.array([event.get(name, 0) for event in events], dtype=float) for name in names}
+    return columns, np.array([len(events)])
 
 class BehaviorDataGenerator:
-    def __init__(self):
+    def __init__(self, seed=None, start_time=None):
+        """seed: anything np.random.default_rng accepts; the same seed yields the same sessions"""
+        self.rng = np.random.default_rng(seed)
+        if start_time is None:
+            start_time = SEEDED_START_TIME if seed is not None else datetime.now().timestamp() * 1000
+        self.start_time = start_time
         self.human_patterns = self.define_human_patterns()
         self.bot_patterns = self.define_bot_patterns()
     
@@ -50,372 +129,384 @@ class BehaviorDataGenerator:
             'mouse_stops': (0, 3),  # Minimal pauses
         }
     
-    def generate_mouse_movements(self, is_human=True, duration=60000):
-        """Generate mouse movement data"""
-        patterns = self.human_patterns if is_human else self.bot_patterns
-        num_movements = random.randint(50, 500) if is_human else random.randint(20, 100)
+    def _mouse_columns(self, is_human, durations):
+        """Mouse movements for a batch of sessions: (columns, events per session)"""
+        rng = self.rng
+        counts = rng.integers(50, 501, len(durations)) if is_human else rng.integers(20, 101, len(durations))
+        total = int(counts.sum())
         
-        movements = []
-        current_time = 0
-        current_x, current_y = 500, 400  # Starting position
-        
-        for i in range(num_movements):
-            if is_human:
-                # Human: Natural curves, jitter, variable speed
-                angle = random.uniform(0, 2 * math.pi)
-                distance = random.uniform(5, 50)
-                jitter_x = random.gauss(0, patterns['mouse_jitter'][1]/4)
-                jitter_y = random.gauss(0, patterns['mouse_jitter'][1]/4)
-                
-                current_x += distance * math.cos(angle) + jitter_x
-                current_y += distance * math.sin(angle) + jitter_y
-                
-                # Variable timing
-                time_interval = max(10, random.gauss(50, 30))
-                velocity = distance / max(time_interval, 1) * 1000  # px/s
-                
-                # Random pauses (thinking/reading)
-                if random.random() < 0.05:
-                    time_interval += random.randint(500, 3000)
-            else:
-                # Bot: Linear movements, consistent timing
-                if i % 10 == 0:  # Change direction every 10 moves
-                    target_x = random.randint(100, 1820)
-                    target_y = random.randint(100, 980)
-                
-                # Move towards target in straight line
-                dx = target_x - current_x
-                dy = target_y - current_y
-                distance = math.sqrt(dx*dx + dy*dy)
-                
-                if distance > 0:
-                    step = min(20, distance)  # Fixed step size
-                    current_x += (dx / distance) * step
-                    current_y += (dy / distance) * step
-                
-                # Consistent timing
-                time_interval = random.randint(30, 80)
-                velocity = step / max(time_interval, 1) * 1000
+        if is_human:
+            # Human: Natural curves, jitter, variable speed
+            jitter = self.human_patterns['mouse_jitter'][1] / 4
+            angle = rng.uniform(0, 2 * np.pi, total)
+            distance = rng.uniform(5, 50, total)
+            x = 500 + _segment_cumsum(distance * np.cos(angle) + rng.normal(0, jitter, total), counts)
+            y = 400 + _segment_cumsum(distance * np.sin(angle) + rng.normal(0, jitter, total), counts)
+            
+            # Variable timing
+            interval = np.maximum(10, rng.normal(50, 30, total))
+            velocity = distance / np.maximum(interval, 1) * 1000  # px/s
             
-            current_time += time_interval
-            if current_time >= duration:
-                break
-                
-            movements.append({
-                'timestamp': current_time,
-                'x': max(0, min(1920, current_x)),
-                'y': max(0, min(1080, current_y)),
-                'velocity': velocity,
-                'acceleration': random.uniform(-10, 10) if is_human else random.uniform(-2, 2),
-                'pressure': random.uniform(0.3, 1.0) if is_human else random.uniform(0.8, 1.0),
-            })
+            # Random pauses (thinking/reading)
+            interval += (rng.random(total) < 0.05) * rng.integers(500, 3001, total)
+            acceleration = rng.uniform(-10, 10, total)
+            pressure = rng.uniform(0.3, 1.0, total)
+        else:
+            # Bot: Linear movements, consistent timing
+            x, y, step = self._bot_paths(counts)
+            interval = rng.integers(30, 81, total)
+            velocity = step / interval * 1000
+            acceleration = rng.uniform(-2, 2, total)
+            pressure = rng.uniform(0.8, 1.0, total)
+        
+        timestamp = _segment_cumsum(interval, counts)
+        keep = timestamp < np.repeat(durations, counts)
+        columns = {
+            'timestamp': timestamp,
+            'x': np.clip(x, 0, 1920),
+            'y': np.clip(y, 0, 1080),
+            'velocity': velocity,
+            'acceleration': acceleration,
+            'pressure': pressure,
+        }
+        return ({name: column[keep] for name, column in columns.items()},
+                np.bincount(_session_ids(counts)[keep], minlength=len(durations)))
+    
+    def _bot_paths(self, counts):
+        """Straight 20px steps towards a new target every 10 moves: (x, y, step length)"""
+        total = int(counts.sum())
+        x, y, step = np.empty(total), np.empty(total), np.empty(total)
+        starts = np.cumsum(counts) - counts
+        position = np.tile([500.0, 400.0], (len(counts), 1))  # Starting position
+        moves = np.arange(1, 11)
+        
+        # Sessions only depend on each other through the draws, so each 10-move leg is one array step
+        for first in range(0, int(counts.max(initial=0)), 10):
+            active = np.flatnonzero(counts > first)
+            n_moves = np.minimum(10, counts[active] - first)
+            target = np.column_stack([self.rng.integers(100, 1821, len(active)),
+                                      self.rng.integers(100, 981, len(active))])
+            delta = target - position[active]
+            distance = np.hypot(delta[:, 0], delta[:, 1])
+            direction = delta / np.maximum(distance, 1e-9)[:, None]
+            
+            travelled = np.minimum(20 * moves, distance[:, None])  # Fixed step size, stopping at the target
+            valid = moves <= n_moves[:, None]
+            index = (starts[active] + first)[:, None] + moves - 1
+            x[index[valid]] = (position[active, :1] + direction[:, :1] * travelled)[valid]
+            y[index[valid]] = (position[active, 1:] + direction[:, 1:] * travelled)[valid]
+            step[index[valid]] = np.diff(travelled, axis=1, prepend=0)[valid]
+            position[active] += direction * travelled[np.arange(len(active)), n_moves - 1][:, None]
+        
+        return x, y, step
+    
+    def _keystroke_columns(self, is_human, durations):
+        """Keystrokes for a batch of sessions: (columns, events per session)"""
+        rng = self.rng
+        n = len(durations)
+        samples = HUMAN_TEXT_SAMPLES if is_human else BOT_TEXT_SAMPLES
+        num_keystrokes = rng.integers(20, 201, n) if is_human else rng.integers(20, 101, n)
+        texts = [samples[i][:limit] for i, limit in zip(rng.integers(len(samples), size=n).tolist(),
+                                                         num_keystrokes.tolist())]
+        char_counts = np.array([len(text) for text in texts], dtype=np.int64)
+        chars = np.array(list(''.join(texts)), dtype='<U1')
+        total = len(chars)
         
-        return movements
+        if is_human:
+            # Human: Variable timing, pauses, corrections
+            base_interval = rng.normal(150, 80, total)
+            base_interval += (chars == ' ') * rng.integers(50, 301, total)
+            base_interval += np.isin(chars, PUNCTUATION) * rng.integers(100, 501, total)
+            base_interval += (rng.random(total) < 0.1) * rng.integers(1000, 5001, total)  # Long pauses
+            interval = np.maximum(50, base_interval)
+            dwell_time = rng.integers(50, 200, total, endpoint=True)
+            
+            # A corrected key is preceded by a Backspace taking its interval, then retyped after a pause
+            corrected = rng.random(total) < self.human_patterns['correction_rate'][1]
+            retype_interval = rng.integers(100, 301, total)
+            backspace_dwell = rng.integers(30, 101, total)
+            per_char = 1 + corrected
+            char_index = np.repeat(np.arange(total), per_char)
+            is_correction = np.zeros(len(char_index), dtype=bool)
+            is_correction[(np.cumsum(per_char) - per_char)[corrected]] = True
+            
+            retyped = corrected[char_index] & ~is_correction
+            event_interval = np.where(retyped, retype_interval[char_index], interval[char_index])
+            event_dwell = np.where(is_correction, backspace_dwell[char_index], dwell_time[char_index])
+            counts = np.bincount(np.repeat(_session_ids(char_counts), per_char), minlength=n)
+        else:
+            # Bot: Consistent timing, no corrections
+            char_index = np.arange(total)
+            is_correction = np.zeros(total, dtype=bool)
+            event_interval = rng.integers(50, 121, total)
+            event_dwell = rng.integers(30, 61, total)
+            counts = char_counts
+        
+        timestamp = _segment_cumsum(event_interval, counts)
+        keep = timestamp < np.repeat(durations, counts)
+        key_codes = np.frombuffer(chars.tobytes(), dtype=np.uint32).astype(np.int64)
+        columns = {
+            'timestamp': timestamp,
+            'key': np.where(is_correction, 'Backspace', chars[char_index]),
+            'keyCode': np.where(is_correction, 8, key_codes[char_index]),
+            'interval': event_interval,
+            'dwellTime': event_dwell,
+            'isCorrection': is_correction,
+        }
+        return ({name: column[keep] for name, column in columns.items()},
+                np.bincount(_session_ids(counts)[keep], minlength=n))
     
-    def generate_keystrokes(self, is_human=True, duration=60000):
-        """Generate keystroke data"""
+    def _form_columns(self, is_human, n):
+        """Form field interactions for a batch of sessions: (columns, fields per session)"""
+        rng = self.rng
         patterns = self.human_patterns if is_human else self.bot_patterns
-        num_keystrokes = random.randint(20, 200) if is_human else random.randint(20, 100)
-        
-        keystrokes = []
-        current_time = 0
-        
-        text_samples = [
-            "hello world this is a test message",
-            "user@example.com",
-            "John Smith",
-            "1234567890",
-            "Please enter your information here",
-            "The quick brown fox jumps over the lazy dog"
-        ] if is_human else [
-            "bot_user_123",
-            "automated@test.com", 
-            "Bot Name",
-            "1111111111"
-        ]
+        counts = rng.integers(2, 6, n) if is_human else rng.integers(1, 4, n)
+        total = int(counts.sum())
         
-        text = random.choice(text_samples)
+        # Each session uses the first fields of its own random ordering
+        order = np.argsort(rng.random((n, len(FORM_FIELDS))), axis=1)
+        fields = np.array(FORM_FIELDS)[order[np.arange(len(FORM_FIELDS)) < counts[:, None]]]
         
-        for i, char in enumerate(text[:num_keystrokes]):
-            if is_human:
-                # Human: Variable timing, pauses, corrections
-                base_interval = random.gauss(150, 80)
-                
-                # Add natural pauses
-                if char == ' ':
-                    base_interval += random.randint(50, 300)
-                elif char in '.,!?':
-                    base_interval += random.randint(100, 500)
-                
-                # Typing bursts and slowdowns
-                if random.random() < 0.1:  # 10% chance of long pause
-                    base_interval += random.randint(1000, 5000)
-                
-                interval = max(50, base_interval)
-                dwell_time = random.randint(50, 200)
-                
-                # Occasional corrections
-                if random.random() < patterns['correction_rate'][1]:
-                    # Add backspace
-                    current_time += interval
-                    keystrokes.append({
-                        'timestamp': current_time,
-                        'key': 'Backspace',
-                        'keyCode': 8,
-                        'interval': interval,
-                        'dwellTime': random.randint(30, 100),
-                        'isCorrection': True
-                    })
-                    interval = random.randint(100, 300)  # Pause after correction
-            else:
-                # Bot: Consistent timing, no corrections
-                interval = random.randint(50, 120)  # Very consistent
-                dwell_time = random.randint(30, 60)   # Consistent dwell
-            
-            current_time += interval
-            if current_time >= duration:
-                break
-                
-            keystrokes.append({
-                'timestamp': current_time,
-                'key': char,
-                'keyCode': ord(char) if len(char) == 1 else 0,
-                'interval': interval,
-                'dwellTime': dwell_time,
-                'isCorrection': False
-            })
+        focus_time = rng.integers(*patterns['form_field_time'], total, endpoint=True)
+        if is_human:
+            input_count = rng.integers(5, 51, total)
+            corrections = (input_count * rng.uniform(*patterns['correction_rate'], total)).astype(np.int64)
+            hesitations = rng.integers(*patterns['hesitation_patterns'], total, endpoint=True)
+            focus_count = rng.integers(1, 4, total)  # May refocus on field
+        else:
+            input_count = rng.integers(10, 31, total)
+            corrections = rng.integers(0, 2, total)
+            hesitations = np.zeros(total, dtype=np.int64)
+            focus_count = np.ones(total, dtype=np.int64)  # Single focus
         
-        return keystrokes
+        return {
+            'focusTime': focus_time,
+            'inputCount': input_count,
+            'corrections': corrections,
+            'hesitations': hesitations,
+            'focusCount': focus_count,
+            'fieldType': fields,
+            'completionTime': focus_time + rng.integers(0, 1001, total),
+        }, counts
     
-    def generate_form_interactions(self, is_human=True):
-        """Generate form interaction data"""
-        patterns = self.human_patterns if is_human else self.bot_patterns
+    def _click_columns(self, is_human, durations):
+        """Clicks for a batch of sessions, in time order: (columns, clicks per session)"""
+        rng = self.rng
+        counts = rng.integers(5, 21, len(durations)) if is_human else rng.integers(2, 9, len(durations))
+        total = int(counts.sum())
+        timestamp = rng.integers(0, np.repeat(durations, counts), endpoint=True)
         
-        form_fields = ['name', 'email', 'phone', 'company', 'message']
-        interactions = {}
+        if is_human:
+            # Human clicks have some inaccuracy
+            accuracy = rng.uniform(0.6, 0.95, total)
+            x = rng.integers(100, 1821, total) + rng.normal(0, 5, total)
+            y = rng.integers(100, 981, total) + rng.normal(0, 5, total)
+            pressure = rng.uniform(0.3, 1.0, total)
+        else:
+            # Bot clicks are very accurate
+            accuracy = rng.uniform(0.95, 1.0, total)
+            x = rng.integers(100, 1821, total)
+            y = rng.integers(100, 981, total)
+            pressure = np.ones(total)
         
-        num_fields = random.randint(2, 5) if is_human else random.randint(1, 3)
-        selected_fields = random.sample(form_fields, num_fields)
+        order = np.lexsort((timestamp, _session_ids(counts)))
+        return {
+            'timestamp': timestamp[order],
+            'x': x[order],
+            'y': y[order],
+            'accuracy': accuracy[order],
+            'button': np.zeros(total, dtype=np.int64),  # Left click
+            'pressure': pressure[order],
+        }, counts
+    
+    def _scroll_columns(self, is_human, durations):
+        """Scroll events for a batch of sessions, in time order: (columns, scrolls per session)"""
+        rng = self.rng
+        # Bots scroll less
+        counts = rng.integers(3, 16, len(durations)) if is_human else rng.integers(0, 6, len(durations))
+        total = int(counts.sum())
+        timestamp = rng.integers(0, np.repeat(durations, counts), endpoint=True)
         
-        for field in selected_fields:
-            if is_human:
-                focus_time = random.randint(*patterns['form_field_time'])
-                input_count = random.randint(5, 50)
-                corrections = int(input_count * random.uniform(*patterns['correction_rate']))
-                hesitations = random.randint(*patterns['hesitation_patterns'])
-                focus_count = random.randint(1, 3)  # May refocus on field
-            else:
-                focus_time = random.randint(*patterns['form_field_time'])
-                input_count = random.randint(10, 30)
-                corrections = random.randint(0, 1)
-                hesitations = 0
-                focus_count = 1  # Single focus
-            
-            interactions[field] = {
-                'focusTime': focus_time,
-                'inputCount': input_count,
-                'corrections': corrections,
-                'hesitations': hesitations,
-                'focusCount': focus_count,
-                'fieldType': field,
-                'completionTime': focus_time + random.randint(0, 1000)
-            }
+        if is_human:
+            # Human scrolling is variable
+            delta_y = rng.integers(50, 201, total) * rng.choice([-1, 1], total)
+            delta_x = rng.integers(-10, 11, total)
+            smoothness = rng.uniform(0.4, 0.8, total)
+        else:
+            # Bot scrolling is consistent
+            delta_y = rng.choice([100, -100, 120, -120], total)
+            delta_x = np.zeros(total, dtype=np.int64)
+            smoothness = rng.uniform(0.9, 1.0, total)
         
-        return interactions
+        order = np.lexsort((timestamp, _session_ids(counts)))
+        return {
+            'timestamp': timestamp[order],
+            'deltaY': delta_y[order],
+            'deltaX': delta_x[order],
+            'smoothness': smoothness[order],
+        }, counts
+    
+    def _window_columns(self, is_human, n):
+        """Window focus events for a batch of sessions, in time order: (columns, events per session)"""
+        counts = self.rng.integers(1, 6, n) if is_human else self.rng.integers(0, 3, n)
+        total = int(counts.sum())
+        event_type = self.rng.choice(WINDOW_EVENT_TYPES, total)
+        timestamp = self.rng.integers(0, 60001, total)
+        order = np.lexsort((timestamp, _session_ids(counts)))
+        return {'type': event_type[order], 'timestamp': timestamp[order]}, counts
+    
+    def _suspicious_patterns(self, mouse, mouse_counts, keys, key_counts):
+        """Bot suspicious patterns for a batch of sessions, from the mouse and keystroke columns"""
+        n = len(mouse_counts)
+        mouse_ids, key_ids = _session_ids(mouse_counts), _session_ids(key_counts)
+        with np.errstate(invalid='ignore'):
+            # Mouse linearity and keystroke regularity over the last 10 events
+            consistent_velocity = (mouse_counts > 10) & (
+                _segment_std(mouse['velocity'], mouse_ids, n, _from_end(mouse_counts) <= 10) < 5)
+            regular_typing = (key_counts > 5) & (
+                _segment_std(keys['interval'], key_ids, n, _from_end(key_counts) <= 10) < 20)
+            no_corrections = (key_counts > 20) & (
+                np.bincount(key_ids, weights=keys['isCorrection'], minlength=n) == 0)
+            # Mouse precision
+            low_jitter = (mouse_counts > 0) & (_segment_std(mouse['acceleration'], mouse_ids, n) < 2)
+        
+        checks = np.column_stack([consistent_velocity, regular_typing, no_corrections, low_jitter])
+        sessions, kinds = np.nonzero(checks)
+        return {
+            'type': np.array(['consistent_velocity', 'regular_typing', 'no_corrections', 'low_jitter'])[kinds],
+            'severity': np.array(['high', 'high', 'medium', 'medium'])[kinds],
+        }, np.bincount(sessions, minlength=n)
+    
+    def generate_mouse_movements(self, is_human=True, duration=60000):
+        """Generate mouse movement data"""
+        return stream_events('mouse_movements', *self._mouse_columns(is_human, np.array([duration])))[0]
+    
+    def generate_keystrokes(self, is_human=True, duration=60000):
+        """Generate keystroke data"""
+        return stream_events('keystrokes', *self._keystroke_columns(is_human, np.array([duration])))[0]
+    
+    def generate_form_interactions(self, is_human=True):
+        """Generate form interaction data"""
+        fields = stream_events('form_interactions', *self._form_columns(is_human, 1))[0]
+        return {field['fieldType']: field for field in fields}
     
     def calculate_suspicious_patterns(self, session_data, is_human=True):
         """Calculate suspicious patterns based on behavior"""
-        patterns = []
-        
-        mouse_movements = session_data.get('mouse_movements', [])
-        keystrokes = session_data.get('keystrokes', [])
-        
-        if not is_human:
-            # Add bot-specific suspicious patterns
-            
-            # Check mouse linearity
-            if len(mouse_movements) > 10:
-                velocities = [m['velocity'] for m in mouse_movements[-10:]]
-                if np.std(velocities) < 5:
-                    patterns.append({'type': 'consistent_velocity', 'severity': 'high'})
-            
-            # Check keystroke regularity
-            if len(keystrokes) > 5:
-                intervals = [k['interval'] for k in keystrokes[-10:] if 'interval' in k]
-                if intervals and np.std(intervals) < 20:
-                    patterns.append({'type': 'regular_typing', 'severity': 'high'})
-            
-            # Check for lack of corrections
-            corrections = sum(1 for k in keystrokes if k.get('isCorrection', False))
-            if len(keystrokes) > 20 and corrections == 0:
-                patterns.append({'type': 'no_corrections', 'severity': 'medium'})
-            
-            # Check mouse precision
-            if mouse_movements:
-                jitter = np.std([m.get('acceleration', 0) for m in mouse_movements])
-                if jitter < 2:
-                    patterns.append({'type': 'low_jitter', 'severity': 'medium'})
-        
-        return patterns
+        if is_human:
+            return []
+        mouse, mouse_counts = _columns_of(session_data.get('mouse_movements', []), ('velocity', 'acceleration'))
+        keys, key_counts = _columns_of(session_data.get('keystrokes', []), ('interval', 'isCorrection'))
+        return stream_events('suspicious_patterns', *self._suspicious_patterns(mouse, mouse_counts, keys, key_counts))[0]
     
-    def generate_session(self, is_human=True):
-        """Generate complete behavior session"""
+    def generate_columns(self, n, is_human=True):
+        """Generate n complete behavior sessions of one class as a single vectorized batch of columns"""
+        rng = self.rng
         patterns = self.human_patterns if is_human else self.bot_patterns
+        label = 'human' if is_human else 'bot'
         
         # Session metadata
-        session_duration = random.randint(*patterns['session_duration'])
-        start_time = datetime.now().timestamp() * 1000
+        durations = rng.integers(*patterns['session_duration'], n, endpoint=True)
+        start_times = self.start_time + rng.uniform(0, DAY_MS, n)
+        user_suffixes = rng.integers(1000, 9999, n, endpoint=True)
         
         # Generate behavior data
-        mouse_movements = self.generate_mouse_movements(is_human, session_duration)
-        keystrokes = self.generate_keystrokes(is_human, session_duration)
-        form_interactions = self.generate_form_interactions(is_human)
-        
-        # Basic metrics
-        mouse_velocities = [m['velocity'] for m in mouse_movements if 'velocity' in m]
-        keystroke_intervals = [k['interval'] for k in keystrokes if 'interval' in k]
-        
-        session_data = {
-            'session_duration': session_duration,
-            'mouse_movements': mouse_movements,
-            'keystrokes': keystrokes,
-            'form_interactions': form_interactions,
-            'clicks': self.generate_clicks(is_human, session_duration),
-            'scroll_events': self.generate_scrolls(is_human, session_duration),
-            'window_events': self.generate_window_events(is_human),
+        streams = {
+            'mouse_movements': self._mouse_columns(is_human, durations),
+            'keystrokes': self._keystroke_columns(is_human, durations),
+            'form_interactions': self._form_columns(is_human, n),
+            'clicks': self._click_columns(is_human, durations),
+            'scroll_events': self._scroll_columns(is_human, durations),
+            'window_events': self._window_columns(is_human, n),
         }
+        (mouse, mouse_counts), (keys, key_counts), (forms, form_counts) = (
+            streams['mouse_movements'], streams['keystrokes'], streams['form_interactions'])
         
         # Calculate metrics
-        metrics = {
-            'mouse_velocity_variance': np.var(mouse_velocities) if mouse_velocities else 0,
-            'keystroke_interval_variance': np.var(keystroke_intervals) if keystroke_intervals else 0,
-            'mouse_jitter': np.std([m.get('acceleration', 0) for m in mouse_movements]),
-            'total_corrections': sum(1 for k in keystrokes if k.get('isCorrection', False)),
-            'total_hesitations': sum(f.get('hesitations', 0) for f in form_interactions.values()),
-            'focus_changes': sum(f.get('focusCount', 1) for f in form_interactions.values()),
-            'click_accuracy': random.uniform(*patterns['click_accuracy']),
-            'typing_rhythm_consistency': random.uniform(*patterns['typing_rhythm_consistency']),
+        mouse_ids, key_ids, form_ids = (_session_ids(mouse_counts), _session_ids(key_counts),
+                                        _session_ids(form_counts))
+        with np.errstate(invalid='ignore'):
+            velocity_std = _segment_std(mouse['velocity'], mouse_ids, n)
+            interval_std = _segment_std(keys['interval'], key_ids, n)
+            mouse_jitter = _segment_std(mouse['acceleration'], mouse_ids, n)
+        fields = {
+            'metrics.mouse_velocity_variance': np.where(mouse_counts > 0, velocity_std ** 2, 0),
+            'metrics.keystroke_interval_variance': np.where(key_counts > 0, interval_std ** 2, 0),
+            'metrics.mouse_jitter': mouse_jitter,
+            'metrics.total_corrections': np.bincount(key_ids, weights=keys['isCorrection'], minlength=n),
+            'metrics.total_hesitations': np.bincount(form_ids, weights=forms['hesitations'], minlength=n),
+            'metrics.focus_changes': np.bincount(form_ids, weights=forms['focusCount'], minlength=n),
+            'metrics.click_accuracy': rng.uniform(*patterns['click_accuracy'], n),
+            'metrics.typing_rhythm_consistency': rng.uniform(*patterns['typing_rhythm_consistency'], n),
         }
         
         # Calculate suspicious patterns
-        suspicious_patterns = self.calculate_suspicious_patterns(session_data, is_human)
-        
-        # Generate trust score
         if is_human:
-            trust_score = random.uniform(60, 100)  # Humans get higher scores
+            streams['suspicious_patterns'] = ({'type': [], 'severity': []}, np.zeros(n, dtype=np.int64))
         else:
-            trust_score = random.uniform(0, 45)    # Bots get lower scores
-        
-        return {
-            'userId': f"{'human' if is_human else 'bot'}_{int(start_time)}_{random.randint(1000, 9999)}",
-            'timestamp': start_time,
-            'session_duration': session_duration,
-            'mouse_movements': mouse_movements,
-            'keystrokes': keystrokes,
-            'form_interactions': form_interactions,
-            'clicks': session_data['clicks'],
-            'scroll_events': session_data['scroll_events'],
-            'window_events': session_data['window_events'],
-            'metrics': metrics,
-            'suspicious_patterns': suspicious_patterns,
-            'label': 'human' if is_human else 'bot',
-            'trust_score': trust_score,
-            'is_human': is_human
-        }
+            streams['suspicious_patterns'] = self._suspicious_patterns(mouse, mouse_counts, keys, key_counts)
+        
+        # Generate trust score: humans get higher scores, bots lower
+        trust_scores = rng.uniform(60, 100, n) if is_human else rng.uniform(0, 45, n)
+        
+        fields.update({
+            'userId': [f"{label}_{int(start_time)}_{suffix}"
+                       for start_time, suffix in zip(start_times.tolist(), user_suffixes.tolist())],
+            'timestamp': start_times,
+            'session_duration': durations,
+            'label': np.full(n, label),
+            'trust_score': trust_scores,
+            'is_human': np.full(n, is_human),
+        })
+        return SessionColumns.from_counts(fields, streams)
+    
+    def generate_sessions(self, n, is_human=True):
+        """Generate n complete behavior sessions of one class"""
+        return self.generate_columns(n, is_human).to_sessions()
+    
+    def generate_session(self, is_human=True):
+        """Generate complete behavior session"""
+        return self.generate_sessions(1, is_human)[0]
     
     def generate_clicks(self, is_human=True, duration=60000):
         """Generate click events"""
-        num_clicks = random.randint(5, 20) if is_human else random.randint(2, 8)
-        clicks = []
-        
-        for i in range(num_clicks):
-            timestamp = random.randint(0, duration)
-            
-            if is_human:
-                # Human clicks have some inaccuracy
-                accuracy = random.uniform(0.6, 0.95)
-                x = random.randint(100, 1820) + random.gauss(0, 5)
-                y = random.randint(100, 980) + random.gauss(0, 5)
-            else:
-                # Bot clicks are very accurate
-                accuracy = random.uniform(0.95, 1.0)
-                x = random.randint(100, 1820)
-                y = random.randint(100, 980)
-            
-            clicks.append({
-                'timestamp': timestamp,
-                'x': x,
-                'y': y,
-                'accuracy': accuracy,
-                'button': 0,  # Left click
-                'pressure': random.uniform(0.3, 1.0) if is_human else 1.0
-            })
-        
-        return sorted(clicks, key=lambda x: x['timestamp'])
+        return stream_events('clicks', *self._click_columns(is_human, np.array([duration])))[0]
     
     def generate_scrolls(self, is_human=True, duration=60000):
         """Generate scroll events"""
-        if is_human:
-            num_scrolls = random.randint(3, 15)
-        else:
-            num_scrolls = random.randint(0, 5)  # Bots scroll less
-        
-        scrolls = []
-        for i in range(num_scrolls):
-            timestamp = random.randint(0, duration)
-            
-            if is_human:
-                # Human scrolling is variable
-                deltaY = random.randint(50, 200) * random.choice([-1, 1])
-                smoothness = random.uniform(0.4, 0.8)
-            else:
-                # Bot scrolling is consistent
-                deltaY = random.choice([100, -100, 120, -120])
-                smoothness = random.uniform(0.9, 1.0)
-            
-            scrolls.append({
-                'timestamp': timestamp,
-                'deltaY': deltaY,
-                'deltaX': random.randint(-10, 10) if is_human else 0,
-                'smoothness': smoothness
-            })
-        
-        return sorted(scrolls, key=lambda x: x['timestamp'])
+        return stream_events('scroll_events', *self._scroll_columns(is_human, np.array([duration])))[0]
     
     def generate_window_events(self, is_human=True):
         """Generate window focus events"""
-        if is_human:
-            num_events = random.randint(1, 5)
-        else:
-            num_events = random.randint(0, 2)
-        
-        events = []
-        for i in range(num_events):
-            events.append({
-                'type': random.choice(['focus', 'blur', 'visibility_change']),
-                'timestamp': random.randint(0, 60000)
-            })
-        
-        return sorted(events, key=lambda x: x['timestamp'])
+        return stream_events('window_events', *self._window_columns(is_human, 1))[0]
+    
+    def iter_column_batches(self, human_samples, bot_samples, batch_size=BATCH_SIZE):
+        """Yield shuffled SessionColumns batches of at most batch_size sessions with humans and bots
+        mixed in proportion, so a corpus can be written out without ever holding all of it"""
+        total = human_samples + bot_samples
+        for start in range(0, total, batch_size):
+            end = min(start + batch_size, total)
+            humans = human_samples * end // total - human_samples * start // total
+            batch = SessionColumns.concat([self.generate_columns(humans, True),
+                                           self.generate_columns(end - start - humans, False)])
+            yield batch.take(self.rng.permutation(len(batch)))
+    
+    def iter_batches(self, human_samples, bot_samples, batch_size=BATCH_SIZE):
+        """Yield iter_column_batches as lists of session dicts"""
+        for batch in self.iter_column_batches(human_samples, bot_samples, batch_size):
+            yield batch.to_sessions()
     
-    def generate_training_dataset(self, human_samples=1000, bot_samples=1000):
+    def generate_training_dataset(self, human_samples=1000, bot_samples=1000, batch_size=BATCH_SIZE):
         """Generate balanced training dataset"""
         dataset = []
         
-        print(f"🤖 Generating {human_samples} human samples...")
-        for i in range(human_samples):
-            if i % 100 == 0:
-                print(f"  Progress: {i}/{human_samples}")
-            dataset.append(self.generate_session(is_human=True))
-        
-        print(f"🤖 Generating {bot_samples} bot samples...")
-        for i in range(bot_samples):
-            if i % 100 == 0:
-                print(f"  Progress: {i}/{bot_samples}")
-            dataset.append(self.generate_session(is_human=False))
+        for is_human, samples in ((True, human_samples), (False, bot_samples)):
+            print(f"🤖 Generating {samples} {'human' if is_human else 'bot'} samples...")
+            for start in range(0, samples, batch_size):
+                print(f"  Progress: {start}/{samples}")
+                dataset.extend(self.generate_sessions(min(batch_size, samples - start), is_human))
         
         # Shuffle dataset
-        random.shuffle(dataset)
+        dataset = [dataset[i] for i in self.rng.permutation(len(dataset))]
         
         print(f"✅ Generated {len(dataset)} training samples")
         print(f"📊 Humans: {sum(1 for d in dataset if d['label'] == 'human')}")
@@ -423,21 +514,122 @@ class BehaviorDataGenerator:
         
         return dataset
 
+def _split_count(total, parts):
+    """total split into parts near-equal counts"""
+    return [total // parts + (i < total % parts) for i in range(parts)]
+
+
+def _generate_shard(path, human_samples, bot_samples, seed, batch_size):
+    """Generate one shard straight to its file (runs in a worker); returns its manifest entry"""
+    started = time.perf_counter()
+    generator = BehaviorDataGenerator(seed=seed)
+    humans = 0
+    
+    def batches():
+        nonlocal humans
+        for batch in generator.iter_column_batches(human_samples, bot_samples, batch_size):
+            humans += int(batch.fields['is_human'].sum())
+            yield batch
+    
+    count = write_batches(batches(), path)
+    return {
+        'path': path,
+        'sessions': count,
+        'humans': humans,
+        'bots': count - humans,
+        'seed': {'entropy': seed.entropy, 'spawn_key': list(seed.spawn_key)},
+        'seconds': time.perf_counter() - started
+    }
+
+
+def generate_shards(directory, human_samples, bot_samples, shards=None, n_jobs=-1, seed=None,
+                    batch_size=BATCH_SIZE, extension=DEFAULT_COLUMNAR_EXTENSION):
+    """Generate a sharded corpus in directory and return its manifest.
+    
+    Shards are written in the format of extension ('.parquet', '.npz' or '.ndjson').
+    Every shard gets its own seed spawned from seed (np.random.SeedSequence), so the corpus
+    depends only on the seed and shard count, not on how many workers wrote it. The shard
+    count defaults to DEFAULT_SHARDS whatever the CPU count; each worker holds at most one
+    batch of sessions in memory.
+    """
+    workers = resolve_n_jobs(n_jobs)
+    shards = shards or DEFAULT_SHARDS
+    seed_sequence = np.random.SeedSequence(seed)
+    os.makedirs(directory, exist_ok=True)
+    
+    tasks = [
+        (os.path.join(directory, f"shard-{i:05d}{extension}"), humans, bots, shard_seed, batch_size)
+        for i, (humans, bots, shard_seed) in enumerate(zip(
+            _split_count(human_samples, shards), _split_count(bot_samples, shards), seed_sequence.spawn(shards)))
+    ]
+    started = time.perf_counter()
+    if workers == 1:
+        entries = [_generate_shard(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, shards)) as pool:
+            entries = list(pool.map(_generate_shard, *zip(*tasks)))
+    
+    total = sum(entry['sessions'] for entry in entries)
+    humans = sum(entry['humans'] for entry in entries)
+    manifest = {
+        'format': extension.lstrip('.'),
+        'seed': seed_sequence.entropy,
+        'sessions': total,
+        'humans': humans,
+        'bots': total - humans,
+        'human_ratio': humans / total if total else 0.0,
+        'workers': min(workers, shards),
+        'seconds': time.perf_counter() - started,
+        'shards': entries
+    }
+    # Written last, so a directory only reads as a corpus once every shard is complete
+    write_manifest(manifest, directory)
+    return manifest
+
+
 def main():
     """Generate training dataset"""
-    generator = BehaviorDataGenerator()
+    parser = argparse.ArgumentParser(description="Generate behavior training sessions")
+    parser.add_argument('--humans', type=int, default=2000, help="Human sessions to generate")
+    parser.add_argument('--bots', type=int, default=2000, help="Bot sessions to generate")
+    parser.add_argument('--seed', type=int, default=os.environ.get('BEHAVIOR_DATA_SEED'),
+                        help="Random seed; the same seed reproduces the same dataset (env BEHAVIOR_DATA_SEED)")
+    parser.add_argument('--shards', type=int, default=0,
+                        help="Write a sharded corpus directory with this many shards (0 = one file)")
+    parser.add_argument('--jobs', type=int, default=int(os.environ.get('BEHAVIOR_DATA_JOBS', -1)),
+                        help="Worker processes for sharded generation (-1 = all cores, env BEHAVIOR_DATA_JOBS)")
+    parser.add_argument('--output', help="Corpus path (.parquet, .npz, .ndjson or .json), or directory with --shards")
+    parser.add_argument('--shard-format', choices=['parquet', 'npz', 'ndjson'],
+                        default=DEFAULT_COLUMNAR_EXTENSION.lstrip('.'), help="File format of each shard")
+    args = parser.parse_args()
     
     # Generate large dataset
     print("🚀 Starting behavior data generation...")
+    if args.shards:
+        output_dir = args.output or 'behavior_training_data'
+        manifest = generate_shards(output_dir, args.humans, args.bots, shards=args.shards,
+                                   n_jobs=args.jobs, seed=args.seed, extension=f".{args.shard_format}")
+        print(f"💾 {manifest['sessions']:,} sessions in {len(manifest['shards'])} shards "
+              f"({manifest['workers']} workers, {manifest['seconds']:.1f}s) saved to {output_dir}")
+        print(f"📊 Humans: {manifest['humans']:,}  🤖 Bots: {manifest['bots']:,}  "
+              f"(human ratio {manifest['human_ratio']:.3f}), seed {manifest['seed']}")
+        return
+    
+    generator = BehaviorDataGenerator(seed=args.seed)
+    output_file = args.output or f"behavior_training_data{DEFAULT_COLUMNAR_EXTENSION}"
+    if is_columnar(output_file):
+        # Columnar corpora are written batch by batch, straight from the generator's arrays
+        count = write_batches(generator.iter_column_batches(args.humans, args.bots), output_file)
+        print(f"💾 {count:,} sessions saved to {output_file} ({os.path.getsize(output_file) / 1e6:.1f} MB)")
+        return
+    
     training_data = generator.generate_training_dataset(
-        human_samples=2000, 
-        bot_samples=2000
+        human_samples=args.humans, 
+        bot_samples=args.bots
     )
     
-    # Save to file
-    output_file = 'behavior_training_data.json'
-    with open(output_file, 'w') as f:
-        json.dump(training_data, f, indent=2)
+    # Save to file, one session per line so training can stream it
+    write_sessions(training_data, output_file)
     
     print(f"💾 Dataset saved to {output_file}")
     
@@ -6,313 +6,167 @@ Trains AI model to detect bot vs human behavior
 
 import numpy as np
 import pandas as pd
-import json
+import argparse
+import os
 import pickle
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.neural_network import MLPClassifier
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, roc_curve
-from sklearn.model_selection import cross_val_score
 import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scripts.behavior_features import (
+    FEATURE_COUNT, FEATURE_NAMES, FEATURE_SCHEMA_VERSION, extract_features, session_to_payload
+)
+from scripts.candidate_models import LATENCY_KEY, measure_latency, print_comparison, select_candidate
+from scripts.model_artifact import export_serving_artifact, serving_predictor
+from ai_training.feature_cache import FeatureCache, extractor_fingerprint
+from ai_training.training_corpus import find_corpus, iter_chunks, iter_training_samples
+from ai_training.training_orchestrator import TrainingOrchestrator, resolve_n_jobs
+
+def _grow(array, capacity):
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+def extract_chunk(sessions):
+    """Extract one chunk of sessions in a worker process.
+    
+    Returns (float32 features, labels, extracted mask, [(offset, error)]) so a bad
+    sample is skipped without failing the chunk.
+    """
+    features = np.zeros((len(sessions), FEATURE_COUNT), dtype=np.float32)
+    labels = np.zeros(len(sessions), dtype=np.int64)
+    extracted = np.zeros(len(sessions), dtype=bool)
+    errors = []
+    
+    for i, session in enumerate(sessions):
+        try:
+            features[i] = extract_features(session_to_payload(session))
+            labels[i] = 1 if session['label'] == 'human' else 0  # 1 = human, 0 = bot
+            extracted[i] = True
+        except Exception as e:
+            errors.append((i, str(e)))
+    
+    return features, labels, extracted, errors
+
 class BehaviorClassifier:
-    def __init__(self):
+    def __init__(self, n_jobs=None, chunk_size=256, cache_dir=None, latency_budget_ms=None):
+        # CPU budget for feature extraction and model training (-1 = all cores), sessions per
+        # extraction task, and where fitted fold models and extracted features are cached (None = no cache)
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.cache_dir = cache_dir
+        # Max p99 single-row serving latency a selected model may have (None = no budget)
+        self.latency_budget_ms = latency_budget_ms
+        self.latency = {}
+        self.candidate_results = {}
         self.models = {}
         self.scaler = StandardScaler()
-        self.feature_names = []
+        self.feature_names = list(FEATURE_NAMES)
+        self.feature_schema_version = FEATURE_SCHEMA_VERSION
         self.best_model = None
         self.best_model_name = ""
         self.feature_importance = {}
     
     def extract_features(self, session_data):
-        """Extract numerical features from behavior session"""
-        features = []
-        
-        # Basic session metrics
-        features.extend([
-            session_data.get('session_duration', 0) / 1000,  # Convert to seconds
-            len(session_data.get('mouse_movements', [])),
-            len(session_data.get('keystrokes', [])),
-            len(session_data.get('clicks', [])),
-            len(session_data.get('scroll_events', [])),
-            len(session_data.get('window_events', [])),
-            len(session_data.get('suspicious_patterns', [])),
-        ])
-        
-        # Mouse behavior features
-        mouse_data = session_data.get('mouse_movements', [])
-        if mouse_data:
-            velocities = [m.get('velocity', 0) for m in mouse_data if 'velocity' in m]
-            accelerations = [m.get('acceleration', 0) for m in mouse_data if 'acceleration' in m]
-            
-            if velocities:
-                features.extend([
-                    np.mean(velocities),
-                    np.std(velocities),
-                    np.min(velocities),
-                    np.max(velocities),
-                    np.median(velocities),
-                ])
-            else:
-                features.extend([0, 0, 0, 0, 0])
-            
-            if accelerations:
-                features.extend([
-                    np.mean(np.abs(accelerations)),  # Mean absolute acceleration
-                    np.std(accelerations),           # Acceleration variance
-                    len([a for a in accelerations if abs(a) < 1]),  # Low acceleration count
-                ])
-            else:
-                features.extend([0, 0, 0])
-            
-            # Mouse movement patterns
-            if len(mouse_data) > 1:
-                distances = []
-                for i in range(1, len(mouse_data)):
-                    dx = mouse_data[i]['x'] - mouse_data[i-1]['x']
-                    dy = mouse_data[i]['y'] - mouse_data[i-1]['y']
-                    distances.append(np.sqrt(dx*dx + dy*dy))
-                
-                features.extend([
-                    np.sum(distances),      # Total distance
-                    np.mean(distances) if distances else 0,     # Average step
-                    np.std(distances) if len(distances) > 1 else 0,   # Step variance
-                ])
-            else:
-                features.extend([0, 0, 0])
-        else:
-            features.extend([0] * 11)  # 11 mouse features
-        
-        # Keystroke behavior features
-        keystroke_data = session_data.get('keystrokes', [])
-        if keystroke_data:
-            intervals = [k.get('interval', 0) for k in keystroke_data if k.get('interval', 0) > 0]
-            dwell_times = [k.get('dwellTime', 0) for k in keystroke_data if 'dwellTime' in k]
-            corrections = [k for k in keystroke_data if k.get('isCorrection', False)]
-            
-            if intervals:
-                features.extend([
-                    np.mean(intervals),
-                    np.std(intervals),
-                    np.min(intervals),
-                    np.max(intervals),
-                    len([i for i in intervals if i < 100]),  # Fast keystrokes
-                    len([i for i in intervals if i > 1000]), # Long pauses
-                ])
-            else:
-                features.extend([0, 0, 0, 0, 0, 0])
-            
-            if dwell_times:
-                features.extend([
-                    np.mean(dwell_times),
-                    np.std(dwell_times),
-                ])
-            else:
-                features.extend([0, 0])
-            
-            # Correction patterns
-            features.extend([
-                len(corrections),                           # Total corrections
-                len(corrections) / max(len(keystroke_data), 1),  # Correction rate
-            ])
-        else:
-            features.extend([0] * 10)  # 10 keystroke features
-        
-        # Form interaction features
-        form_data = session_data.get('form_interactions', {})
-        if form_data:
-            focus_times = [f.get('focusTime', 0) for f in form_data.values()]
-            input_counts = [f.get('inputCount', 0) for f in form_data.values()]
-            corrections = [f.get('corrections', 0) for f in form_data.values()]
-            hesitations = [f.get('hesitations', 0) for f in form_data.values()]
-            focus_counts = [f.get('focusCount', 1) for f in form_data.values()]
-            
-            features.extend([
-                len(form_data),                    # Number of fields
-                np.mean(focus_times) if focus_times else 0,
-                np.std(focus_times) if len(focus_times) > 1 else 0,
-                np.sum(input_counts),              # Total inputs
-                np.sum(corrections),               # Total corrections
-                np.sum(hesitations),               # Total hesitations
-                np.mean(focus_counts) if focus_counts else 0,
-                np.sum(focus_counts),              # Total refocuses
-            ])
-        else:
-            features.extend([0] * 8)  # 8 form features
-        
-        # Click behavior features
-        click_data = session_data.get('clicks', [])
-        if click_data:
-            accuracies = [c.get('accuracy', 0) for c in click_data if 'accuracy' in c]
-            pressures = [c.get('pressure', 0) for c in click_data if 'pressure' in c]
-            
-            if len(click_data) > 1:
-                # Calculate click intervals
-                click_intervals = []
-                for i in range(1, len(click_data)):
-                    interval = click_data[i]['timestamp'] - click_data[i-1]['timestamp']
-                    click_intervals.append(interval)
-                
-                features.extend([
-                    np.mean(click_intervals) if click_intervals else 0,
-                    np.std(click_intervals) if len(click_intervals) > 1 else 0,
-                ])
-            else:
-                features.extend([0, 0])
-            
-            features.extend([
-                np.mean(accuracies) if accuracies else 0,
-                np.std(accuracies) if len(accuracies) > 1 else 0,
-                np.mean(pressures) if pressures else 0,
-            ])
-        else:
-            features.extend([0] * 5)  # 5 click features
-        
-        # Scroll behavior features
-        scroll_data = session_data.get('scroll_events', [])
-        if scroll_data:
-            delta_ys = [s.get('deltaY', 0) for s in scroll_data if 'deltaY' in s]
-            smoothness = [s.get('smoothness', 0) for s in scroll_data if 'smoothness' in s]
-            
-            features.extend([
-                len(scroll_data),
-                np.mean(np.abs(delta_ys)) if delta_ys else 0,
-                np.std(delta_ys) if len(delta_ys) > 1 else 0,
-                np.mean(smoothness) if smoothness else 0,
-            ])
-        else:
-            features.extend([0, 0, 0, 0])  # 4 scroll features
-        
-        # Advanced metrics from the session
-        metrics = session_data.get('metrics', {})
-        features.extend([
-            metrics.get('mouse_velocity_variance', 0),
-            metrics.get('keystroke_interval_variance', 0),
-            metrics.get('mouse_jitter', 0),
-            metrics.get('total_corrections', 0),
-            metrics.get('total_hesitations', 0),
-            metrics.get('focus_changes', 0),
-            metrics.get('click_accuracy', 0),
-            metrics.get('typing_rhythm_consistency', 0),
-        ])
-        
-        # Suspicious pattern analysis
-        suspicious_patterns = session_data.get('suspicious_patterns', [])
-        pattern_types = ['consistent_velocity', 'regular_typing', 'no_corrections', 'low_jitter']
-        for pattern_type in pattern_types:
-            count = sum(1 for p in suspicious_patterns if p.get('type') == pattern_type)
-            features.append(count)
-        
-        # Ratios and derived features
-        total_events = (len(session_data.get('mouse_movements', [])) + 
-                       len(session_data.get('keystrokes', [])) + 
-                       len(session_data.get('clicks', [])))
-        
-        if total_events > 0:
-            features.extend([
-                len(session_data.get('mouse_movements', [])) / total_events,  # Mouse ratio
-                len(session_data.get('keystrokes', [])) / total_events,       # Keystroke ratio
-                len(session_data.get('clicks', [])) / total_events,          # Click ratio
-            ])
-        else:
-            features.extend([0, 0, 0])
-        
-        # Session efficiency metrics
-        session_duration_sec = session_data.get('session_duration', 1) / 1000
-        features.extend([
-            total_events / session_duration_sec,  # Events per second
-            len(session_data.get('suspicious_patterns', [])) / max(total_events, 1),  # Suspicion ratio
-        ])
-        
-        return features
+        """Extract numerical features from behavior session (shared schema, see scripts/behavior_features.py)"""
+        return extract_features(session_to_payload(session_data))
     
     def prepare_data(self, training_data):
-        """Prepare features and labels for training"""
-        print("🔧 Extracting features from training data...")
-        
-        X = []
-        y = []
-        
-        for i, session in enumerate(training_data):
-            if i % 500 == 0:
-                print(f"  Progress: {i}/{len(training_data)}")
-            
-            try:
-                features = self.extract_features(session)
-                label = 1 if session['label'] == 'human' else 0  # 1 = human, 0 = bot
-                
-                X.append(features)
-                y.append(label)
-            except Exception as e:
-                print(f"  Error processing sample {i}: {e}")
-                continue
-        
-        # Define feature names for interpretability
-        self.feature_names = [
-            # Basic metrics (7 features)
-            'session_duration_sec', 'mouse_count', 'keystroke_count', 'click_count', 
-            'scroll_count', 'window_event_count', 'suspicious_pattern_count',
-            
-            # Mouse features (11 features)
-            'mouse_velocity_mean', 'mouse_velocity_std', 'mouse_velocity_min', 
-            'mouse_velocity_max', 'mouse_velocity_median', 'mouse_accel_mean', 
-            'mouse_accel_std', 'low_accel_count', 'total_mouse_distance', 
-            'avg_mouse_step', 'mouse_step_variance',
-            
-            # Keystroke features (10 features)
-            'keystroke_interval_mean', 'keystroke_interval_std', 'keystroke_interval_min',
-            'keystroke_interval_max', 'fast_keystroke_count', 'long_pause_count',
-            'dwell_time_mean', 'dwell_time_std', 'total_corrections', 'correction_rate',
-            
-            # Form features (8 features)
-            'form_field_count', 'focus_time_mean', 'focus_time_std', 'total_inputs',
-            'total_form_corrections', 'total_hesitations', 'avg_focus_count', 'total_refocuses',
-            
-            # Click features (5 features)
-            'click_interval_mean', 'click_interval_std', 'click_accuracy_mean',
-            'click_accuracy_std', 'click_pressure_mean',
-            
-            # Scroll features (4 features)
-            'scroll_event_count', 'scroll_delta_mean', 'scroll_delta_std', 'scroll_smoothness_mean',
-            
-            # Advanced metrics (8 features)
-            'mouse_velocity_variance', 'keystroke_interval_variance', 'mouse_jitter',
-            'metric_total_corrections', 'metric_total_hesitations', 'metric_focus_changes',
-            'metric_click_accuracy', 'typing_rhythm_consistency',
-            
-            # Pattern features (4 features)
-            'consistent_velocity_pattern', 'regular_typing_pattern', 'no_corrections_pattern', 'low_jitter_pattern',
-            
-            # Ratio features (3 features)
-            'mouse_ratio', 'keystroke_ratio', 'click_ratio',
-            
-            # Efficiency features (2 features)
-            'events_per_second', 'suspicion_ratio'
-        ]
-        
-        X = np.array(X)
-        y = np.array(y)
+        """Prepare features and labels for training.
+        
+        training_data may be a list or any iterable of sessions or labelled payloads (e.g.
+        training_corpus.iter_training_samples).
+        Sessions are extracted in chunks (across a process pool when n_jobs != 1) into a
+        float32 matrix; row order always follows training_data, and at most a few chunks of
+        raw sessions are held in memory at a time.
+        """
+        n_jobs = resolve_n_jobs(self.n_jobs)
+        total = len(training_data) if hasattr(training_data, '__len__') else None
+        print(f"🔧 Extracting features from training data ({n_jobs} worker{'s' if n_jobs > 1 else ''})...")
+        
+        # Exact size for lists; streamed corpora grow the buffers geometrically
+        capacity = total if total is not None else 4 * self.chunk_size
+        X = np.empty((capacity, FEATURE_COUNT), dtype=np.float32)
+        y = np.empty(capacity, dtype=np.int64)
+        ok = np.zeros(capacity, dtype=bool)
+        
+        start = 0
+        for features, labels, extracted, errors in self._extract_chunks(training_data, n_jobs):
+            end = start + len(labels)
+            if end > len(X):
+                capacity = max(end, 2 * len(X))
+                X, y, ok = _grow(X, capacity), _grow(y, capacity), _grow(ok, capacity)
+            X[start:end], y[start:end], ok[start:end] = features, labels, extracted
+            for offset, error in errors:
+                print(f"  Error processing sample {start + offset}: {error}")
+            print(f"  Progress: {end}/{total if total is not None else '?'}")
+            start = end
+        
+        X, y = X[:start][ok[:start]], y[:start][ok[:start]]
+        
+        # Feature names come from the shared schema the API serves with
+        self.feature_names = list(FEATURE_NAMES)
+        self.feature_schema_version = FEATURE_SCHEMA_VERSION
         
         print(f"✅ Extracted {X.shape[1]} features from {X.shape[0]} samples")
-        print(f"📊 Expected feature count: {len(self.feature_names)}")
-        print(f"📊 Actual feature count: {X.shape[1]}")
-        
-        if X.shape[1] != len(self.feature_names):
-            print("⚠️ Feature count mismatch! Adjusting feature names...")
-            # Adjust feature names to match actual feature count
-            if X.shape[1] < len(self.feature_names):
-                self.feature_names = self.feature_names[:X.shape[1]]
-            else:
-                for i in range(len(self.feature_names), X.shape[1]):
-                    self.feature_names.append(f'feature_{i}')
+        print(f"📊 Feature schema: v{self.feature_schema_version} ({len(self.feature_names)} features)")
         
         return X, y
     
+    def _extract_chunks(self, training_data, n_jobs):
+        """Yield extract_chunk results in input order, keeping at most 2 chunks per worker in flight"""
+        chunks = iter_chunks(training_data, self.chunk_size)
+        if n_jobs == 1:
+            yield from map(extract_chunk, chunks)
+            return
+        
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(extract_chunk, chunk))
+                if len(pending) >= 2 * n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def prepare_corpus(self, corpus_path):
+        """prepare_data for a corpus on disk, reusing cached features when cache_dir is set.
+        
+        The cache key covers the corpus contents, the feature schema version and the
+        extraction code, so cached (memory-mapped) features are only reused while all three match.
+        """
+        if self.cache_dir is None:
+            return self.prepare_data(iter_training_samples(corpus_path))
+        
+        cache = FeatureCache(os.path.join(self.cache_dir, 'features'))
+        extractor = feature_fingerprint()
+        key = cache.key(corpus_path, extractor)
+        cached = cache.load(key)
+        if cached is not None:
+            X, y = cached
+            self.feature_names = list(FEATURE_NAMES)
+            self.feature_schema_version = FEATURE_SCHEMA_VERSION
+            print(f"♻️  Loaded cached features for {corpus_path}: {X.shape[0]} samples, "
+                  f"schema v{self.feature_schema_version} (key {key[:12]})")
+            return X, y
+        
+        X, y = self.prepare_data(iter_training_samples(corpus_path))
+        cache.store(key, X, y, corpus=os.path.abspath(corpus_path))
+        print(f"💾 Cached features under {cache.cache_dir} (key {key[:12]})")
+        return X, y
+    
     def train_models(self, X_train, X_test, y_train, y_test):
         """Train multiple models and compare performance"""
         print("🚀 Training multiple models...")
@@ -330,6 +184,11 @@ class BehaviorClassifier:
                 max_depth=5,
                 random_state=42
             ),
+            'HistGradientBoosting': HistGradientBoostingClassifier(
+                max_iter=100,
+                max_depth=5,
+                random_state=42
+            ),
             'LogisticRegression': LogisticRegression(
                 random_state=42,
                 max_iter=1000
@@ -342,13 +201,21 @@ class BehaviorClassifier:
             )
         }
         
+        # Candidates and their CV folds are fitted concurrently within the CPU budget
+        orchestrator = TrainingOrchestrator(n_jobs=self.n_jobs, cv=5, cache_dir=self.cache_dir)
+        print(f"  CPU budget: {orchestrator.n_jobs} worker{'s' if orchestrator.n_jobs > 1 else ''}, "
+              f"{len(models_to_train) * (orchestrator.cv + 1)} fits")
+        fitted = orchestrator.run(models_to_train, X_train, y_train)
+        
+        # Latency is measured on what /predict-ai runs: raw features into the serving predictor
+        scaler = self.scaler if hasattr(self.scaler, 'mean_') else None
+        X_test_raw = scaler.inverse_transform(X_test) if scaler is not None else X_test
+        
         results = {}
         
-        for name, model in models_to_train.items():
-            print(f"\n📊 Training {name}...")
-            
-            # Train model
-            model.fit(X_train, y_train)
+        for name, run in fitted.items():
+            print(f"\n📊 {name}")
+            model = run['model']
             
             # Predictions
             y_pred = model.predict(X_test)
@@ -357,26 +224,52 @@ class BehaviorClassifier:
             # Calculate metrics
             accuracy = model.score(X_test, y_test)
             auc_score = roc_auc_score(y_test, y_pred_proba)
-            
-            # Cross-validation score
-            cv_scores = cross_val_score(model, X_train, y_train, cv=5)
+            cv_scores = run['cv_scores']
+            predictor = serving_predictor(model, scaler)
+            latency = dict(measure_latency(predictor, X_test_raw), predictor=type(predictor).__name__)
             
             results[name] = {
                 'model': model,
+                'score': auc_score,
                 'accuracy': accuracy,
                 'auc_score': auc_score,
                 'cv_mean': cv_scores.mean(),
                 'cv_std': cv_scores.std(),
                 'y_pred': y_pred,
-                'y_pred_proba': y_pred_proba
+                'y_pred_proba': y_pred_proba,
+                'fit_seconds': run['fit_seconds'],
+                'cv_seconds': run['cv_seconds'],
+                'wall_clock_seconds': run['wall_clock_seconds'],
+                **latency
             }
             
             print(f"  Accuracy: {accuracy:.3f}")
             print(f"  AUC Score: {auc_score:.3f}")
             print(f"  CV Score: {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
-        
-        # Find best model
-        best_model_name = max(results.keys(), key=lambda k: results[k]['auc_score'])
+            print(f"  ⚡ Serving latency ({latency['predictor']}): 1 row p50 {latency['single_row_p50_ms']:.3f} ms, "
+                  f"p99 {latency['single_row_p99_ms']:.3f} ms; {latency['batch_rows']} rows "
+                  f"p50 {latency['batch_p50_ms']:.2f} ms, p99 {latency['batch_p99_ms']:.2f} ms")
+            cached = f", {run['cached_fits']} from cache" if run['cached_fits'] else ''
+            print(f"  ⏱️ Wall-clock: {run['wall_clock_seconds']:.2f}s "
+                  f"(fit {run['fit_seconds']:.2f}s, CV folds {run['cv_seconds']:.2f}s{cached})")
+        
+        # Find best model: top AUC within the latency budget, with near-ties going to the faster model
+        best_model_name = select_candidate(results, latency_budget_ms=self.latency_budget_ms)
+        budget = f" (latency budget: p99 ≤ {self.latency_budget_ms} ms)" if self.latency_budget_ms is not None else ''
+        print(f"\n⚖️  Candidate comparison{budget}:")
+        print_comparison(results, 'AUC', best_model_name, self.latency_budget_ms)
+        if self.latency_budget_ms is not None and results[best_model_name][LATENCY_KEY] > self.latency_budget_ms:
+            print(f"⚠️ No candidate meets the latency budget; using the fastest ({best_model_name})")
+        
+        latency_keys = ('predictor', 'single_row_p50_ms', 'single_row_p99_ms', 'batch_p50_ms', 'batch_p99_ms',
+                        'batch_rows')
+        self.candidate_results = {
+            name: dict({key: result[key] for key in latency_keys},
+                       auc_score=result['auc_score'], fit_seconds=result['fit_seconds'])
+            for name, result in results.items()
+        }
+        self.latency = dict({key: results[best_model_name][key] for key in latency_keys},
+                            budget_ms=self.latency_budget_ms)
         self.best_model = results[best_model_name]['model']
         self.best_model_name = best_model_name
         self.models = {name: result['model'] for name, result in results.items()}
@@ -414,11 +307,14 @@ class BehaviorClassifier:
             return None
     
     def train(self, training_data):
-        """Train the behavior classification model"""
+        """Train the behavior classification model on sessions, or on a corpus path (feature cache aware)"""
         print("🚀 Starting comprehensive model training...")
         
         # Prepare data
-        X, y = self.prepare_data(training_data)
+        if isinstance(training_data, str):
+            X, y = self.prepare_corpus(training_data)
+        else:
+            X, y = self.prepare_data(training_data)
         
         # Handle missing values
         X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
@@ -506,8 +402,8 @@ class BehaviorClassifier:
             'feature_contributions': feature_contributions
         }
     
-    def save_model(self, filepath):
-        """Save trained model and associated data"""
+    def save_model(self, filepath, export_serving=True):
+        """Save trained model and associated data (plus a slim serving artifact)"""
         if self.best_model is None:
             raise ValueError("No model to save!")
         
@@ -516,6 +412,9 @@ class BehaviorClassifier:
             'models': self.models,
             'scaler': self.scaler,
             'feature_names': self.feature_names,
+            'feature_schema_version': self.feature_schema_version,
+            'latency': self.latency,
+            'candidates': self.candidate_results,
             'best_model_name': self.best_model_name,
             'feature_importance': self.feature_importance
         }
@@ -524,6 +423,25 @@ class BehaviorClassifier:
             pickle.dump(model_data, f)
         
         print(f"✅ Model saved to {filepath}.pkl")
+        
+        if export_serving:
+            self.export_serving_artifact(f"{filepath}_serving")
+    
+    def export_serving_artifact(self, path):
+        """Export only what the API needs: best model, scaler and a manifest"""
+        if self.best_model is None:
+            raise ValueError("No model to export!")
+        
+        export_serving_artifact(
+            path,
+            model=self.best_model,
+            model_name=self.best_model_name,
+            feature_names=self.feature_names,
+            scaler=self.scaler,
+            feature_schema_version=self.feature_schema_version,
+            extra={'latency': self.latency, 'candidates': self.candidate_results}
+        )
+        print(f"✅ Serving artifact exported to {path}/")
     
     def load_model(self, filepath):
         """Load trained model and associated data"""
@@ -534,27 +452,52 @@ class BehaviorClassifier:
         self.models = model_data.get('models', {})
         self.scaler = model_data['scaler']
         self.feature_names = model_data['feature_names']
+        self.feature_schema_version = model_data.get('feature_schema_version', 1)
+        self.latency = model_data.get('latency', {})
+        self.candidate_results = model_data.get('candidates', {})
         self.best_model_name = model_data.get('best_model_name', 'unknown')
         self.feature_importance = model_data.get('feature_importance', {})
         
         print(f"✅ Model loaded from {filepath}.pkl")
         print(f"🏆 Best model: {self.best_model_name}")
 
+def feature_fingerprint():
+    """extractor_fingerprint of the code prepare_corpus builds the cached matrix with"""
+    return extractor_fingerprint(extract_chunk, _grow, BehaviorClassifier.prepare_data,
+                                 BehaviorClassifier._extract_chunks)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Train the behavior classification model')
+    parser.add_argument('--data', default=None,
+                        help='Training corpus: columnar .parquet/.npz, sharded directory, .ndjson or legacy .json; '
+                             'defaults to the first behavior_training_data corpus found')
+    parser.add_argument('--jobs', type=int, default=int(os.environ.get('BEHAVIOR_TRAIN_JOBS', -1)),
+                        help='CPU budget for feature extraction and training (-1 = all cores, 1 = serial)')
+    parser.add_argument('--chunk-size', type=int, default=256, help='Sessions per extraction task')
+    parser.add_argument('--cache-dir', default=os.environ.get('BEHAVIOR_MODEL_CACHE'),
+                        help='Cache extracted features and fitted CV fold and candidate models here '
+                             'to reuse them across runs')
+    parser.add_argument('--latency-budget-ms', type=float,
+                        default=float(os.environ['BEHAVIOR_LATENCY_BUDGET_MS'])
+                        if os.environ.get('BEHAVIOR_LATENCY_BUDGET_MS') else None,
+                        help='Only select models whose p99 single-row serving latency fits this budget')
+    return parser.parse_args()
+
 def main():
     """Main training function"""
-    # Load training data
-    print("📂 Loading training data...")
-    try:
-        with open('behavior_training_data.json', 'r') as f:
-            training_data = json.load(f)
-        print(f"✅ Loaded {len(training_data)} training samples")
-    except FileNotFoundError:
+    args = parse_args()
+    
+    # Sessions are streamed from disk; only the feature matrix is kept in memory
+    data_path = args.data or find_corpus()
+    if data_path is None or not os.path.exists(data_path):
         print("❌ Training data not found! Please run generate_training_data.py first")
         return
+    print(f"📂 Streaming training data from {data_path}...")
     
     # Initialize and train classifier
-    classifier = BehaviorClassifier()
-    results = classifier.train(training_data)
+    classifier = BehaviorClassifier(n_jobs=args.jobs, chunk_size=args.chunk_size, cache_dir=args.cache_dir,
+                                    latency_budget_ms=args.latency_budget_ms)
+    results = classifier.train(data_path)
     
     # Save model
     classifier.save_model('custom_behavior_model')
@@ -565,8 +508,8 @@ def main():
     
     # Test prediction
     print("\n🧪 Testing prediction with sample data...")
-    if training_data:
-        sample = training_data[0]
+    sample = next(iter_training_samples(data_path), None)
+    if sample is not None:
         prediction = classifier.predict(sample)
         print(f"Sample prediction: {prediction['prediction']} (confidence: {prediction['confidence']:.3f})")
 
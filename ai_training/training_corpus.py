@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Behavior Training Corpus I/O
+Reads and writes training sessions as columnar Parquet/.npz files (see columnar_corpus.py)
+or newline-delimited JSON (one session per line), so a corpus can be streamed through
+feature extraction without ever holding the raw events of every session in memory.
+Columnar corpora are extracted straight from their arrays. A sharded corpus is a directory of such files listed in a
+manifest.json (see generate_training_data.generate_shards) and is read shard by shard.
+Legacy single-document .json corpora are still readable.
+"""
+
+import json
+import os
+import sys
+from itertools import chain, islice
+
+try:
+    import orjson
+except ImportError:  # optional: faster session encoding and decoding
+    orjson = None
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai_training.columnar_corpus import SessionColumns, is_columnar, iter_columnar, write_columnar
+
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+MANIFEST_NAME = 'manifest.json'
+
+# Looked up in order by train_behavior_model.py when no corpus path is given
+DEFAULT_CORPUS_PATHS = (
+    'behavior_training_data', 'behavior_training_data.parquet', 'behavior_training_data.npz',
+    'behavior_training_data.ndjson', 'behavior_training_data.json'
+)
+
+# Sessions per row group when session dicts are written to a columnar corpus
+COLUMNAR_BATCH_SIZE = 1000
+
+
+def is_ndjson(path):
+    return path.endswith(NDJSON_EXTENSIONS)
+
+
+def find_corpus(paths=DEFAULT_CORPUS_PATHS):
+    """First existing corpus path, or None"""
+    return next((path for path in paths if os.path.exists(path)), None)
+
+
+def is_sharded(path):
+    return os.path.isdir(path) or os.path.basename(path) == MANIFEST_NAME
+
+
+def read_manifest(path):
+    """Manifest of a sharded corpus (directory or manifest.json path), with shard paths made absolute"""
+    manifest_path = os.path.join(path, MANIFEST_NAME) if os.path.isdir(path) else path
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    root = os.path.dirname(os.path.abspath(manifest_path))
+    for shard in manifest['shards']:
+        shard['path'] = os.path.join(root, shard['path'])
+    return manifest
+
+
+def write_manifest(manifest, directory):
+    """Write manifest.json into a sharded corpus directory; shard paths are stored relative to it"""
+    manifest = dict(manifest, shards=[dict(shard, path=os.path.relpath(shard['path'], directory))
+                                      for shard in manifest['shards']])
+    path = os.path.join(directory, MANIFEST_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+
+def iter_sessions(path):
+    """Yield sessions one at a time from a columnar or NDJSON corpus, a sharded corpus (shards
+    in manifest order) or all of a legacy JSON array"""
+    if is_sharded(path):
+        for shard in read_manifest(path)['shards']:
+            yield from iter_sessions(shard['path'])
+        return
+
+    if is_columnar(path):
+        for batch in iter_columnar(path):
+            yield from batch.to_sessions()
+        return
+
+    if not is_ndjson(path):
+        with open(path, 'r') as f:
+            yield from json.load(f)
+        return
+
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield orjson.loads(line) if orjson is not None else json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid session: {e}") from None
+
+
+def iter_training_samples(path):
+    """Yield what BehaviorClassifier.prepare_data extracts from: labelled ColumnarEvents payloads
+    for columnar corpora (no per-event dicts), raw sessions for the others"""
+    if is_sharded(path):
+        for shard in read_manifest(path)['shards']:
+            yield from iter_training_samples(shard['path'])
+        return
+
+    if is_columnar(path):
+        for batch in iter_columnar(path):
+            yield from batch.payloads()
+        return
+
+    yield from iter_sessions(path)
+
+
+def iter_chunks(sessions, chunk_size):
+    """Split a list or any iterable of sessions into lists of at most chunk_size"""
+    if isinstance(sessions, (list, tuple)):
+        for start in range(0, len(sessions), chunk_size):
+            yield sessions[start:start + chunk_size]
+        return
+
+    sessions = iter(sessions)
+    while True:
+        chunk = list(islice(sessions, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_sessions(sessions, path):
+    """Write sessions as a columnar corpus, NDJSON or (for a .json path) a JSON array; returns the session count"""
+    if is_columnar(path):
+        return write_columnar(map(SessionColumns.from_sessions, iter_chunks(sessions, COLUMNAR_BATCH_SIZE)), path)
+
+    if not is_ndjson(path):
+        sessions = list(sessions)
+        with open(path, 'w') as f:
+            json.dump(sessions, f, indent=2)
+        return len(sessions)
+
+    count = 0
+    with open(path, 'wb') as f:
+        for session in sessions:
+            if orjson is not None:
+                f.write(orjson.dumps(session))
+            else:
+                f.write(json.dumps(session, separators=(',', ':')).encode())
+            f.write(b'\n')
+            count += 1
+    return count
+
+
+def write_batches(batches, path):
+    """Write SessionColumns batches to any corpus format; returns the session count"""
+    if is_columnar(path):
+        return write_columnar(batches, path)
+    return write_sessions(chain.from_iterable(batch.to_sessions() for batch in batches), path)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Training Orchestrator for Candidate Models
+Fits every candidate model and all of its cross-validation folds as one pool of independent
+tasks, run concurrently within a CPU budget. Fits are keyed by the estimator's parameters,
+the training data and the fold: candidates with identical parameters share one set of fits
+within a run, and with a cache directory each fitted fold and full model is kept on disk so
+re-running training on the same data only fits candidates that changed.
+"""
+
+import hashlib
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+from threadpoolctl import threadpool_limits
+
+# Parameters that change how a fit runs, not what it learns
+RUNTIME_PARAMS = ('n_jobs', 'verbose')
+
+
+def resolve_n_jobs(n_jobs):
+    """Worker count for n_jobs (None/1 = serial, -1 = all cores, like sklearn)"""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+def data_fingerprint(X, y):
+    digest = hashlib.sha256()
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+def estimator_fingerprint(estimator):
+    params = {key: value for key, value in estimator.get_params(deep=True).items()
+              if key.split('__')[-1] not in RUNTIME_PARAMS}
+    description = f"{type(estimator).__module__}.{type(estimator).__name__}{sorted(params.items())!r}"
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+def _fit_task(key, fold, estimator, X, y, train_index, test_index, cache_path, threads):
+    """Fit (or load) one model on one fold; fold None is the full training set.
+
+    BLAS and OpenMP pools (HistGradientBoosting, linear models) are held to threads,
+    the task's share of the CPU budget. Returns (key, fold, model or None, score,
+    started, finished, cached); fold models are scored in the worker and not sent back.
+    """
+    started = time.time()
+    cached = cache_path is not None and os.path.exists(cache_path)
+    with threadpool_limits(limits=threads):
+        if cached:
+            model = joblib.load(cache_path)
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                if train_index is None:
+                    model = clone(estimator).fit(X, y)
+                else:
+                    model = clone(estimator).fit(X[train_index], y[train_index])
+            if cache_path is not None:
+                temp_path = f"{cache_path}.{os.getpid()}.tmp"
+                joblib.dump(model, temp_path)
+                os.replace(temp_path, cache_path)
+
+        score = model.score(X[test_index], y[test_index]) if test_index is not None else None
+    return key, fold, model if fold is None else None, score, started, time.time(), cached
+
+
+class TrainingOrchestrator:
+    """Runs candidate fits and CV folds concurrently within a CPU budget"""
+
+    def __init__(self, n_jobs=-1, cv=5, cache_dir=None):
+        self.n_jobs = resolve_n_jobs(n_jobs)
+        self.cv = cv
+        self.cache_dir = cache_dir
+
+    def _cache_path(self, estimator_key, data_key, fold):
+        if self.cache_dir is None:
+            return None
+        fold_name = 'full' if fold is None else f"fold{fold}of{self.cv}"
+        return os.path.join(self.cache_dir, f"{estimator_key[:16]}_{data_key[:16]}_{fold_name}.joblib")
+
+    def run(self, candidates, X, y):
+        """Fit every candidate on (X, y) and cross-validate it.
+
+        Returns {name: {'model', 'cv_scores', 'fit_seconds', 'cv_seconds', 'wall_clock_seconds',
+        'cached_fits'}} with the fitted full model and per-fold accuracy.
+        """
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        data_key = data_fingerprint(X, y) if self.cache_dir is not None else None
+        folds = list(StratifiedKFold(n_splits=self.cv).split(X, y))
+
+        # Candidates with identical parameters are the same fits; run them once
+        names_by_key = {}
+        unique = {}
+        for name, estimator in candidates.items():
+            key = estimator_fingerprint(estimator)
+            names_by_key.setdefault(key, []).append(name)
+            unique.setdefault(key, estimator)
+
+        # The pool owns the CPU budget: each concurrent task gets an equal share of it,
+        # both for estimator n_jobs and for the native thread pools
+        n_tasks = len(unique) * (self.cv + 1)
+        workers = min(self.n_jobs, n_tasks)
+        threads = max(1, self.n_jobs // workers)
+
+        tasks = []
+        for key, estimator in unique.items():
+            if 'n_jobs' in estimator.get_params():
+                estimator = clone(estimator).set_params(n_jobs=threads)
+            tasks.append((key, None, estimator, None, None))
+            tasks.extend((key, fold, estimator, train_index, test_index)
+                         for fold, (train_index, test_index) in enumerate(folds))
+
+        outputs = joblib.Parallel(n_jobs=workers)(
+            joblib.delayed(_fit_task)(key, fold, estimator, X, y, train_index, test_index,
+                                      self._cache_path(key, data_key, fold), threads)
+            for key, fold, estimator, train_index, test_index in tasks
+        )
+
+        results = {name: {'cv_scores': [None] * self.cv, 'fit_seconds': 0.0, 'cv_seconds': 0.0,
+                          'started': float('inf'), 'finished': 0.0, 'cached_fits': 0}
+                   for name in candidates}
+        for key, fold, model, score, started, finished, cached in outputs:
+            for name in names_by_key[key]:
+                result = results[name]
+                if fold is None:
+                    result['model'] = model
+                    result['fit_seconds'] = finished - started
+                else:
+                    result['cv_scores'][fold] = score
+                    result['cv_seconds'] += finished - started
+                result['started'] = min(result['started'], started)
+                result['finished'] = max(result['finished'], finished)
+                result['cached_fits'] += cached
+
+        for result in results.values():
+            result['cv_scores'] = np.array(result['cv_scores'])
+            # From the first of the candidate's tasks starting to the last one finishing
+            result['wall_clock_seconds'] = result.pop('finished') - result.pop('started')
+        return results
@@ -5,231 +5,362 @@ Provides AI-powered bot detection endpoint for the Next.js application
 """
 
 import json
+import logging
 import pickle
+import random
 import numpy as np
 from flask import Flask, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
 from flask_cors import CORS
 import os
 import sys
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from behavior_features import extract_features, FEATURE_COUNT, FEATURE_NAMES, FEATURE_SCHEMA_VERSION
+from micro_batcher import BatchTimeout, MicroBatcher
+from score_cache import ScoreCache, payload_key
+from session_accumulator import SequenceGap, SessionStore
+from payload_decoder import decode_request, decode_batch, decoder_backend
+from payload_limits import MAX_BODY_BYTES, MAX_BATCH_BODY_BYTES, body_too_large, cap_events, rescale_counts, split_events
+from model_artifact import is_serving_artifact, load_serving_artifact, load_flat_forest, serving_predictor
+
 app = Flask(__name__)
 CORS(app)
+# Ceiling for bodies without a Content-Length; /predict-ai/batch raises it for its request
+app.config['MAX_CONTENT_LENGTH'] = MAX_BODY_BYTES
+
+# Request-path logging is level-gated: per-request lines are DEBUG and use lazy
+# %-formatting, so nothing is formatted unless AI_LOG_LEVEL enables them
+logger = logging.getLogger('ai_behavior_api')
+LOG_LEVEL = os.environ.get('AI_LOG_LEVEL', 'WARNING').upper()
+# Fraction of /predict-ai requests logged as a one-line INFO summary (0 = off)
+LOG_SAMPLE_RATE = float(os.environ.get('AI_LOG_SAMPLE_RATE', 0))
 
-# Global variables for model and feature extractor
+# Global variables for model and feature extractor. model stays None when a serving
+# artifact's flat forest replaces the sklearn forest; predictor is what scores.
 model = None
 feature_extractor = None
+model_manifest = None
+scaler = None
+# Feature schema the loaded model was trained on (1 = before the shared schema)
+model_feature_schema = None
+# Serving latency measured when the model was selected at training time
+model_latency = None
+# Object used for scoring raw feature vectors: a FlatForest with the scaler
+# folded into its thresholds when possible, otherwise a scaler + model Pipeline
+predictor = None
+
+# Use the flat-array forest evaluator for RandomForest models (0 = plain sklearn)
+FLAT_FOREST_ENABLED = os.environ.get('AI_FLAT_FOREST', '1') == '1'
+
+# Trained model location (override with AI_MODEL_PATH). Either a serving
+# artifact directory exported by BehaviorClassifier.save_model or a full
+# training pickle; the slim artifact is preferred when present.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVING_ARTIFACT_PATH = os.path.join(REPO_ROOT, 'custom_behavior_model_serving')
+MODEL_PATH = os.environ.get('AI_MODEL_PATH') or (
+    SERVING_ARTIFACT_PATH if is_serving_artifact(SERVING_ARTIFACT_PATH)
+    else os.path.join(REPO_ROOT, 'custom_behavior_model.pkl')
+)
+
+# Upper bound on sessions accepted by /predict-ai/batch in one request
+BATCH_MAX_SESSIONS = int(os.environ.get('AI_BATCH_MAX_SESSIONS', 500))
+
+# Micro-batching of concurrent /predict-ai calls (set the window to 0 to disable)
+MICROBATCH_WINDOW_MS = float(os.environ.get('AI_MICROBATCH_WINDOW_MS', 2))
+MICROBATCH_MAX_SIZE = int(os.environ.get('AI_MICROBATCH_MAX_SIZE', 64))
+MICROBATCH_TIMEOUT_S = float(os.environ.get('AI_MICROBATCH_TIMEOUT_S', 1.0))
+
+# Cache of scored payloads for repeated polls (set the size to 0 to disable)
+SCORE_CACHE_SIZE = int(os.environ.get('AI_SCORE_CACHE_SIZE', 10000))
+SCORE_CACHE_TTL_S = float(os.environ.get('AI_SCORE_CACHE_TTL_S', 30))
+
+# Per-session running feature state for /track-delta
+SESSION_MAX = int(os.environ.get('AI_SESSION_MAX', 10000))
+SESSION_IDLE_TTL_S = float(os.environ.get('AI_SESSION_IDLE_TTL_S', 1800))
 
-def load_model():
+def load_model(model_path=None):
     """Load the trained AI model"""
-    global model, feature_extractor
+    global model, feature_extractor, model_manifest, scaler, predictor, model_feature_schema, model_latency
     try:
-        model_path = '/Users/macbookair/Documents/Code/hacksphrizz/custom_behavior_model.pkl'
+        model_path = model_path or MODEL_PATH
         
         if not os.path.exists(model_path):
             print(f"❌ Model file not found at {model_path}")
             return False
+        
+        if is_serving_artifact(model_path):
+            # Slim artifact: only the best model, arrays memory-mapped from disk. The sklearn
+            # forest is not loaded at all when its flattened arrays serve instead.
+            model, scaler, model_manifest = load_serving_artifact(model_path, flat_forest=FLAT_FOREST_ENABLED)
+            best_model_name = model_manifest['model_name']
+            feature_names = model_manifest['feature_names']
+            feature_schema = model_manifest.get('feature_schema_version') or 1
+            latency = model_manifest.get('latency')
+        else:
+            with open(model_path, 'rb') as f:
+                model_data = pickle.load(f)
             
-        with open(model_path, 'rb') as f:
-            model_data = pickle.load(f)
-            
-        # Extract the actual model from the saved data
-        model = model_data['models'][model_data['best_model_name']]
+            # Extract the actual model from the saved data
+            model = model_data['models'][model_data['best_model_name']]
+            scaler = model_data.get('scaler')
+            best_model_name = model_data['best_model_name']
+            feature_names = model_data['feature_names']
+            feature_schema = model_data.get('feature_schema_version', 1)
+            latency = model_data.get('latency')
+            model_manifest = None
+        
+        if len(feature_names) != FEATURE_COUNT:
+            print(f"❌ Model expects {len(feature_names)} features, the API extracts {FEATURE_COUNT}")
+            return False
+        if feature_schema != FEATURE_SCHEMA_VERSION:
+            print(f"⚠️ Model was trained on feature schema v{feature_schema}, the API serves "
+                  f"v{FEATURE_SCHEMA_VERSION}; retrain it with ai_training/train_behavior_model.py")
+        model_feature_schema = feature_schema
+        model_latency = latency or None
+        
         feature_extractor = None  # Will use manual feature extraction
-        feature_names = model_data['feature_names']
+        
+        flat_forest = load_flat_forest(model_path, model_manifest) if model_manifest and FLAT_FOREST_ENABLED else None
+        predictor = build_predictor(model, scaler, flat_forest)
         
         print("✅ AI model loaded successfully")
-        print(f"🏆 Best model: {model_data['best_model_name']}")
-        print(f"🔍 Feature count: {len(feature_names)}")
+        print(f"📦 Source: {model_path}")
+        print(f"🏆 Best model: {best_model_name}")
+        print(f"🔍 Feature count: {len(feature_names)} (schema v{feature_schema})")
+        print(f"⚡ Predictor: {type(predictor).__name__}")
+        if model_latency:
+            print(f"⏱️ Trained latency: p50 {model_latency['single_row_p50_ms']:.3f} ms, "
+                  f"p99 {model_latency['single_row_p99_ms']:.3f} ms per request")
         return True
         
     except Exception as e:
         print(f"❌ Error loading model: {e}")
         return False
 
-def extract_behavior_features(behavior_data):
-    """Extract features from behavior data for AI prediction (manual extraction)"""
+def build_predictor(model, scaler, flat_forest=None):
+    """Fuse the training scaler and the model into one object scoring raw features"""
+    if FLAT_FOREST_ENABLED and flat_forest is not None:
+        # Artifacts written before the scaler was folded at export time
+        if scaler is not None and not flat_forest.scaler_folded:
+            return flat_forest.fold_scaler(scaler)
+        return flat_forest
+    
+    return serving_predictor(model, scaler, flat_forest=FLAT_FOREST_ENABLED)
+
+def configure_logging(level=None):
+    """Attach a stderr handler and apply AI_LOG_LEVEL (called by the server entry points)"""
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    logger.setLevel(level or LOG_LEVEL)
+
+def log_sampled_request(behavior_data, body_size, result):
+    """Log a compact summary (never the payload itself) for a sample of requests"""
+    if LOG_SAMPLE_RATE <= 0 or random.random() >= LOG_SAMPLE_RATE:
+        return
+    logger.info(
+        "🧪 Sampled /predict-ai: %s bytes, %d mouse / %d keys / %d clicks / %d forms -> %s (trust %s%%)",
+        body_size,
+        len(behavior_data.get('mouseMovements', [])),
+        len(behavior_data.get('keystrokes', [])),
+        len(behavior_data.get('clicks', [])),
+        len(behavior_data.get('formInteractions', [])),
+        result['prediction'],
+        result['trust_score']
+    )
+
+def extract_behavior_features(behavior_data, truncated=None):
+    """Extract features from behavior data for AI prediction (vectorized extraction)"""
     try:
-        # Initialize feature vector
-        features = []
-        
-        # Basic counters
-        mouse_moves = len(behavior_data.get('mouseMovements', []))
-        clicks = len(behavior_data.get('clicks', []))
-        keystrokes = len(behavior_data.get('keystrokes', []))
-        form_interactions = len(behavior_data.get('formInteractions', []))
-        
-        # Basic metrics (features 0-5)
-        features.extend([
-            mouse_moves,
-            clicks, 
-            keystrokes,
-            form_interactions,
-            behavior_data.get('pageViewTime', 0),
-            behavior_data.get('suspiciousPatternCount', 0)
-        ])
-        
-        # Mouse movement analysis (features 6-17)
-        mouse_movements = behavior_data.get('mouseMovements', [])
-        if mouse_movements:
-            velocities = [m.get('velocity', 0) for m in mouse_movements]
-            accelerations = [m.get('acceleration', 0) for m in mouse_movements]
-            
-            features.extend([
-                np.mean(velocities) if velocities else 0,
-                np.std(velocities) if velocities else 0,
-                np.min(velocities) if velocities else 0,
-                np.max(velocities) if velocities else 0,
-                
-                np.mean(accelerations) if accelerations else 0,
-                np.std(accelerations) if accelerations else 0,
-                np.min(accelerations) if accelerations else 0,
-                np.max(accelerations) if accelerations else 0,
-                
-                # Additional mouse metrics
-                sum(1 for m in mouse_movements if m.get('velocity', 0) > 1000),  # Fast movements
-                sum(1 for m in mouse_movements if m.get('velocity', 0) < 10),   # Slow movements
-                len([m for m in mouse_movements if m.get('pressure', 0) > 0.5]),  # High pressure
-                sum(m.get('jitter', 0) for m in mouse_movements) / len(mouse_movements) if mouse_movements else 0
-            ])
-        else:
-            features.extend([0] * 12)
-        
-        # Keystroke analysis (features 18-29)
-        keystrokes_data = behavior_data.get('keystrokes', [])
-        if keystrokes_data and len(keystrokes_data) > 1:
-            intervals = []
-            for i in range(1, len(keystrokes_data)):
-                if 'timestamp' in keystrokes_data[i] and 'timestamp' in keystrokes_data[i-1]:
-                    interval = keystrokes_data[i]['timestamp'] - keystrokes_data[i-1]['timestamp']
-                    intervals.append(interval)
-            
-            if intervals:
-                features.extend([
-                    np.mean(intervals),
-                    np.std(intervals),
-                    np.min(intervals), 
-                    np.max(intervals),
-                    
-                    # Typing patterns
-                    sum(1 for ks in keystrokes_data if ks.get('key', '').isalpha()),  # Letter keys
-                    sum(1 for ks in keystrokes_data if ks.get('key', '') in '0123456789'),  # Number keys
-                    sum(1 for ks in keystrokes_data if ks.get('key', '') in ' .,!?'),  # Punctuation
-                    sum(1 for ks in keystrokes_data if ks.get('key', '') in ['Backspace', 'Delete']),  # Corrections
-                    
-                    # Typing speed metrics
-                    len(keystrokes_data) / (behavior_data.get('pageViewTime', 1) / 1000) if behavior_data.get('pageViewTime', 0) > 0 else 0,
-                    sum(1 for i in intervals if i < 100),  # Very fast typing
-                    sum(1 for i in intervals if i > 2000),  # Very slow typing
-                    np.std([ks.get('pressure', 0) for ks in keystrokes_data]) if keystrokes_data else 0
-                ])
-            else:
-                features.extend([0] * 12)
-        else:
-            features.extend([0] * 12)
-        
-        # Click analysis (features 30-41)
-        clicks_data = behavior_data.get('clicks', [])
-        if clicks_data:
-            # Click timing
-            if len(clicks_data) > 1:
-                click_intervals = []
-                for i in range(1, len(clicks_data)):
-                    if 'timestamp' in clicks_data[i] and 'timestamp' in clicks_data[i-1]:
-                        interval = clicks_data[i]['timestamp'] - clicks_data[i-1]['timestamp']
-                        click_intervals.append(interval)
-                
-                if click_intervals:
-                    features.extend([
-                        np.mean(click_intervals),
-                        np.std(click_intervals),
-                        np.min(click_intervals),
-                        np.max(click_intervals)
-                    ])
-                else:
-                    features.extend([0] * 4)
-            else:
-                features.extend([0] * 4)
-            
-            # Click accuracy and patterns
-            double_clicks = sum(1 for c in clicks_data if c.get('clickType') == 'double')
-            right_clicks = sum(1 for c in clicks_data if c.get('button') == 2)
-            click_accuracy = np.mean([c.get('accuracy', 0.5) for c in clicks_data])
-            
-            features.extend([
-                double_clicks,
-                right_clicks,
-                click_accuracy,
-                sum(c.get('pressure', 0) for c in clicks_data) / len(clicks_data) if clicks_data else 0,
-                
-                # Additional click metrics
-                len([c for c in clicks_data if c.get('x', 0) < 100]),  # Edge clicks
-                len([c for c in clicks_data if c.get('y', 0) < 100]),  # Top clicks
-                sum(1 for c in clicks_data if c.get('duration', 0) < 50),  # Fast clicks
-                sum(1 for c in clicks_data if c.get('duration', 0) > 500)   # Slow clicks
-            ])
-        else:
-            features.extend([0] * 12)
-        
-        # Form interaction analysis (features 42-53)
-        form_data = behavior_data.get('formInteractions', [])
-        if form_data:
-            focus_times = [f.get('focusTime', 0) for f in form_data]
-            dwell_times = [f.get('dwellTime', 0) for f in form_data]
-            
-            features.extend([
-                np.mean(focus_times) if focus_times else 0,
-                np.std(focus_times) if focus_times else 0,
-                np.mean(dwell_times) if dwell_times else 0,
-                np.std(dwell_times) if dwell_times else 0,
-                
-                # Form interaction patterns
-                sum(1 for f in form_data if f.get('interactionType') == 'input'),
-                sum(1 for f in form_data if f.get('interactionType') == 'select'),
-                sum(1 for f in form_data if f.get('interactionType') == 'textarea'),
-                sum(f.get('changeCount', 0) for f in form_data),
-                
-                # Form completion metrics
-                len([f for f in form_data if f.get('value', '') != '']),  # Filled fields
-                np.mean([len(str(f.get('value', ''))) for f in form_data]),  # Average input length
-                sum(1 for f in form_data if f.get('tabOrder', 0) > 0),  # Tab navigation
-                sum(f.get('validationErrors', 0) for f in form_data)  # Validation errors
-            ])
-        else:
-            features.extend([0] * 12)
-        
-        # Additional behavioral metrics (features 54-61)
-        features.extend([
-            behavior_data.get('scrollDistance', 0),
-            behavior_data.get('idleTime', 0),
-            len(behavior_data.get('focusEvents', [])),
-            len(behavior_data.get('blurEvents', [])),
-            behavior_data.get('mouseJitter', 0),
-            behavior_data.get('irregularPatterns', 0),
-            behavior_data.get('clickAccuracy', 0.5),
-            behavior_data.get('typingRhythm', 0.5)
-        ])
-        
-        print(f"🔧 Extracted {len(features)} features")
-        return np.array(features)
+        features = extract_features(behavior_data)
+        # Counts from capped streams are scaled back to what the client sent
+        return rescale_counts(features, truncated) if truncated else features
         
     except Exception as e:
-        print(f"❌ Feature extraction error: {e}")
+        logger.warning("❌ Feature extraction error: %s", e)
+        return None
+
+def to_trust_result(prediction, confidence):
+    """Convert a model prediction and its confidence into the API trust score fields"""
+    if prediction == 1:  # Human
+        trust_score = int(confidence * 100)
+        prediction_label = 'human'
+    else:  # Bot
+        trust_score = int((1 - confidence) * 100)
+        prediction_label = 'bot'
+    
+    return {
+        'trust_score': trust_score,
+        'prediction': prediction_label,
+        'confidence': float(confidence),
+        'method': 'ai'
+    }
+
+def score_feature_matrix(feature_matrix):
+    """Score every row of a feature matrix with a single predict_proba call"""
+    probabilities = predictor.predict_proba(feature_matrix)
+    predictions = predictor.classes_[probabilities.argmax(axis=1)]
+    confidences = probabilities.max(axis=1)
+    return [to_trust_result(p, c) for p, c in zip(predictions, confidences)]
+
+batcher = MicroBatcher(
+    score_feature_matrix,
+    window_ms=MICROBATCH_WINDOW_MS,
+    max_batch_size=MICROBATCH_MAX_SIZE,
+    timeout=MICROBATCH_TIMEOUT_S
+) if MICROBATCH_WINDOW_MS > 0 else None
+
+score_cache = ScoreCache(
+    max_entries=SCORE_CACHE_SIZE,
+    ttl_s=SCORE_CACHE_TTL_S
+) if SCORE_CACHE_SIZE > 0 else None
+
+session_store = SessionStore(
+    max_sessions=SESSION_MAX,
+    idle_ttl_s=SESSION_IDLE_TTL_S
+)
+
+def score_behavior(behavior_data):
+    """Extract features from one payload and score it; returns None if extraction fails"""
+    # Oversized event streams are windowed or sampled before extraction
+    behavior_data, truncated = cap_events(behavior_data)
+    
+    # Extract features manually
+    features = extract_behavior_features(behavior_data, truncated)
+    if features is None:
         return None
+    
+    result = score_features(features)
+    if truncated:
+        result['truncated'] = truncated
+    return result
+
+def score_features(features):
+    """Score one feature vector"""
+    # Make prediction with a single probability pass (batched together
+    # with concurrent requests when enabled)
+    if batcher is not None:
+        result = dict(batcher.submit(features))
+    else:
+        result = score_feature_matrix(features.reshape(1, -1))[0]
+    
+    logger.debug("🎯 AI Prediction: %s (confidence: %.3f, trust: %d%%)",
+                 result['prediction'], result['confidence'], result['trust_score'])
+    
+    result.update({
+        'features_extracted': len(features),
+        'model_type': served_model_type()
+    })
+    return result
+
+def invalid_delta(delta):
+    """Why a /track-delta body cannot be ingested, or None if it can"""
+    if not isinstance(delta, dict) or not delta.get('sessionId'):
+        return 'sessionId is required'
+    seq = delta.get('seq')
+    if not isinstance(seq, int) or isinstance(seq, bool) or seq < 0:
+        return 'seq (the per-session delta number, starting at 0) is required'
+    return None
+
+def track_delta(delta):
+    """Fold a session's new events into its accumulator and score the running features.
+    
+    Raises SequenceGap when delta is not the next one for the session's state in this
+    process (a lost, repeated, or other-worker delta); that state is dropped.
+    """
+    session_id = str(delta['sessionId'])
+    # Oversized deltas are ingested in capped parts rather than truncated, so
+    # counts and intervals across the cut stay exact
+    features, event_counts = session_store.append(session_id, delta['seq'], split_events(delta))
+    
+    result = score_features(features)
+    result.update({
+        'session_id': session_id,
+        'events': event_counts
+    })
+    return result
+
+def health_status():
+    """Health payload shared by the Flask and asyncio servers"""
+    return {
+        'status': 'healthy',
+        'model_loaded': predictor is not None,
+        'service': 'AI Behavior Detection API',
+        'micro_batching': batcher.stats() if batcher is not None else None,
+        'score_cache': score_cache.stats() if score_cache is not None else None,
+        'sessions': session_store.stats()
+    }
+
+def served_model_type():
+    """Class name of the loaded model (from the manifest when the sklearn model is not loaded)"""
+    return type(model).__name__ if model is not None else model_manifest['model_class']
+
+def model_details():
+    """Model information payload shared by the Flask and asyncio servers"""
+    return {
+        'model_type': served_model_type(),
+        'predictor': type(predictor).__name__,
+        'scaler': type(scaler).__name__ if scaler is not None else None,
+        'json_decoder': decoder_backend(),
+        'feature_count': FEATURE_COUNT,
+        'feature_schema_version': FEATURE_SCHEMA_VERSION,
+        'model_feature_schema_version': model_feature_schema,
+        'latency': model_latency,
+        'status': 'loaded',
+        'features': FEATURE_NAMES,
+        'artifact': {
+            key: model_manifest.get(key)
+            for key in ('format_version', 'model_name', 'sklearn_version', 'created_at')
+        } if model_manifest else None
+    }
+
+def read_body(limit=MAX_BODY_BYTES):
+    """The request body; a streamed (chunked) body cut off at the limit is too large"""
+    raw_body = request.get_data()
+    if request.content_length is None and len(raw_body) >= limit:
+        raise RequestEntityTooLarge()
+    return raw_body
+
+def scoring_timed_out():
+    return jsonify({
+        'error': 'Scoring timed out, retry shortly',
+        'trust_score': 0,
+        'prediction': 'bot',
+        'confidence': 0,
+        'method': 'ai'
+    }), 503
+
+def sequence_gap_body(gap):
+    """Error body asking the client to resend a session from seq 0"""
+    return {
+        'error': str(gap),
+        'session_id': gap.session_id,
+        'expected_seq': 0,
+        'trust_score': 0,
+        'prediction': 'bot',
+        'confidence': 0,
+        'method': 'ai'
+    }
+
+def payload_too_large(limit):
+    return jsonify({
+        'error': f'Request body too large (max {limit} bytes)',
+        'trust_score': 0,
+        'prediction': 'bot',
+        'confidence': 0,
+        'method': 'ai'
+    }), 413
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'model_loaded': model is not None,
-        'service': 'AI Behavior Detection API'
-    })
+    return jsonify(health_status())
 
 @app.route('/predict-ai', methods=['POST'])
 def predict_ai_behavior():
     """AI-powered behavior prediction endpoint"""
     try:
-        if model is None:
+        if predictor is None:
             return jsonify({
                 'error': 'AI model not loaded',
                 'trust_score': 0,
@@ -238,10 +369,25 @@ def predict_ai_behavior():
                 'method': 'ai'
             }), 500
         
+        if body_too_large(request.content_length):
+            return payload_too_large(MAX_BODY_BYTES)
+        
+        raw_body = read_body()
+        
+        # Identical snapshots re-posted while waiting in the queue are served from cache,
+        # keyed on the raw body so a hit skips decoding as well as scoring. Only bodies
+        # that decoded and scored successfully are ever stored.
+        cache_key = payload_key(raw_body) if score_cache is not None else None
+        if cache_key is not None:
+            cached = score_cache.get(cache_key)
+            if cached is not None:
+                return jsonify(dict(cached, cached=True))
+        
         # Get behavior data from request
-        behavior_data = request.json
+        # JSON or the columnar binary format (behavior_wire.py), by Content-Type
+        behavior_data = decode_request(raw_body, request.mimetype)
         
-        if not behavior_data:
+        if not behavior_data or not isinstance(behavior_data, dict):
             return jsonify({
                 'error': 'No behavior data provided',
                 'trust_score': 0,
@@ -250,11 +396,10 @@ def predict_ai_behavior():
                 'method': 'ai'
             }), 400
         
-        print(f"🤖 Received behavior data: {len(str(behavior_data))} characters")
+        logger.debug("🤖 Received behavior data: %s bytes", request.content_length)
         
-        # Extract features manually
-        features = extract_behavior_features(behavior_data)
-        if features is None:
+        result = score_behavior(behavior_data)
+        if result is None:
             return jsonify({
                 'error': 'Feature extraction failed',
                 'trust_score': 0,
@@ -263,32 +408,163 @@ def predict_ai_behavior():
                 'method': 'ai'
             }), 500
         
-        # Make prediction
-        features_reshaped = features.reshape(1, -1)
-        prediction = model.predict(features_reshaped)[0]
-        confidence = model.predict_proba(features_reshaped)[0].max()
+        if cache_key is not None:
+            score_cache.put(cache_key, result)
+        log_sampled_request(behavior_data, request.content_length, result)
+        return jsonify(result)
         
-        # Convert to trust score (0-100)
-        if prediction == 1:  # Human
-            trust_score = int(confidence * 100)
-            prediction_label = 'human'
-        else:  # Bot
-            trust_score = int((1 - confidence) * 100)
-            prediction_label = 'bot'
+    except RequestEntityTooLarge:
+        return payload_too_large(MAX_BODY_BYTES)
+    except BatchTimeout:
+        return scoring_timed_out()
+    except Exception as e:
+        logger.error("❌ Prediction error: %s", e)
+        return jsonify({
+            'error': str(e),
+            'trust_score': 0,
+            'prediction': 'bot',
+            'confidence': 0,
+            'method': 'ai'
+        }), 500
+
+@app.route('/predict-ai/batch', methods=['POST'])
+def predict_ai_behavior_batch():
+    """Score many behavior sessions with one model call, results in input order"""
+    try:
+        if predictor is None:
+            return jsonify({
+                'error': 'AI model not loaded',
+                'results': [],
+                'method': 'ai'
+            }), 500
+        
+        # Only this endpoint accepts bodies above the app-wide MAX_BODY_BYTES
+        request.max_content_length = MAX_BATCH_BODY_BYTES
+        if body_too_large(request.content_length, MAX_BATCH_BODY_BYTES):
+            return jsonify({
+                'error': f'Request body too large (max {MAX_BATCH_BODY_BYTES} bytes)',
+                'results': [],
+                'method': 'ai'
+            }), 413
+        
+        # Accept either {"sessions": [...]} or a bare list of sessions
+        sessions = decode_batch(read_body(MAX_BATCH_BODY_BYTES))
+        
+        if not sessions or not isinstance(sessions, list):
+            return jsonify({
+                'error': 'No behavior sessions provided',
+                'results': [],
+                'method': 'ai'
+            }), 400
+        
+        if len(sessions) > BATCH_MAX_SESSIONS:
+            return jsonify({
+                'error': f'Too many sessions in batch (max {BATCH_MAX_SESSIONS})',
+                'results': [],
+                'method': 'ai'
+            }), 413
+        
+        logger.debug("🤖 Received behavior batch: %d sessions", len(sessions))
+        
+        # Build one feature matrix; sessions that fail extraction are skipped
+        feature_matrix = np.zeros((len(sessions), FEATURE_COUNT))
+        extracted = np.zeros(len(sessions), dtype=bool)
+        truncations = {}
+        for i, session in enumerate(sessions):
+            features = None
+            if isinstance(session, dict):
+                session, truncated = cap_events(session)
+                features = extract_behavior_features(session, truncated)
+                if truncated:
+                    truncations[i] = truncated
+            if features is not None:
+                feature_matrix[i] = features
+                extracted[i] = True
+        
+        results = [{
+            'error': 'Feature extraction failed',
+            'trust_score': 0,
+            'prediction': 'bot',
+            'confidence': 0,
+            'method': 'ai'
+        } for _ in sessions]
+        
+        if extracted.any():
+            scored = score_feature_matrix(feature_matrix[extracted])
+            for i, result in zip(np.flatnonzero(extracted), scored):
+                results[i] = result
+            for i, truncated in truncations.items():
+                results[i]['truncated'] = truncated
         
-        print(f"🎯 AI Prediction: {prediction_label} (confidence: {confidence:.3f}, trust: {trust_score}%)")
+        logger.debug("🎯 AI batch scored: %d/%d sessions", extracted.sum(), len(sessions))
         
         return jsonify({
-            'trust_score': trust_score,
-            'prediction': prediction_label,
-            'confidence': float(confidence),
+            'results': results,
+            'count': len(results),
+            'scored': int(extracted.sum()),
             'method': 'ai',
-            'features_extracted': len(features),
-            'model_type': 'RandomForest'
+            'model_type': served_model_type()
         })
         
+    except RequestEntityTooLarge:
+        return jsonify({
+            'error': f'Request body too large (max {MAX_BATCH_BODY_BYTES} bytes)',
+            'results': [],
+            'method': 'ai'
+        }), 413
+    except Exception as e:
+        logger.error("❌ Batch prediction error: %s", e)
+        return jsonify({
+            'error': str(e),
+            'results': [],
+            'method': 'ai'
+        }), 500
+
+@app.route('/track-delta', methods=['POST'])
+def track_behavior_delta():
+    """Incremental prediction: post only the events recorded since the last call.
+    
+    Body: {"sessionId": "...", "seq": 3, "mouseMovements": [...new events...], ..., "pageViewTime": ...}
+    Event lists are appended to the session; scalar fields replace the previous values.
+    seq numbers the session's deltas from 0, and seq 0 starts the session over. A delta
+    this worker cannot append (one was lost, repeated, or went to another worker) gets
+    a 409 and the client resends everything recorded so far as seq 0.
+    """
+    try:
+        if predictor is None:
+            return jsonify({
+                'error': 'AI model not loaded',
+                'trust_score': 0,
+                'prediction': 'bot',
+                'confidence': 0,
+                'method': 'ai'
+            }), 500
+        
+        if body_too_large(request.content_length):
+            return payload_too_large(MAX_BODY_BYTES)
+        
+        delta = decode_request(read_body(), request.mimetype)
+        
+        error = invalid_delta(delta)
+        if error:
+            return jsonify({
+                'error': error,
+                'trust_score': 0,
+                'prediction': 'bot',
+                'confidence': 0,
+                'method': 'ai'
+            }), 400
+        
+        return jsonify(track_delta(delta))
+        
+    except SequenceGap as e:
+        return jsonify(sequence_gap_body(e)), 409
+    except RequestEntityTooLarge:
+        return payload_too_large(MAX_BODY_BYTES)
+    except BatchTimeout:
+        return scoring_timed_out()
     except Exception as e:
-        print(f"❌ Prediction error: {e}")
+        logger.error("❌ Delta prediction error: %s", e)
         return jsonify({
             'error': str(e),
             'trust_score': 0,
@@ -300,33 +576,13 @@ def predict_ai_behavior():
 @app.route('/model-info', methods=['GET'])
 def model_info():
     """Get information about the loaded AI model"""
-    if model is None:
+    if predictor is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
-    return jsonify({
-        'model_type': type(model).__name__,
-        'feature_count': 62,  # Fixed feature count
-        'status': 'loaded',
-        'features': [
-            'mouse_moves', 'clicks', 'keystrokes', 'form_interactions', 'page_view_time', 'suspicious_patterns',
-            'mouse_velocity_mean', 'mouse_velocity_std', 'mouse_velocity_min', 'mouse_velocity_max',
-            'mouse_accel_mean', 'mouse_accel_std', 'mouse_accel_min', 'mouse_accel_max',
-            'fast_movements', 'slow_movements', 'high_pressure_moves', 'mouse_jitter',
-            'keystroke_interval_mean', 'keystroke_interval_std', 'keystroke_interval_min', 'keystroke_interval_max',
-            'letter_keys', 'number_keys', 'punctuation_keys', 'correction_keys',
-            'typing_speed', 'fast_typing', 'slow_typing', 'keystroke_pressure_std',
-            'click_interval_mean', 'click_interval_std', 'click_interval_min', 'click_interval_max',
-            'double_clicks', 'right_clicks', 'click_accuracy_mean', 'click_pressure_mean',
-            'edge_clicks', 'top_clicks', 'fast_clicks', 'slow_clicks',
-            'focus_time_mean', 'focus_time_std', 'dwell_time_mean', 'dwell_time_std',
-            'input_interactions', 'select_interactions', 'textarea_interactions', 'change_count',
-            'filled_fields', 'avg_input_length', 'tab_navigation', 'validation_errors',
-            'scroll_distance', 'idle_time', 'focus_events', 'blur_events',
-            'mouse_jitter_metric', 'irregular_patterns', 'click_accuracy_metric', 'typing_rhythm'
-        ]
-    })
+    return jsonify(model_details())
 
 if __name__ == '__main__':
+    configure_logging()
     print("🚀 Starting AI Behavior Detection API...")
     
     # Load the AI model
@@ -334,10 +590,16 @@ if __name__ == '__main__':
         print("❌ Failed to load AI model. Exiting...")
         sys.exit(1)
     
-    print("🌐 API Server starting on http://localhost:5001")
+    port = int(os.environ.get('AI_API_PORT', 5001))
+    debug = os.environ.get('AI_API_DEBUG', '0') == '1'
+    
+    print(f"🌐 API Server starting on http://localhost:{port}")
     print("📊 Endpoints:")
     print("  - GET /health - Health check")
     print("  - POST /predict-ai - AI behavior prediction")
+    print("  - POST /predict-ai/batch - AI behavior prediction for many sessions")
+    print("  - POST /track-delta - Incremental AI prediction from new session events")
     print("  - GET /model-info - Model information")
+    print("ℹ️  Development server only - use scripts/serve_behavior_api.py in production")
     
-    app.run(host='0.0.0.0', port=5001, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=debug, use_reloader=debug)
\ No newline at end of file
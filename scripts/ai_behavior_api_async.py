@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+AI Behavior Detection API (asyncio variant)
+Same /health, /predict-ai, /track-delta and /model-info contract as ai_behavior_api.py, served by aiohttp.
+Connections are handled on the event loop; feature extraction and inference run in a
+bounded executor, and requests beyond the queue limit are rejected with 503 instead of piling up.
+
+Usage:
+    python scripts/ai_behavior_api_async.py --executor thread --pool-size 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ai_behavior_api
+from micro_batcher import BatchTimeout
+from score_cache import payload_key
+from session_accumulator import SequenceGap
+
+try:
+    from aiohttp import web
+except ImportError:  # aiohttp is only needed for the asyncio server
+    web = None
+
+
+def _init_process_worker(model_path):
+    """Process pool initializer: reuse the forked model, load it only if missing"""
+    # Each process scores one request at a time, so waiting for a micro-batch only adds latency
+    ai_behavior_api.batcher = None
+    if ai_behavior_api.predictor is None:
+        ai_behavior_api.load_model(model_path)
+
+
+def _error(message, status):
+    return web.json_response({
+        'error': message,
+        'trust_score': 0,
+        'prediction': 'bot',
+        'confidence': 0,
+        'method': 'ai'
+    }, status=status)
+
+
+class AsyncBehaviorAPI:
+    """aiohttp application with a bounded executor for CPU-bound scoring"""
+
+    def __init__(self, executor, pool_size, max_pending):
+        self.executor = executor
+        self.slots = asyncio.Semaphore(pool_size)
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+
+    def build_app(self):
+        app = web.Application(client_max_size=ai_behavior_api.MAX_BODY_BYTES)
+        app.router.add_get('/health', self.health_check)
+        app.router.add_post('/predict-ai', self.predict_ai_behavior)
+        app.router.add_post('/track-delta', self.track_behavior_delta)
+        app.router.add_get('/model-info', self.model_info)
+        app.on_response_prepare.append(self._add_cors_headers)
+        app.router.add_route('OPTIONS', '/{tail:.*}', self._preflight)
+        return app
+
+    async def _add_cors_headers(self, request, response):
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+
+    async def _preflight(self, request):
+        return web.Response()
+
+    async def health_check(self, request):
+        """Health check endpoint"""
+        status = ai_behavior_api.health_status()
+        status['async'] = {
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'rejected': self.rejected
+        }
+        return web.json_response(status)
+
+    async def model_info(self, request):
+        """Get information about the loaded AI model"""
+        if ai_behavior_api.predictor is None:
+            return web.json_response({'error': 'Model not loaded'}, status=500)
+        return web.json_response(ai_behavior_api.model_details())
+
+    async def predict_ai_behavior(self, request):
+        """AI-powered behavior prediction endpoint"""
+        if ai_behavior_api.predictor is None:
+            return _error('AI model not loaded', 500)
+
+        # Backpressure: shed load early rather than growing an unbounded queue
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            return _error('Server busy, retry shortly', 503)
+
+        if ai_behavior_api.body_too_large(request.content_length):
+            return _error(f'Request body too large (max {ai_behavior_api.MAX_BODY_BYTES} bytes)', 413)
+
+        self.pending += 1
+        try:
+            body = await request.read()
+
+            # Cache hits skip decoding as well as scoring
+            cache = ai_behavior_api.score_cache
+            cache_key = payload_key(body) if cache is not None else None
+            if cache_key is not None:
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return web.json_response(dict(cached, cached=True))
+
+            behavior_data = ai_behavior_api.decode_request(body, request.content_type)
+
+            if not behavior_data or not isinstance(behavior_data, dict):
+                return _error('No behavior data provided', 400)
+
+            async with self.slots:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self.executor, ai_behavior_api.score_behavior, behavior_data)
+
+            if result is None:
+                return _error('Feature extraction failed', 500)
+
+            if cache_key is not None:
+                cache.put(cache_key, result)
+            ai_behavior_api.log_sampled_request(behavior_data, len(body), result)
+            return web.json_response(result)
+
+        except web.HTTPRequestEntityTooLarge:
+            return _error(f'Request body too large (max {ai_behavior_api.MAX_BODY_BYTES} bytes)', 413)
+        except BatchTimeout:
+            return _error('Scoring timed out, retry shortly', 503)
+        except Exception as e:
+            ai_behavior_api.logger.error("❌ Prediction error: %s", e)
+            return _error(str(e), 500)
+        finally:
+            self.pending -= 1
+
+    async def track_behavior_delta(self, request):
+        """Incremental prediction from the events recorded since the last call"""
+        if ai_behavior_api.predictor is None:
+            return _error('AI model not loaded', 500)
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            return _error('Server busy, retry shortly', 503)
+
+        if ai_behavior_api.body_too_large(request.content_length):
+            return _error(f'Request body too large (max {ai_behavior_api.MAX_BODY_BYTES} bytes)', 413)
+
+        self.pending += 1
+        try:
+            delta = ai_behavior_api.decode_request(await request.read(), request.content_type)
+
+            error = ai_behavior_api.invalid_delta(delta)
+            if error:
+                return _error(error, 400)
+
+            # Session state lives in this process, so keep it off the process pool
+            async with self.slots:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(None, ai_behavior_api.track_delta, delta)
+            return web.json_response(result)
+
+        except SequenceGap as e:
+            return web.json_response(ai_behavior_api.sequence_gap_body(e), status=409)
+        except web.HTTPRequestEntityTooLarge:
+            return _error(f'Request body too large (max {ai_behavior_api.MAX_BODY_BYTES} bytes)', 413)
+        except BatchTimeout:
+            return _error('Scoring timed out, retry shortly', 503)
+        except Exception as e:
+            ai_behavior_api.logger.error("❌ Delta prediction error: %s", e)
+            return _error(str(e), 500)
+        finally:
+            self.pending -= 1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Serve the AI Behavior Detection API with asyncio')
+    parser.add_argument('--host', default=os.environ.get('AI_API_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('AI_API_PORT', 5001)))
+    parser.add_argument('--executor', choices=['thread', 'process'], default=os.environ.get('AI_ASYNC_EXECUTOR', 'thread'),
+                        help='Where feature extraction and inference run')
+    parser.add_argument('--pool-size', type=int, default=int(os.environ.get('AI_ASYNC_POOL_SIZE', os.cpu_count() or 2)),
+                        help='Concurrent scoring jobs')
+    parser.add_argument('--max-pending', type=int, default=int(os.environ.get('AI_ASYNC_MAX_PENDING', 256)),
+                        help='In-flight /predict-ai requests before answering 503')
+    parser.add_argument('--model-path', default=None, help='Override AI_MODEL_PATH')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if web is None:
+        print("❌ aiohttp is not installed (pip install aiohttp)")
+        sys.exit(1)
+
+    ai_behavior_api.configure_logging()
+    print("🚀 Starting AI Behavior Detection API (asyncio)...")
+
+    if not ai_behavior_api.load_model(args.model_path):
+        print("❌ Failed to load AI model. Exiting...")
+        sys.exit(1)
+
+    if args.executor == 'process':
+        # Created after the model is loaded so forked workers inherit it
+        executor = ProcessPoolExecutor(
+            max_workers=args.pool_size,
+            initializer=_init_process_worker,
+            initargs=(args.model_path,)
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=args.pool_size, thread_name_prefix='scoring')
+
+    api = AsyncBehaviorAPI(executor, args.pool_size, args.max_pending)
+
+    print(f"🌐 API Server starting on http://{args.host}:{args.port} "
+          f"({args.executor} pool x {args.pool_size}, max pending {args.max_pending})")
+    web.run_app(api.build_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Vectorized Behavior Feature Extraction
+Turns /predict-ai behavior payloads into the 62-feature vector used by the AI model.
+
+This module is the single feature schema shared by training (ai_training/train_behavior_model.py)
+and serving (ai_behavior_api.py). Training sessions from generate_training_data.py are mapped onto
+the payload shape with session_to_payload() before extraction, and model artifacts record
+FEATURE_SCHEMA_VERSION so the API can tell whether a model was trained on the vectors it serves.
+Bump the version whenever a feature, its order or its input fields change.
+"""
+
+from collections import Counter
+from itertools import repeat
+from operator import attrgetter
+
+import numpy as np
+
+# 1 was the separate snake_case extractor that used to live in train_behavior_model.py
+FEATURE_SCHEMA_VERSION = 2
+
+FEATURE_COUNT = 62
+
+FEATURE_NAMES = [
+    'mouse_moves', 'clicks', 'keystrokes', 'form_interactions', 'page_view_time', 'suspicious_patterns',
+    'mouse_velocity_mean', 'mouse_velocity_std', 'mouse_velocity_min', 'mouse_velocity_max',
+    'mouse_accel_mean', 'mouse_accel_std', 'mouse_accel_min', 'mouse_accel_max',
+    'fast_movements', 'slow_movements', 'high_pressure_moves', 'mouse_jitter',
+    'keystroke_interval_mean', 'keystroke_interval_std', 'keystroke_interval_min', 'keystroke_interval_max',
+    'letter_keys', 'number_keys', 'punctuation_keys', 'correction_keys',
+    'typing_speed', 'fast_typing', 'slow_typing', 'keystroke_pressure_std',
+    'click_interval_mean', 'click_interval_std', 'click_interval_min', 'click_interval_max',
+    'double_clicks', 'right_clicks', 'click_accuracy_mean', 'click_pressure_mean',
+    'edge_clicks', 'top_clicks', 'fast_clicks', 'slow_clicks',
+    'focus_time_mean', 'focus_time_std', 'dwell_time_mean', 'dwell_time_std',
+    'input_interactions', 'select_interactions', 'textarea_interactions', 'change_count',
+    'filled_fields', 'avg_input_length', 'tab_navigation', 'validation_errors',
+    'scroll_distance', 'idle_time', 'focus_events', 'blur_events',
+    'mouse_jitter_metric', 'irregular_patterns', 'click_accuracy_metric', 'typing_rhythm'
+]
+
+# Features that are counts (or sums) over one event stream and grow with its length,
+# by payload key. Used to scale features back up when a stream is truncated.
+STREAM_COUNT_FEATURES = {
+    'mouseMovements': [0, 14, 15, 16],
+    'keystrokes': [2, 22, 23, 24, 25, 26, 27, 28],
+    'clicks': [1, 34, 35, 38, 39, 40, 41],
+    'formInteractions': [3, 46, 47, 48, 49, 50, 52, 53],
+    'focusEvents': [56],
+    'blurEvents': [57],
+}
+
+NAN = float('nan')
+
+# Numeric per-event fields read by the extractor, with the value used when a field is missing
+EVENT_FIELDS = {
+    'mouseMovements': (('velocity', 0), ('acceleration', 0), ('pressure', 0), ('jitter', 0)),
+    'keystrokes': (('timestamp', NAN), ('pressure', 0)),
+    'clicks': (('timestamp', NAN), ('accuracy', 0.5), ('pressure', 0), ('x', 0), ('y', 0), ('duration', 0)),
+    'formInteractions': (('focusTime', 0), ('dwellTime', 0), ('changeCount', 0), ('tabOrder', 0),
+                         ('validationErrors', 0)),
+}
+
+# Per-event fields the extractor only counts by value
+EVENT_CATEGORIES = {
+    'keystrokes': (('key', ''),),
+    'clicks': (('clickType', None), ('button', None)),
+    'formInteractions': (('interactionType', None), ('value', '')),
+}
+
+# Session-level scalar fields, with the value used when a field is missing
+SCALAR_FIELDS = (
+    ('pageViewTime', 0), ('suspiciousPatternCount', 0), ('scrollDistance', 0), ('idleTime', 0),
+    ('mouseJitter', 0), ('irregularPatterns', 0), ('clickAccuracy', 0.5), ('typingRhythm', 0.5)
+)
+
+# Streams whose events are only counted
+COUNTED_STREAMS = ('focusEvents', 'blurEvents')
+
+
+class ColumnarEvents:
+    """An event stream held as one array per field instead of one object per event.
+
+    Numeric fields are NumPy arrays (typically views into a request buffer, see
+    behavior_wire.py); categorical fields are integer codes into a list of
+    distinct values. Supports len(), slicing and take() so payload caps apply.
+    """
+
+    def __init__(self, length, columns=None, categories=None):
+        self.length = length
+        self.columns = columns or {}
+        self.categories = categories or {}
+
+    def __len__(self):
+        return self.length
+
+    def column(self, name, default):
+        values = self.columns.get(name)
+        if values is None:
+            return np.full(self.length, default, dtype=np.float64)
+        return values.astype(np.float64, copy=False)
+
+    def counts(self, name, default):
+        if name not in self.categories:
+            return Counter({default: self.length}) if self.length else Counter()
+        codes, values = self.categories[name]
+        return Counter({values[i]: int(n) for i, n in enumerate(np.bincount(codes, minlength=len(values))) if n})
+
+    def _select(self, index, length):
+        return ColumnarEvents(
+            length,
+            {name: values[index] for name, values in self.columns.items()},
+            {name: (codes[index], values) for name, (codes, values) in self.categories.items()}
+        )
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("ColumnarEvents only supports slicing")
+        return self._select(index, len(range(*index.indices(self.length))))
+
+    def take(self, indices):
+        indices = np.asarray(indices, dtype=np.intp)
+        return self._select(indices, len(indices))
+
+
+def _values(events, name, default):
+    """Iterate one field over a list of events (JSON dicts or typed records with defaults)"""
+    if type(events[0]) is dict:
+        return map(dict.get, events, repeat(name, len(events)), repeat(default, len(events)))
+    return map(attrgetter(name), events)
+
+
+def _columns(events, fields):
+    """Read the (name, default) fields of every event into float64 columns, one per field"""
+    if isinstance(events, ColumnarEvents):
+        return [events.column(name, default) for name, default in fields]
+    return [
+        np.fromiter(_values(events, name, default), dtype=np.float64, count=len(events))
+        for name, default in fields
+    ]
+
+
+def _hashable(value):
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return str(value)
+
+
+def _counts(events, name, default):
+    """Occurrences of each distinct value of a field"""
+    if isinstance(events, ColumnarEvents):
+        return events.counts(name, default)
+    try:
+        return Counter(_values(events, name, default))
+    except TypeError:
+        # Lists and objects are valid JSON values but unhashable: count them by their
+        # text, which compares and measures (len(str(value))) like the original loops
+        return Counter(map(_hashable, _values(events, name, default)))
+
+
+def _intervals(timestamps):
+    """Gaps between consecutive events, skipping pairs where either timestamp is missing"""
+    gaps = np.diff(timestamps)
+    return gaps[~np.isnan(gaps)]
+
+
+def _stats(values):
+    return values.mean(), values.std(), values.min(), values.max()
+
+
+def _key_classes(key_counts):
+    """Count letter / number / punctuation / correction keys from the distinct keys only"""
+    letters = numbers = punctuation = 0
+    for key, count in key_counts.items():
+        if key.isalpha():
+            letters += count
+        if key in '0123456789':
+            numbers += count
+        if key in ' .,!?':
+            punctuation += count
+    corrections = key_counts['Backspace'] + key_counts['Delete']
+    return letters, numbers, punctuation, corrections
+
+
+def extract_features(behavior_data):
+    """Extract the 62 AI features from a behavior payload.
+
+    Each event field is read once into a columnar NumPy array and every feature
+    is then computed with array operations. Event lists may hold JSON dicts or
+    typed records (payload_decoder.py), or be ColumnarEvents (behavior_wire.py). The output matches the
+    original per-feature list comprehension implementation.
+    """
+    features = np.zeros(FEATURE_COUNT, dtype=np.float64)
+
+    mouse_movements = behavior_data.get('mouseMovements', [])
+    clicks_data = behavior_data.get('clicks', [])
+    keystrokes_data = behavior_data.get('keystrokes', [])
+    form_data = behavior_data.get('formInteractions', [])
+    page_view_time = behavior_data.get('pageViewTime', 0)
+
+    # Basic metrics (features 0-5)
+    features[0:6] = (
+        len(mouse_movements),
+        len(clicks_data),
+        len(keystrokes_data),
+        len(form_data),
+        page_view_time,
+        behavior_data.get('suspiciousPatternCount', 0)
+    )
+
+    # Mouse movement analysis (features 6-17)
+    if mouse_movements:
+        velocity, acceleration, pressure, jitter = _columns(mouse_movements, EVENT_FIELDS['mouseMovements'])
+        features[6:10] = _stats(velocity)
+        features[10:14] = _stats(acceleration)
+        features[14:18] = (
+            np.count_nonzero(velocity > 1000),  # Fast movements
+            np.count_nonzero(velocity < 10),    # Slow movements
+            np.count_nonzero(pressure > 0.5),   # High pressure
+            jitter.sum() / len(jitter)
+        )
+
+    # Keystroke analysis (features 18-29)
+    if len(keystrokes_data) > 1:
+        timestamps, key_pressure = _columns(keystrokes_data, EVENT_FIELDS['keystrokes'])
+        intervals = _intervals(timestamps)
+
+        if len(intervals):
+            features[18:22] = _stats(intervals)
+            features[22:26] = _key_classes(_counts(keystrokes_data, 'key', ''))
+            features[26:30] = (
+                len(keystrokes_data) / (page_view_time / 1000) if page_view_time > 0 else 0,
+                np.count_nonzero(intervals < 100),   # Very fast typing
+                np.count_nonzero(intervals > 2000),  # Very slow typing
+                key_pressure.std()
+            )
+
+    # Click analysis (features 30-41)
+    if clicks_data:
+        click_types = _counts(clicks_data, 'clickType', None)
+        buttons = _counts(clicks_data, 'button', None)
+        timestamps, accuracy, pressure, x, y, duration = _columns(clicks_data, EVENT_FIELDS['clicks'])
+
+        click_intervals = _intervals(timestamps)
+        if len(click_intervals):
+            features[30:34] = _stats(click_intervals)
+
+        features[34:42] = (
+            click_types['double'],
+            buttons[2],
+            accuracy.mean(),
+            pressure.sum() / len(pressure),
+            np.count_nonzero(x < 100),         # Edge clicks
+            np.count_nonzero(y < 100),         # Top clicks
+            np.count_nonzero(duration < 50),   # Fast clicks
+            np.count_nonzero(duration > 500)   # Slow clicks
+        )
+
+    # Form interaction analysis (features 42-53)
+    if form_data:
+        interaction_types = _counts(form_data, 'interactionType', None)
+        values = _counts(form_data, 'value', '')
+        focus_time, dwell_time, change_count, tab_order, validation_errors = _columns(
+            form_data, EVENT_FIELDS['formInteractions']
+        )
+        input_length_total = sum(len(str(value)) * count for value, count in values.items())
+
+        features[42:54] = (
+            focus_time.mean(),
+            focus_time.std(),
+            dwell_time.mean(),
+            dwell_time.std(),
+            interaction_types['input'],
+            interaction_types['select'],
+            interaction_types['textarea'],
+            change_count.sum(),
+            len(form_data) - values[''],          # Filled fields
+            input_length_total / len(form_data),  # Average input length
+            np.count_nonzero(tab_order > 0),      # Tab navigation
+            validation_errors.sum()
+        )
+
+    # Additional behavioral metrics (features 54-61)
+    features[54:62] = (
+        behavior_data.get('scrollDistance', 0),
+        behavior_data.get('idleTime', 0),
+        len(behavior_data.get('focusEvents', [])),
+        len(behavior_data.get('blurEvents', [])),
+        behavior_data.get('mouseJitter', 0),
+        behavior_data.get('irregularPatterns', 0),
+        behavior_data.get('clickAccuracy', 0.5),
+        behavior_data.get('typingRhythm', 0.5)
+    )
+
+    return features
+
+
+def extract_feature_matrix(payloads):
+    """Extract features for many payloads into one preallocated (n, FEATURE_COUNT) float64 matrix"""
+    matrix = np.empty((len(payloads), FEATURE_COUNT), dtype=np.float64)
+    for i, behavior_data in enumerate(payloads):
+        matrix[i] = extract_features(behavior_data)
+    return matrix
+
+
+def _form_interaction(field):
+    """One generated form field summary as a payload form interaction"""
+    focus_time = field.get('focusTime', 0)
+    return {
+        'interactionType': 'textarea' if field.get('fieldType') == 'message' else 'input',
+        'focusTime': focus_time,
+        'dwellTime': field.get('completionTime', focus_time) - focus_time,
+        'changeCount': field.get('inputCount', 0),
+        'value': field.get('finalValue', ''),
+        'tabOrder': field.get('tabOrder', 0),
+        'validationErrors': field.get('corrections', 0)
+    }
+
+
+def session_to_payload(session):
+    """Map a training session (generate_training_data.py, snake_case) onto the /predict-ai payload shape.
+
+    Payloads that are already in the API shape are returned unchanged, so recorded
+    API traffic can be used as training data as well.
+    """
+    if 'mouse_movements' not in session and 'session_duration' not in session:
+        return session
+
+    metrics = session.get('metrics', {})
+    window_events = session.get('window_events', [])
+    form_interactions = session.get('form_interactions', {})
+    if isinstance(form_interactions, dict):
+        form_interactions = [_form_interaction(field) for field in form_interactions.values()]
+
+    return {
+        'mouseMovements': session.get('mouse_movements', []),
+        'keystrokes': session.get('keystrokes', []),
+        'clicks': session.get('clicks', []),
+        'formInteractions': form_interactions,
+        'pageViewTime': session.get('session_duration', 0),
+        'suspiciousPatternCount': len(session.get('suspicious_patterns', [])),
+        'scrollDistance': sum(abs(event.get('deltaY', 0)) for event in session.get('scroll_events', [])),
+        'focusEvents': [event for event in window_events if event.get('type') == 'focus'],
+        'blurEvents': [event for event in window_events if event.get('type') == 'blur'],
+        'mouseJitter': metrics.get('mouse_jitter', 0),
+        'clickAccuracy': metrics.get('click_accuracy', 0.5),
+        'typingRhythm': metrics.get('typing_rhythm_consistency', 0.5)
+    }
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Columnar Binary Wire Format for Behavior Payloads
+Sends each event stream as typed arrays (one per field the extractor reads) with
+delta-encoded timestamps, dictionary-encoded categorical fields and optional deflate,
+and decodes them zero-copy into NumPy with np.frombuffer.
+
+Layout (little-endian):
+    magic       4 bytes   b'BHVC'
+    version     uint8     1
+    flags       uint8     bit 0: body is deflate (zlib) compressed
+    reserved    uint16
+    header_len  uint32
+    header      UTF-8 JSON, see below
+    body        column buffers, each starting on an 8-byte boundary
+
+Header:
+    {"fields": {"pageViewTime": 61234, "sessionId": "...", ...},
+     "streams": {"keystrokes": {"length": 120, "columns": [
+         {"name": "timestamp", "dtype": "<i4", "offset": 0, "delta_base": 1700000000000},
+         {"name": "pressure", "dtype": "<f4", "offset": 480},
+         {"name": "key", "dtype": "|u1", "offset": 960, "categories": ["h", "i", "Backspace"]}]},
+      "focusEvents": {"length": 3, "columns": []}}}
+
+Delta columns hold the gap to the previous event (the first gap is 0 from delta_base).
+Streams that are only counted (focusEvents, blurEvents) carry a length and no columns.
+src/utils/behaviorWireFormat.js is the browser-side encoder.
+"""
+
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from behavior_features import COUNTED_STREAMS, EVENT_CATEGORIES, EVENT_FIELDS, ColumnarEvents, _columns, _values
+
+WIRE_CONTENT_TYPE = 'application/vnd.behavior-columns'
+MAGIC = b'BHVC'
+WIRE_VERSION = 1
+FLAG_DEFLATE = 1
+PREAMBLE = struct.Struct('<4sBBHI')
+
+ALLOWED_DTYPES = {'<f4', '<f8', '<i4', '<i8', '|u1', '<u2', '<u4'}
+CODE_DTYPES = {'|u1', '<u2', '<u4'}
+MAX_STREAM_LENGTH = 2 ** 31 - 1
+
+# Upper bound on the inflated body of a compressed payload
+MAX_DECOMPRESSED_BYTES = int(os.environ.get('AI_MAX_DECOMPRESSED_BYTES', 16 * 1024 * 1024))
+
+
+def _timestamp_column(values):
+    """Delta-encode integral millisecond timestamps into int32 when they fit"""
+    if len(values) and np.isfinite(values).all() and (values == np.round(values)).all():
+        deltas = np.diff(values, prepend=values[0])
+        if np.abs(deltas).max() < 2 ** 31:
+            return deltas.astype('<i4'), float(values[0])
+    return values.astype('<f8'), None
+
+
+def _category_codes(values):
+    """Dictionary-encode a sequence: (codes, distinct values in first-seen order)"""
+    index = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    dtype = '|u1' if len(index) <= 2 ** 8 else '<u2' if len(index) <= 2 ** 16 else '<u4'
+    return np.asarray(codes, dtype=dtype), list(index)
+
+
+def encode_behavior(behavior_data, compress=False, precise=False):
+    """Encode a behavior payload dict (event lists of dicts) into the wire format.
+
+    Only fields the extractor reads are sent. Numeric fields go out as float32
+    unless precise is set; timestamps are delta-encoded (or float64 if they
+    are not whole milliseconds).
+    """
+    float_dtype = '<f8' if precise else '<f4'
+    header = {'fields': {}, 'streams': {}}
+    buffers = []
+    size = 0
+
+    def append(array):
+        nonlocal size
+        padding = -size % 8
+        if padding:
+            buffers.append(b'\0' * padding)
+            size += padding
+        offset = size
+        buffers.append(array.tobytes())
+        size += array.nbytes
+        return offset
+
+    for name, value in behavior_data.items():
+        if name not in EVENT_FIELDS and name not in COUNTED_STREAMS:
+            header['fields'][name] = value
+
+    for name in (*EVENT_FIELDS, *COUNTED_STREAMS):
+        events = behavior_data.get(name)
+        if events is None:
+            continue
+        if not isinstance(events, list):
+            raise ValueError(f"{name} must be a list")
+
+        columns = []
+        if events and name in EVENT_FIELDS:
+            for (field, _), values in zip(EVENT_FIELDS[name], _columns(events, EVENT_FIELDS[name])):
+                column = {'name': field}
+                if field == 'timestamp':
+                    values, base = _timestamp_column(values)
+                    if base is not None:
+                        column['delta_base'] = base
+                else:
+                    values = values.astype(float_dtype)
+                column.update(dtype=values.dtype.str, offset=append(values))
+                columns.append(column)
+
+            for field, default in EVENT_CATEGORIES.get(name, ()):
+                codes, categories = _category_codes(_values(events, field, default))
+                columns.append({'name': field, 'dtype': codes.dtype.str, 'offset': append(codes),
+                                'categories': categories})
+
+        header['streams'][name] = {'length': len(events), 'columns': columns}
+
+    body = b''.join(buffers)
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 6)
+        flags |= FLAG_DEFLATE
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode()
+    return PREAMBLE.pack(MAGIC, WIRE_VERSION, flags, 0, len(header_bytes)) + header_bytes + body
+
+
+def _decode_stream(name, spec, body):
+    length = spec.get('length')
+    if not isinstance(length, int) or not 0 <= length <= MAX_STREAM_LENGTH:
+        raise ValueError(f"Invalid length for {name}")
+
+    numeric = {field for field, _ in EVENT_FIELDS.get(name, ())}
+    categorical = {field for field, _ in EVENT_CATEGORIES.get(name, ())}
+    columns, categories = {}, {}
+
+    column_specs = spec.get('columns', [])
+    if not isinstance(column_specs, list) or not all(isinstance(column, dict) for column in column_specs):
+        raise ValueError(f"Invalid columns for {name}")
+
+    for column in column_specs:
+        field, dtype, offset = column.get('name'), column.get('dtype'), column.get('offset')
+        if field not in numeric and field not in categorical:
+            raise ValueError(f"Unknown column {name}.{field}")
+        if dtype not in ALLOWED_DTYPES or not isinstance(offset, int) or offset < 0:
+            raise ValueError(f"Invalid column spec for {name}.{field}")
+        if offset + length * np.dtype(dtype).itemsize > len(body):
+            raise ValueError(f"Column {name}.{field} overruns the body")
+
+        values = np.frombuffer(body, dtype=dtype, count=length, offset=offset)
+        if field in categorical:
+            values_list = column.get('categories')
+            if dtype not in CODE_DTYPES or not isinstance(values_list, list) or \
+                    (length and int(values.max()) >= len(values_list)):
+                raise ValueError(f"Invalid categories for {name}.{field}")
+            categories[field] = (values, values_list)
+        elif 'delta_base' in column:
+            timestamps = np.cumsum(values, dtype=np.float64)
+            timestamps += float(column['delta_base'])
+            columns[field] = timestamps
+        else:
+            columns[field] = values
+
+    # Without any column the length would be unbacked by the body, so only counted streams may omit them
+    if length and name in EVENT_FIELDS and not columns and not categories:
+        raise ValueError(f"{name} has events but no columns")
+
+    return ColumnarEvents(length, columns, categories)
+
+
+def decode_behavior(raw, max_body_bytes=MAX_DECOMPRESSED_BYTES):
+    """Decode a wire payload into a behavior payload dict whose event streams are ColumnarEvents.
+
+    Raises ValueError for anything malformed.
+    """
+    if len(raw) < PREAMBLE.size:
+        raise ValueError("Truncated behavior payload")
+    magic, version, flags, _, header_len = PREAMBLE.unpack_from(raw)
+    if magic != MAGIC or version != WIRE_VERSION:
+        raise ValueError("Not a behavior wire payload (or unsupported version)")
+
+    view = memoryview(raw)
+    header_end = PREAMBLE.size + header_len
+    if header_end > len(raw):
+        raise ValueError("Truncated behavior payload header")
+    header = json.loads(bytes(view[PREAMBLE.size:header_end]))
+    if not isinstance(header, dict):
+        raise ValueError("Invalid behavior payload header")
+
+    body = view[header_end:]
+    if flags & FLAG_DEFLATE:
+        inflater = zlib.decompressobj()
+        try:
+            body = inflater.decompress(body, max_body_bytes)
+        except zlib.error as e:
+            raise ValueError(f"Invalid compressed body: {e}")
+        if inflater.unconsumed_tail:
+            raise ValueError(f"Decompressed body exceeds {max_body_bytes} bytes")
+
+    fields, streams = header.get('fields', {}), header.get('streams', {})
+    if not isinstance(fields, dict) or not isinstance(streams, dict):
+        raise ValueError("Invalid behavior payload header")
+    behavior_data = {name: value for name, value in fields.items()
+                     if name not in EVENT_FIELDS and name not in COUNTED_STREAMS}
+
+    for name, spec in streams.items():
+        if (name in EVENT_FIELDS or name in COUNTED_STREAMS) and isinstance(spec, dict):
+            behavior_data[name] = _decode_stream(name, spec, body)
+
+    return behavior_data
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Payload Decoding Benchmark
+Times decode + feature extraction of behavior payloads for each available JSON backend
+(stdlib json, orjson, msgspec typed records) and the columnar binary wire format
+(plain and deflated), and reports the body size of each encoding, across session sizes.
+
+Usage:
+    python scripts/benchmark_payload_decoding.py --sizes 100 1000 10000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import payload_decoder
+from behavior_features import extract_features
+from behavior_wire import WIRE_CONTENT_TYPE, encode_behavior
+from payload_decoder import decode_request
+
+
+def make_payload(n_events, seed=0):
+    """Synthetic session with n mouse movements and proportionally fewer other events"""
+    rng = np.random.default_rng(seed)
+    start = 1700000000000
+    return {
+        'mouseMovements': [{
+            'timestamp': start + 16 * i, 'x': float(x), 'y': float(y), 'velocity': float(v),
+            'acceleration': float(a), 'pressure': 0, 'jitter': float(j)
+        } for i, (x, y, v, a, j) in enumerate(zip(
+            rng.uniform(0, 1920, n_events), rng.uniform(0, 1080, n_events), rng.gamma(2, 300, n_events),
+            rng.normal(0, 50, n_events), rng.uniform(0, 2, n_events)))],
+        'keystrokes': [{
+            'key': 'abcdefgh12 .'[i % 12], 'timestamp': start + 180 * i, 'pressure': 0.5
+        } for i in range(n_events // 4)],
+        'clicks': [{
+            'timestamp': start + 900 * i, 'x': 400, 'y': 300, 'button': 0, 'clickType': 'single',
+            'accuracy': 0.8, 'pressure': 0.4, 'duration': 120
+        } for i in range(n_events // 20)],
+        'formInteractions': [{
+            'interactionType': 'input', 'focusTime': 1500, 'dwellTime': 900, 'changeCount': 4,
+            'value': 'jane@example.com', 'tabOrder': i, 'validationErrors': 0
+        } for i in range(max(n_events // 100, 1))],
+        'pageViewTime': 60000,
+        'scrollDistance': 1200,
+        'focusEvents': [{'timestamp': start}] * 3,
+        'blurEvents': [{'timestamp': start}] * 2
+    }
+
+
+def time_backend(backend, raw, repeat, content_type=None):
+    """Median seconds for decode and for decode + extraction"""
+    payload_decoder.JSON_DECODER = backend
+    decode_times, total_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = decode_request(raw, content_type)
+        decoded = time.perf_counter()
+        extract_features(payload)
+        done = time.perf_counter()
+        decode_times.append(decoded - start)
+        total_times.append(done - start)
+    return float(np.median(decode_times)), float(np.median(total_times))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark behavior payload decoding backends')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='Mouse movements per synthetic session')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', default=None, help='Optional JSON report path')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    backends = ['json']
+    if payload_decoder.orjson is not None:
+        backends.append('orjson')
+    if payload_decoder.msgspec is not None:
+        backends.append('msgspec')
+
+    print(f"⏱️  Payload decoding benchmark ({', '.join(backends)}, columnar)")
+    report = []
+    for size in args.sizes:
+        payload = make_payload(size)
+        raw_json = json.dumps(payload).encode()
+        encodings = [(backend, backend, raw_json, None) for backend in backends] + [
+            ('columnar', 'auto', encode_behavior(payload), WIRE_CONTENT_TYPE),
+            ('columnar+deflate', 'auto', encode_behavior(payload, compress=True), WIRE_CONTENT_TYPE),
+        ]
+        baseline = None
+        for name, backend, raw, content_type in encodings:
+            decode_s, total_s = time_backend(backend, raw, args.repeat, content_type)
+            baseline = baseline or total_s
+            report.append({
+                'events': size, 'bytes': len(raw), 'backend': name,
+                'decode_ms': decode_s * 1000, 'decode_extract_ms': total_s * 1000
+            })
+            print(f"  {size:>6} events {len(raw) / 1024:>8.1f} KB  {name:<16} "
+                  f"decode {decode_s * 1000:7.2f} ms  decode+extract {total_s * 1000:7.2f} ms  "
+                  f"({baseline / total_s:.1f}x vs json)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Candidate Model Comparison
+Fits candidate estimators on the same split and compares them on score, training time and
+p50/p99 single-row and batch inference latency, so a slightly better score does not win at
+any cost; selection can also be held to a latency budget. Used by the demand
+trainers (train_demand_model.py, train_enhanced_model.py, simulation.py) and the behavior
+trainer (ai_training/train_behavior_model.py).
+"""
+
+import time
+
+import numpy as np
+
+# Candidates scoring within this much of the best are treated as ties and ranked by speed
+SCORE_TOLERANCE = 0.005
+LATENCY_SAMPLES = 200
+BATCH_ROWS = 1000
+BATCH_REPEAT = 20
+# Latency used for budgets and tie-breaks: what one /predict-ai request waits for at the tail
+LATENCY_KEY = 'single_row_p99_ms'
+# Steadier tie-break for trainers without a latency budget: a p99 over LATENCY_SAMPLES
+# timings moves between runs and would flip near-tied choices
+MEDIAN_LATENCY_KEY = 'single_row_p50_ms'
+
+
+def categorical_mask(columns, categorical, max_categories=255):
+    """Boolean mask for HistGradientBoosting* categorical_features.
+
+    Columns must already hold integer codes (e.g. LabelEncoder output); columns with more
+    distinct values than the histogram can bin stay numeric.
+    """
+    return [
+        name in categorical and (max_categories is None or int(np.max(values)) < max_categories)
+        for name, values in columns.items()
+    ]
+
+
+def _predict_fn(model):
+    return model.predict_proba if hasattr(model, 'predict_proba') else model.predict
+
+
+def measure_latency(model, X, samples=LATENCY_SAMPLES, batch_rows=BATCH_ROWS, batch_repeat=BATCH_REPEAT):
+    """p50/p99 single-row and batch latency of a fitted model (or serving predictor), in milliseconds"""
+    predict = _predict_fn(model)
+    rows = X.iloc if hasattr(X, 'iloc') else X
+    n = min(samples, len(X))
+
+    single = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        predict(rows[i:i + 1])
+        single[i] = time.perf_counter() - start
+
+    batch = rows[:batch_rows]
+    batches = np.empty(batch_repeat)
+    for i in range(batch_repeat):
+        start = time.perf_counter()
+        predict(batch)
+        batches[i] = time.perf_counter() - start
+
+    single_p50, single_p99 = np.percentile(single, [50, 99]) * 1000
+    batch_p50, batch_p99 = np.percentile(batches, [50, 99]) * 1000
+    return {
+        'single_row_p50_ms': float(single_p50),
+        'single_row_p99_ms': float(single_p99),
+        'batch_p50_ms': float(batch_p50),
+        'batch_p99_ms': float(batch_p99),
+        'batch_rows': len(batch)
+    }
+
+
+def evaluate_candidate(model, X_train, y_train, X_test, y_test, score_fn):
+    """Fit one candidate and return its score, training time and inference latency"""
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    result = {'model': model, 'score': score_fn(model, X_test, y_test), 'fit_seconds': fit_seconds}
+    result.update(measure_latency(model, X_test))
+    return result
+
+
+def select_candidate(results, tolerance=SCORE_TOLERANCE, latency_budget_ms=None, latency_key=LATENCY_KEY):
+    """Name of the best candidate.
+
+    Candidates over the latency budget (on latency_key) are dropped first; if every one is
+    over it, only the fastest remains. Among the rest, those scoring within tolerance of the
+    top score are ranked by that latency, then training time.
+    """
+    names = list(results)
+    if latency_budget_ms is not None:
+        within = [name for name in names if results[name][latency_key] <= latency_budget_ms]
+        names = within or [min(names, key=lambda name: results[name][latency_key])]
+
+    best_score = max(results[name]['score'] for name in names)
+    contenders = [name for name in names if results[name]['score'] >= best_score - tolerance]
+    return min(contenders, key=lambda name: (results[name][latency_key], results[name]['fit_seconds']))
+
+
+def print_comparison(results, metric='Score', selected=None, latency_budget_ms=None):
+    print(f"  {'Candidate':<24} {metric:>8} {'Fit (s)':>8} {'1 row p50/p99 (ms)':>19} "
+          f"{'Batch p50/p99 (ms)':>19}")
+    for name, result in sorted(results.items(), key=lambda item: -item[1]['score']):
+        marker = ' 🏆' if name == selected else ''
+        if latency_budget_ms is not None and result[LATENCY_KEY] > latency_budget_ms:
+            marker += ' ⏳ over budget'
+        print(f"  {name:<24} {result['score']:>8.4f} {result['fit_seconds']:>8.2f} "
+              f"{result['single_row_p50_ms']:>9.3f}/{result['single_row_p99_ms']:<9.3f} "
+              f"{result['batch_p50_ms']:>9.2f}/{result['batch_p99_ms']:<9.2f}{marker}")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Flat-Array Forest Evaluator
+Compiles a fitted sklearn RandomForestClassifier into contiguous node arrays and
+evaluates it with vectorized NumPy traversal, skipping sklearn's per-call validation
+and per-tree Python overhead. Probabilities match RandomForestClassifier.predict_proba.
+"""
+
+import os
+
+import numpy as np
+
+FOREST_FILES = ('feature', 'threshold', 'children', 'missing_left', 'value', 'roots', 'classes')
+# Version of the scaler folding stored forests were built with (see FlatForest.fold_scaler)
+FOLD_VERSION = 2
+
+# float64 bit patterns as integers that sort like the values they encode
+_MAX_FINITE_KEY = np.array(np.finfo(np.float64).max).view(np.int64)
+_INT64_MIN = np.iinfo(np.int64).min
+
+
+def _to_key(values):
+    bits = np.asarray(values, dtype=np.float64).view(np.int64)
+    return np.where(bits < 0, _INT64_MIN - bits, bits)
+
+
+def _from_key(keys):
+    return np.where(keys < 0, _INT64_MIN - keys, keys).view(np.float64)
+
+
+def _scaled(x, mean, scale):
+    """StandardScaler.transform's float64 arithmetic followed by the trees' float32 cast"""
+    with np.errstate(over='ignore', invalid='ignore'):
+        if mean is not None:
+            x = x - mean
+        if scale is not None:
+            x = x / scale
+        return x.astype(np.float32)
+
+
+def _raw_thresholds(threshold, mean, scale):
+    """For each split, the largest raw float64 value whose scaled value is <= threshold.
+
+    The scaled value never decreases as the raw value grows, so a bisection over the
+    ordered float64 bit patterns finds the exact boundary in 64 steps.
+    """
+    low = np.full(len(threshold), -_MAX_FINITE_KEY, dtype=np.int64)
+    high = np.full(len(threshold), _MAX_FINITE_KEY, dtype=np.int64)
+    # Invariant: low goes left, high goes right (checked at the ends of the range)
+    all_left = _scaled(_from_key(high), mean, scale) <= threshold
+    none_left = _scaled(_from_key(low), mean, scale) > threshold
+
+    for _ in range(64):
+        middle = (low >> 1) + (high >> 1) + (low & high & 1)
+        goes_left = _scaled(_from_key(middle), mean, scale) <= threshold
+        low = np.where(goes_left, middle, low)
+        high = np.where(goes_left, high, middle)
+
+    raw = _from_key(low)
+    raw[all_left] = np.finfo(np.float64).max
+    # Only -inf itself still scales to -inf and goes left
+    raw[none_left] = -np.inf
+    return raw
+
+
+class FlatForest:
+    """All trees of a forest stored as one set of node arrays.
+
+    Node i of the combined forest tests `x[feature[i]] <= threshold[i]` and moves to
+    its left child `children[2 * i]` or right child `children[2 * i + 1]`. Leaves
+    point back at themselves, so every row can take exactly `max_depth` steps with
+    no branching. `value[i]` holds the leaf class probabilities.
+    """
+
+    def __init__(self, feature, threshold, children, missing_left, value, roots, classes, max_depth,
+                 scaler_folded=False):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.n_trees = len(roots)
+        self.scaler_folded = bool(scaler_folded)
+
+    @classmethod
+    def supports(cls, model):
+        return type(model).__name__ in ('RandomForestClassifier', 'ExtraTreesClassifier')
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        """Compile a fitted RandomForestClassifier / ExtraTreesClassifier.
+
+        If the forest was trained on StandardScaler output, pass the scaler to
+        fold it into the thresholds so raw features can be scored directly.
+        """
+        if not cls.supports(model):
+            raise TypeError(f"Cannot flatten {type(model).__name__}")
+
+        features, thresholds, children, missing, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left < 0
+
+            # Leaves loop onto themselves and always compare feature 0 against +inf
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.stack([
+                np.where(is_leaf, node_ids, tree.children_left + offset),
+                np.where(is_leaf, node_ids, tree.children_right + offset)
+            ], axis=1).astype(np.int32).ravel())
+
+            missing_go_to_left = getattr(tree, 'missing_go_to_left', None)
+            missing.append(np.asarray(missing_go_to_left, dtype=bool) if missing_go_to_left is not None
+                           else np.zeros(n_nodes, dtype=bool))
+
+            value = tree.value[:, 0, :]
+            totals = value.sum(axis=1, keepdims=True)
+            values.append(value / np.where(totals == 0, 1, totals))
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        forest = cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.concatenate(children),
+            missing_left=np.concatenate(missing),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            max_depth=max_depth
+        )
+        return forest.fold_scaler(scaler) if scaler is not None else forest
+
+    def fold_scaler(self, scaler):
+        """Return a forest that takes raw features, with the scaler baked into the thresholds.
+
+        A split on the scaled value, (x - mean) / scale <= t, becomes x <= T for the
+        largest raw value T that still goes left. T is searched for exactly, reproducing
+        StandardScaler's float64 arithmetic and the trees' float32 cast, so rows right at
+        a split go the same way as through the scaler and the sklearn forest.
+        """
+        if self.scaler_folded:
+            raise ValueError("Scaler already folded into this forest")
+
+        n_features = scaler.n_features_in_
+        mean = np.broadcast_to(np.asarray(scaler.mean_, dtype=np.float64), (n_features,)) if scaler.with_mean else None
+        scale = np.broadcast_to(np.asarray(scaler.scale_, dtype=np.float64), (n_features,)) if scaler.with_std else None
+
+        # Leaves keep their +inf threshold
+        threshold = np.array(self.threshold, dtype=np.float64)
+        split = ~np.isinf(threshold)
+        feature = self.feature[split]
+        threshold[split] = _raw_thresholds(
+            threshold[split],
+            mean[feature] if mean is not None else None,
+            scale[feature] if scale is not None else None
+        )
+
+        return FlatForest(
+            feature=self.feature,
+            threshold=threshold,
+            children=self.children,
+            missing_left=self.missing_left,
+            value=self.value,
+            roots=self.roots,
+            classes=self.classes_,
+            max_depth=self.max_depth,
+            scaler_folded=True
+        )
+
+    def apply(self, X):
+        """Leaf node index reached in every tree, shape (n_samples, n_trees)"""
+        # sklearn trees compare float32 inputs against float64 thresholds; folded
+        # thresholds already account for that cast and compare raw float64 values
+        X = np.asarray(X, dtype=np.float64 if self.scaler_folded else np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        has_missing = np.isnan(flat_X).any()
+
+        # A single row walks a 1-D node vector; batches offset feature indices per row
+        if n_samples == 1:
+            row_offsets = None
+            nodes = self.roots
+        else:
+            row_offsets = (np.arange(n_samples, dtype=np.int32) * n_features)[:, None]
+            nodes = np.broadcast_to(self.roots, (n_samples, self.n_trees))
+
+        # np.take is noticeably cheaper than [] fancy indexing on these small arrays
+        for _ in range(self.max_depth):
+            feature_index = self.feature.take(nodes)
+            if row_offsets is not None:
+                feature_index += row_offsets
+            x = flat_X.take(feature_index)
+            threshold = self.threshold.take(nodes)
+            if has_missing:
+                go_right = ~((x <= threshold) | (np.isnan(x) & self.missing_left.take(nodes)))
+            else:
+                go_right = x > threshold
+            nodes = self.children.take(2 * nodes + go_right)
+
+        return nodes.reshape(n_samples, self.n_trees)
+
+    def predict_proba(self, X):
+        return self.value.take(self.apply(X), axis=0).sum(axis=1) / self.n_trees
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, path):
+        """Write each array as its own .npy file so it can be memory-mapped on load"""
+        os.makedirs(path, exist_ok=True)
+        files = {}
+        for name in FOREST_FILES:
+            filename = f'forest_{name}.npy'
+            np.save(os.path.join(path, filename), getattr(self, 'classes_' if name == 'classes' else name))
+            files[name] = filename
+        meta = {
+            'files': files,
+            'max_depth': self.max_depth,
+            'n_trees': self.n_trees,
+            'scaler_folded': self.scaler_folded
+        }
+        if self.scaler_folded:
+            meta['fold_version'] = FOLD_VERSION
+        return meta
+
+    @staticmethod
+    def loadable(meta):
+        """False for forests whose scaler was folded by the earlier, inexact
+        threshold * scale + mean rule; those are rebuilt from the sklearn model"""
+        return not meta.get('scaler_folded') or meta.get('fold_version') == FOLD_VERSION
+
+    @classmethod
+    def load(cls, path, meta, mmap=True):
+        mmap_mode = 'r' if mmap else None
+        arrays = {
+            name: np.load(os.path.join(path, filename), mmap_mode=mmap_mode if name != 'classes' else None)
+            for name, filename in meta['files'].items()
+        }
+        return cls(max_depth=meta['max_depth'], scaler_folded=meta.get('scaler_folded', False), **arrays)
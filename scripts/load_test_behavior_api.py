@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Behavior API Load Test
+Replays synthetic human and bot sessions (ai_training/generate_training_data.py) against
+/predict-ai at a fixed request rate and concurrency, over HTTP to a running API or through
+the Flask app in-process, with a mix of ordinary and long-running (large payload) sessions.
+Writes p50/p95/p99 latency, throughput and error rates to a JSON report and can fail the run
+when they regress past a threshold.
+
+Requests are sent on an open-loop schedule: latency is also measured from each request's
+scheduled send time, so a saturated server shows up as queueing delay instead of the load
+generator quietly slowing down.
+
+Usage:
+    python scripts/load_test_behavior_api.py --url http://localhost:5001 --rps 200 --concurrency 32 --duration 60
+    python scripts/load_test_behavior_api.py --in-process --rps 100 --duration 20 --output load_report.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from behavior_features import session_to_payload
+from behavior_wire import WIRE_CONTENT_TYPE, encode_behavior
+from ai_training.generate_training_data import BehaviorDataGenerator
+
+ENDPOINT = '/predict-ai'
+PERCENTILES = (50, 95, 99)
+REQUEST_TIMEOUT_S = 10.0
+
+
+def _repeat_events(events, factor, single_event_step):
+    """events repeated factor times, each repeat's timestamps shifted past the previous
+    repeat by the list's span plus one mean interval, so time keeps moving forward"""
+    timestamps = [event.get('timestamp') if isinstance(event, dict) else None for event in events]
+    if not events or not all(isinstance(t, (int, float)) and not isinstance(t, bool) for t in timestamps):
+        return events * factor
+    span = max(timestamps) - min(timestamps)
+    step = span + (span / (len(events) - 1) if len(events) > 1 else single_event_step)
+    return [dict(event, timestamp=event['timestamp'] + repeat * step)
+            for repeat in range(factor) for event in events]
+
+
+def lengthen(payload, factor):
+    """A long-running session: every event stream of payload repeated factor times, later
+    repeats shifted in time (a lone event recurs once per original page view)"""
+    page_view_time = payload.get('pageViewTime', 0)
+    longer = {key: _repeat_events(value, factor, page_view_time or 1000)
+              for key, value in payload.items() if isinstance(value, list)}
+    longer['pageViewTime'] = page_view_time * factor
+    return dict(payload, **longer)
+
+
+def build_payload_pool(size, bot_share=0.5, long_share=0.05, long_factor=10, encoding='json', seed=0):
+    """Pre-encoded request bodies for size generated sessions.
+
+    Sessions are encoded once up front so the load generator spends its time sending, not
+    serializing; requests then draw from the pool at random.
+    """
+    generator = BehaviorDataGenerator(seed=seed)
+    bots = int(round(size * bot_share))
+    pool = []
+    for batch in generator.iter_batches(size - bots, bots):
+        for session in batch:
+            payload = session_to_payload(session)
+            is_long = bool(generator.rng.random() < long_share)
+            if is_long:
+                payload = lengthen(payload, long_factor)
+            if encoding == 'columnar':
+                body, content_type = encode_behavior(payload), WIRE_CONTENT_TYPE
+            else:
+                body, content_type = json.dumps(payload).encode(), 'application/json'
+            pool.append({'body': body, 'content_type': content_type, 'label': session['label'], 'long': is_long})
+    return pool
+
+
+class HttpTarget:
+    """POSTs to a running API, one keep-alive connection per worker thread"""
+
+    def __init__(self, url, endpoint=ENDPOINT, timeout=REQUEST_TIMEOUT_S):
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path.rstrip('/') + endpoint
+        self.timeout = timeout
+        self.name = url
+        self.local = threading.local()
+
+    def send(self, body, content_type):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request('POST', self.path, body=body, headers={'Content-Type': content_type})
+            response = connection.getresponse()
+            return response.status, response.read()
+        except Exception:
+            # Reconnect on the next request rather than reuse a broken socket
+            connection.close()
+            self.local.connection = None
+            raise
+
+
+class InProcessTarget:
+    """The API's Flask app called through its test client, without a server or network"""
+
+    def __init__(self, model_path=None, endpoint=ENDPOINT):
+        import ai_behavior_api
+        if not ai_behavior_api.load_model(model_path):
+            raise RuntimeError(f"Could not load a model from {model_path or ai_behavior_api.MODEL_PATH}")
+        self.app = ai_behavior_api.app
+        self.endpoint = endpoint
+        self.name = 'in-process'
+        self.local = threading.local()
+
+    def send(self, body, content_type):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.post(self.endpoint, data=body, content_type=content_type)
+        return response.status_code, response.get_data()
+
+
+def _send(target, item, start, scheduled):
+    """Send one request at its scheduled offset from start and time it"""
+    delay = start + scheduled - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+    sent = time.perf_counter()
+    error, result = None, {}
+    try:
+        status, body = target.send(item['body'], item['content_type'])
+        if status >= 400:
+            error = f"HTTP {status}"
+        else:
+            result = json.loads(body)
+    except ValueError:
+        error = 'invalid response'
+    except Exception as e:
+        error = type(e).__name__
+    done = time.perf_counter()
+    return {
+        'latency': done - sent,
+        'scheduled_latency': done - (start + scheduled),
+        'error': error,
+        'prediction': result.get('prediction'),
+        'cached': bool(result.get('cached')),
+        'label': item['label'],
+        'long': item['long'],
+        'bytes': len(item['body'])
+    }
+
+
+def run_load(target, pool, rps=50, concurrency=8, requests=None, duration=10.0, seed=0):
+    """Send requests drawn from pool at rps (0 = as fast as concurrency allows).
+
+    Runs for duration seconds, or for exactly requests requests when given.
+    Returns one timing record per request and the wall-clock seconds the run took.
+    """
+    if requests is None:
+        if not rps:
+            raise ValueError("An unthrottled run (rps=0) needs a request count")
+        requests = int(rps * duration)
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(pool), requests)
+    schedule = np.arange(requests) / rps if rps else np.zeros(requests)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        futures = [executor.submit(_send, target, pool[i], start, offset) for i, offset in zip(picks, schedule)]
+        results = [future.result() for future in futures]
+    return results, time.perf_counter() - start
+
+
+def latency_summary(seconds):
+    """p50/p95/p99, mean and max of latencies in seconds, in milliseconds"""
+    if len(seconds) == 0:
+        return None
+    ms = np.asarray(seconds) * 1000
+    summary = {f"p{p}": float(value) for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES))}
+    summary.update(mean=float(ms.mean()), max=float(ms.max()))
+    return summary
+
+
+def build_report(results, elapsed, **settings):
+    """JSON-serializable summary of a run; latencies cover successful requests"""
+    ok = [r for r in results if r['error'] is None]
+    errors = Counter(r['error'] for r in results if r['error'] is not None)
+    predictions = {label: dict(Counter(r['prediction'] for r in ok if r['label'] == label))
+                   for label in ('human', 'bot')}
+    sizes = np.array([r['bytes'] for r in results]) if results else np.zeros(1)
+    return dict(
+        settings,
+        requests=len(results),
+        succeeded=len(ok),
+        errors=sum(errors.values()),
+        error_rate=sum(errors.values()) / len(results) if results else 0.0,
+        errors_by_kind=dict(errors),
+        seconds=elapsed,
+        achieved_rps=len(results) / elapsed if elapsed else 0.0,
+        throughput_rps=len(ok) / elapsed if elapsed else 0.0,
+        latency_ms=latency_summary([r['latency'] for r in ok]),
+        scheduled_latency_ms=latency_summary([r['scheduled_latency'] for r in ok]),
+        latency_ms_by_size={
+            'regular': latency_summary([r['latency'] for r in ok if not r['long']]),
+            'long': latency_summary([r['latency'] for r in ok if r['long']])
+        },
+        payload_bytes={'p50': float(np.median(sizes)), 'p99': float(np.percentile(sizes, 99)),
+                       'max': int(sizes.max())},
+        cache_hits=sum(r['cached'] for r in ok),
+        predictions_by_label=predictions
+    )
+
+
+def check_thresholds(report, max_p99_ms=None, max_error_rate=None):
+    """Threshold violations in report, as messages"""
+    failures = []
+    p99 = (report['latency_ms'] or {}).get('p99')
+    if max_p99_ms is not None and (p99 is None or p99 > max_p99_ms):
+        failures.append(f"p99 latency {p99 if p99 is None else round(p99, 2)} ms exceeds {max_p99_ms} ms")
+    if max_error_rate is not None and report['error_rate'] > max_error_rate:
+        failures.append(f"error rate {report['error_rate']:.2%} exceeds {max_error_rate:.2%}")
+    return failures
+
+
+def print_report(report):
+    latency, scheduled = report['latency_ms'], report['scheduled_latency_ms']
+    print(f"\n📊 {report['requests']} requests to {report['target']} in {report['seconds']:.1f}s "
+          f"({report['achieved_rps']:.1f} req/s sent, {report['throughput_rps']:.1f} req/s succeeded)")
+    if latency:
+        print(f"⏱️  Latency p50/p95/p99: {latency['p50']:.2f}/{latency['p95']:.2f}/{latency['p99']:.2f} ms "
+              f"(max {latency['max']:.2f} ms)")
+        print(f"⏱️  From schedule p50/p95/p99: {scheduled['p50']:.2f}/{scheduled['p95']:.2f}/{scheduled['p99']:.2f} ms")
+    long_latency = report['latency_ms_by_size']['long']
+    if long_latency:
+        print(f"📦 Long sessions p99: {long_latency['p99']:.2f} ms "
+              f"(payloads p50 {report['payload_bytes']['p50'] / 1024:.1f} KB, max {report['payload_bytes']['max'] / 1024:.1f} KB)")
+    print(f"❌ Errors: {report['errors']} ({report['error_rate']:.2%})" + (f" {report['errors_by_kind']}" if report['errors'] else ''))
+    if report['cache_hits']:
+        print(f"♻️  {report['cache_hits']} responses served from the score cache")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load test the behavior scoring API with generated sessions')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', default=os.environ.get('AI_API_URL', 'http://localhost:5001'),
+                        help='Base URL of a running ai_behavior_api.py')
+    target.add_argument('--in-process', action='store_true',
+                        help='Call the Flask app in this process instead of over HTTP')
+    parser.add_argument('--model', default=None,
+                        help='Model for --in-process (defaults to the API\'s AI_MODEL_PATH)')
+    parser.add_argument('--rps', type=float, default=50, help='Requests per second (0 = unthrottled)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Maximum requests in flight')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run for')
+    parser.add_argument('--requests', type=int, default=None, help='Send exactly this many requests instead')
+    parser.add_argument('--pool', type=int, default=2000,
+                        help='Distinct sessions to replay (smaller pools hit the API score cache more)')
+    parser.add_argument('--bot-share', type=float, default=0.5, help='Fraction of bot sessions')
+    parser.add_argument('--long-share', type=float, default=0.05, help='Fraction of long-running sessions')
+    parser.add_argument('--long-factor', type=int, default=10, help='How many times longer long sessions are')
+    parser.add_argument('--encoding', choices=['json', 'columnar'], default='json',
+                        help='Request body format: JSON or the columnar wire format (behavior_wire.py)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for sessions and request order')
+    parser.add_argument('--max-p99-ms', type=float, default=None, help='Exit non-zero if p99 latency exceeds this')
+    parser.add_argument('--max-error-rate', type=float, default=None, help='Exit non-zero if the error rate exceeds this')
+    parser.add_argument('--output', default=None, help='Optional JSON report path')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    target = InProcessTarget(args.model) if args.in_process else HttpTarget(args.url)
+
+    print(f"🧪 Generating {args.pool} sessions ({args.bot_share:.0%} bots, {args.long_share:.0%} long)...")
+    pool = build_payload_pool(args.pool, args.bot_share, args.long_share, args.long_factor, args.encoding, args.seed)
+
+    print(f"🚀 Sending to {target.name}{ENDPOINT} at {args.rps or 'unthrottled'} req/s, "
+          f"concurrency {args.concurrency}...")
+    results, elapsed = run_load(target, pool, args.rps, args.concurrency, args.requests, args.duration, args.seed)
+    report = build_report(
+        results, elapsed,
+        target=target.name, endpoint=ENDPOINT, encoding=args.encoding, requested_rps=args.rps,
+        concurrency=args.concurrency, pool=len(pool), bot_share=args.bot_share,
+        long_share=args.long_share, long_factor=args.long_factor, seed=args.seed
+    )
+    print_report(report)
+
+    failures = check_thresholds(report, args.max_p99_ms, args.max_error_rate)
+    report['failures'] = failures
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report saved to {args.output}")
+    for failure in failures:
+        print(f"🚨 {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Micro-Batching Queue for the AI Behavior Model
+Collects concurrent scoring requests for a few milliseconds and scores them with one model call
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+
+class BatchTimeout(TimeoutError):
+    """A queued request was not scored within the batcher's timeout and was dropped"""
+
+
+class MicroBatcher:
+    """Groups feature vectors from concurrent requests into a single batched model call.
+
+    A batch is flushed when `window_ms` has passed since its first request or when
+    it reaches `max_batch_size`, whichever comes first, so a request never waits
+    longer than the window before being scored. `score_fn` receives a 2-D feature
+    matrix and must return one result per row, in order.
+
+    A request that times out is cancelled and skipped when its batch is flushed, so an
+    overloaded model does not spend time on results nobody is waiting for.
+    """
+
+    def __init__(self, score_fn, window_ms=2.0, max_batch_size=64, timeout=1.0):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+
+        self.batches = 0
+        self.requests = 0
+        self.largest_batch = 0
+        self.timeouts = 0
+
+    def submit(self, features):
+        """Queue one feature vector and block until its result is ready.
+
+        Raises BatchTimeout if it is not ready within the timeout.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((features, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Fails if the batch is already being scored; the result is then just discarded
+            future.cancel()
+            self.timeouts += 1
+            raise BatchTimeout(f"Not scored within {self.timeout}s") from None
+
+    def stats(self):
+        return {
+            'window_ms': self.window * 1000,
+            'max_batch_size': self.max_batch_size,
+            'batches': self.batches,
+            'requests': self.requests,
+            'avg_batch_size': round(self.requests / self.batches, 2) if self.batches else 0,
+            'largest_batch': self.largest_batch,
+            'timeouts': self.timeouts
+        }
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so each worker process starts its own
+        if self._pid == os.getpid() and self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._worker is not None and self._worker.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+
+    def _flush(self, batch):
+        # Drop requests whose callers gave up; the rest can no longer be cancelled
+        batch = [(features, future) for features, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        futures = [future for _, future in batch]
+        try:
+            results = self.score_fn(np.vstack([features for features, _ in batch]))
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        for future, result in zip(futures, results):
+            future.set_result(result)
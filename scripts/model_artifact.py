@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Serving Artifact for the Behavior Model
+Slim, fast-loading export of the trained classifier: only the best model and its scaler,
+stored uncompressed with joblib so arrays can be memory-mapped, plus a JSON manifest.
+
+Layout of an artifact directory:
+    manifest.json   model name/class, feature names and schema version, library versions,
+                    sha256 checksums of the other files (verified on load)
+    model.joblib    the best model only
+    scaler.joblib   the fitted StandardScaler (if any)
+    forest_*.npy    flattened node arrays for RandomForest models, with the scaler
+                    folded into the thresholds (see flat_forest.py)
+
+The manifest may also carry the inference latencies measured at training time
+('latency', see candidate_models.py), which the API reports from /model-info.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+import joblib
+import sklearn
+from sklearn.pipeline import make_pipeline
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flat_forest import FlatForest
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def serving_predictor(model, scaler=None, flat_forest=True):
+    """The object the API scores raw (unscaled) feature vectors with: a FlatForest with the
+    scaler folded in for RandomForest models, otherwise the scaler and model chained"""
+    if flat_forest and FlatForest.supports(model):
+        return FlatForest.from_sklearn(model, scaler=scaler)
+    if scaler is None:
+        return model
+    # Both steps are already fitted; the pipeline only chains their transforms
+    return make_pipeline(scaler, model)
+
+
+def is_serving_artifact(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_NAME))
+
+
+def export_serving_artifact(path, model, model_name, feature_names, scaler=None, extra=None,
+                            feature_schema_version=None):
+    """Write a serving artifact directory and return its manifest"""
+    os.makedirs(path, exist_ok=True)
+
+    files = {'model': 'model.joblib'}
+    # compress=0 keeps numpy buffers raw on disk so they can be loaded with mmap_mode
+    joblib.dump(model, os.path.join(path, files['model']), compress=0)
+    if scaler is not None:
+        files['scaler'] = 'scaler.joblib'
+        joblib.dump(scaler, os.path.join(path, files['scaler']), compress=0)
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_name': model_name,
+        'model_class': type(model).__name__,
+        'feature_names': list(feature_names),
+        'feature_count': len(feature_names),
+        'feature_schema_version': feature_schema_version,
+        'sklearn_version': sklearn.__version__,
+        'created_at': datetime.now().isoformat(),
+        'files': files,
+        'checksums': {key: _sha256(os.path.join(path, name)) for key, name in files.items()}
+    }
+    if FlatForest.supports(model):
+        manifest['flat_forest'] = FlatForest.from_sklearn(model, scaler=scaler).save(path)
+        manifest['checksums'].update({
+            f'forest_{key}': _sha256(os.path.join(path, name))
+            for key, name in manifest['flat_forest']['files'].items()
+        })
+    if extra:
+        manifest.update(extra)
+
+    with open(os.path.join(path, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def verify_checksums(path, manifest, files):
+    """Raise ValueError if any of files ({checksum key: filename}) differs from the manifest.
+
+    Artifacts exported without checksums are accepted as they are.
+    """
+    checksums = manifest.get('checksums') or {}
+    for key, name in files.items():
+        if key in checksums and _sha256(os.path.join(path, name)) != checksums[key]:
+            raise ValueError(f"Checksum mismatch for {name} in {path}")
+
+
+def load_serving_artifact(path, mmap=True, flat_forest=False):
+    """Load a serving artifact; returns (model, scaler, manifest).
+
+    With flat_forest=True the sklearn model is not loaded (model is None) when the
+    artifact stores a flattened forest, which then serves instead (see load_flat_forest).
+    """
+    with open(os.path.join(path, MANIFEST_NAME), 'r') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format: {manifest.get('format_version')}")
+
+    mmap_mode = 'r' if mmap else None
+    files = dict(manifest['files'])
+    if flat_forest and _stored_flat_forest(manifest):
+        del files['model']
+    verify_checksums(path, manifest, files)
+
+    model = joblib.load(os.path.join(path, files['model']), mmap_mode=mmap_mode) if 'model' in files else None
+    scaler = joblib.load(os.path.join(path, files['scaler']), mmap_mode=mmap_mode) if 'scaler' in files else None
+
+    return model, scaler, manifest
+
+
+def _stored_flat_forest(manifest):
+    """The artifact's flat forest metadata, or None if it has none it can serve with"""
+    meta = manifest.get('flat_forest')
+    return meta if meta and FlatForest.loadable(meta) else None
+
+
+def load_flat_forest(path, manifest, mmap=True):
+    """Load the flattened forest stored with an artifact, or None if it has none
+    (or only one folded by an older, inexact rule)"""
+    meta = _stored_flat_forest(manifest)
+    if meta is None:
+        return None
+    verify_checksums(path, manifest, {f'forest_{key}': name for key, name in meta['files'].items()})
+    return FlatForest.load(path, meta, mmap=mmap)
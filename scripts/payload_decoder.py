@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Fast Behavior Payload Decoding
+Parses request bodies straight into compact typed event records (msgspec) holding only the
+fields the feature extractor reads, falling back to orjson or the stdlib json module.
+"""
+
+import json
+import os
+from typing import Any, Union
+
+from behavior_features import NAN
+from behavior_wire import WIRE_CONTENT_TYPE, decode_behavior
+
+try:
+    import msgspec
+    from msgspec import UNSET, UnsetType
+except ImportError:  # optional: typed decoding
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional: faster untyped decoding
+    orjson = None
+
+# auto picks the fastest installed backend; msgspec, orjson or json force one
+JSON_DECODER = os.environ.get('AI_JSON_DECODER', 'auto')
+
+
+if msgspec is not None:
+    # Event records mirror behavior_features: same field names, same defaults for
+    # missing fields. Fields the extractor does not read are skipped while parsing.
+
+    class MouseMovement(msgspec.Struct):
+        velocity: float = 0.0
+        acceleration: float = 0.0
+        pressure: float = 0.0
+        jitter: float = 0.0
+
+    class Keystroke(msgspec.Struct):
+        key: Any = ''
+        timestamp: float = NAN
+        pressure: float = 0.0
+
+    class Click(msgspec.Struct):
+        timestamp: float = NAN
+        accuracy: float = 0.5
+        pressure: float = 0.0
+        x: float = 0.0
+        y: float = 0.0
+        duration: float = 0.0
+        clickType: Any = None
+        button: Any = None
+
+    class FormInteraction(msgspec.Struct):
+        focusTime: float = 0.0
+        dwellTime: float = 0.0
+        changeCount: float = 0.0
+        tabOrder: float = 0.0
+        validationErrors: float = 0.0
+        interactionType: Any = None
+        value: Any = ''
+
+    class BehaviorPayload(msgspec.Struct):
+        """Top-level fields used by the API; absent fields stay absent in the decoded dict"""
+        mouseMovements: Union[list[MouseMovement], UnsetType] = UNSET
+        keystrokes: Union[list[Keystroke], UnsetType] = UNSET
+        clicks: Union[list[Click], UnsetType] = UNSET
+        formInteractions: Union[list[FormInteraction], UnsetType] = UNSET
+        # Only counted, so their contents are left unparsed
+        focusEvents: Union[list[msgspec.Raw], UnsetType] = UNSET
+        blurEvents: Union[list[msgspec.Raw], UnsetType] = UNSET
+        pageViewTime: Any = UNSET
+        suspiciousPatternCount: Any = UNSET
+        scrollDistance: Any = UNSET
+        idleTime: Any = UNSET
+        mouseJitter: Any = UNSET
+        irregularPatterns: Any = UNSET
+        clickAccuracy: Any = UNSET
+        typingRhythm: Any = UNSET
+        sessionId: Any = UNSET
+        seq: Any = UNSET
+
+    class BatchEnvelope(msgspec.Struct):
+        sessions: list[BehaviorPayload]
+
+    _payload_decoder = msgspec.json.Decoder(BehaviorPayload)
+    _batch_decoder = msgspec.json.Decoder(Union[list[BehaviorPayload], BatchEnvelope])
+    _untyped_decoder = msgspec.json.Decoder()
+
+
+def decoder_backend():
+    """Name of the backend used for request bodies"""
+    if JSON_DECODER != 'auto':
+        return JSON_DECODER
+    if msgspec is not None:
+        return 'msgspec'
+    if orjson is not None:
+        return 'orjson'
+    return 'json'
+
+
+def _loads(raw):
+    """Untyped decode with the fastest available library"""
+    backend = decoder_backend()
+    if backend == 'msgspec':
+        return _untyped_decoder.decode(raw)
+    if backend == 'orjson':
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _as_dict(payload):
+    return {field: value for field, value in msgspec.structs.asdict(payload).items() if value is not UNSET}
+
+
+def decode_payload(raw):
+    """Decode one behavior payload; returns None for an empty or malformed body.
+
+    Well-formed payloads come back as a dict whose event lists hold typed
+    records. Anything the schema rejects (wrong types, nulls, a non-object
+    body) is decoded untyped instead, so the API sees exactly what the plain
+    JSON decoder would have produced.
+    """
+    if not raw:
+        return None
+    try:
+        if decoder_backend() == 'msgspec':
+            try:
+                return _as_dict(_payload_decoder.decode(raw))
+            except msgspec.ValidationError:
+                pass
+        return _loads(raw)
+    except ValueError:  # includes msgspec / orjson decode errors
+        return None
+
+
+def decode_request(raw, content_type=None):
+    """Decode a single-session request body by its content type (binary columnar or JSON)"""
+    if content_type == WIRE_CONTENT_TYPE:
+        try:
+            return decode_behavior(raw) if raw else None
+        except ValueError:
+            return None
+    return decode_payload(raw)
+
+
+def decode_batch(raw):
+    """Decode a /predict-ai/batch body ({"sessions": [...]} or a bare list) to a list, or None"""
+    if not raw:
+        return None
+    try:
+        if decoder_backend() == 'msgspec':
+            try:
+                sessions = _batch_decoder.decode(raw)
+                if isinstance(sessions, BatchEnvelope):
+                    sessions = sessions.sessions
+                return [_as_dict(session) for session in sessions]
+            except msgspec.ValidationError:
+                pass
+        payload = _loads(raw)
+    except ValueError:
+        return None
+    return payload.get('sessions') if isinstance(payload, dict) else payload
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Bounded Behavior Payload Ingestion
+Caps the size of request bodies and the number of events per stream so a single
+oversized or abusive session cannot blow up worker memory or scoring time.
+"""
+
+import os
+import random
+
+from behavior_features import STREAM_COUNT_FEATURES, ColumnarEvents
+
+# Largest accepted body for single-session endpoints (/predict-ai, /track-delta)
+MAX_BODY_BYTES = int(os.environ.get('AI_MAX_BODY_BYTES', 2 * 1024 * 1024))
+# Largest accepted body for /predict-ai/batch
+MAX_BATCH_BODY_BYTES = int(os.environ.get('AI_MAX_BATCH_BODY_BYTES', 32 * 1024 * 1024))
+
+# Per-stream event caps and how an oversized stream is reduced:
+#   sample - uniform random subset in original order (per-event statistics stay unbiased)
+#   window - most recent events (keeps consecutive timestamps, so intervals stay valid)
+STREAM_CAPS = {
+    'mouseMovements': (int(os.environ.get('AI_MAX_MOUSE_MOVEMENTS', 5000)), 'sample'),
+    'keystrokes': (int(os.environ.get('AI_MAX_KEYSTROKES', 2000)), 'window'),
+    'clicks': (int(os.environ.get('AI_MAX_CLICKS', 1000)), 'window'),
+    'formInteractions': (int(os.environ.get('AI_MAX_FORM_INTERACTIONS', 500)), 'window'),
+    'focusEvents': (int(os.environ.get('AI_MAX_FOCUS_EVENTS', 1000)), 'window'),
+    'blurEvents': (int(os.environ.get('AI_MAX_BLUR_EVENTS', 1000)), 'window'),
+}
+
+
+def _sample_in_order(events, k):
+    """Uniform sample of k events, keeping their original order.
+
+    The list is already in memory, so this draws the reservoir's k positions
+    directly instead of streaming through every event.
+    """
+    # Seeded by the length so a re-posted snapshot is reduced the same way
+    indices = sorted(random.Random(len(events)).sample(range(len(events)), k))
+    if isinstance(events, ColumnarEvents):
+        return events.take(indices)
+    return [events[i] for i in indices]
+
+
+def cap_events(behavior_data, caps=None):
+    """Apply per-stream caps; returns (capped payload, truncation report)"""
+    caps = STREAM_CAPS if caps is None else caps
+    truncated = {}
+    capped = None
+
+    for name, (limit, strategy) in caps.items():
+        events = behavior_data.get(name)
+        if not isinstance(events, (list, ColumnarEvents)) or len(events) <= limit:
+            continue
+
+        if capped is None:
+            capped = dict(behavior_data)  # shallow copy; the caller's payload is left as is
+        capped[name] = _sample_in_order(events, limit) if strategy == 'sample' else events[-limit:]
+        truncated[name] = {'received': len(events), 'kept': limit, 'strategy': strategy}
+
+    return (capped if capped is not None else behavior_data), truncated
+
+
+def split_events(behavior_data, caps=None):
+    """Split a payload into consecutive parts holding at most each stream's cap of events.
+
+    For incremental ingestion (/track-delta): every event is kept, in order, so the
+    running counts and intervals stay exact while each part stays bounded. Scalar
+    fields go out with the first part.
+    """
+    caps = STREAM_CAPS if caps is None else caps
+    streams = {
+        name: limit for name, (limit, _) in caps.items()
+        if isinstance(behavior_data.get(name), (list, ColumnarEvents))
+    }
+    n_parts = max([-(-len(behavior_data[name]) // limit) for name, limit in streams.items()] + [1])
+    if n_parts == 1:
+        return [behavior_data]
+
+    parts = [dict(behavior_data)] + [{} for _ in range(n_parts - 1)]
+    for name, limit in streams.items():
+        events = behavior_data[name]
+        for i, part in enumerate(parts):
+            part[name] = events[i * limit:(i + 1) * limit]
+    return parts
+
+
+def rescale_counts(features, truncated):
+    """Scale count-like features of truncated streams back up to the received totals"""
+    for name, info in truncated.items():
+        indices = STREAM_COUNT_FEATURES.get(name)
+        if indices and info['kept']:
+            features[indices] *= info['received'] / info['kept']
+    return features
+
+
+def body_too_large(content_length, limit=MAX_BODY_BYTES):
+    return content_length is not None and content_length > limit
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Behavior Scoring Cache
+Bounded LRU cache with TTL for trust-score results, keyed by a content hash of the payload
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def payload_key(raw_body):
+    """Content hash of a raw request body.
+
+    Hashing the bytes as received avoids re-serializing the payload: a sorted
+    json.dumps of a few hundred events costs several times more than the
+    feature extraction it is meant to skip.
+    """
+    return hashlib.sha256(raw_body).hexdigest()[:32]
+
+
+class ScoreCache:
+    """Thread-safe LRU cache whose entries expire `ttl_s` seconds after being stored"""
+
+    def __init__(self, max_entries=10000, ttl_s=30.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl_s
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_s': self.ttl_s,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
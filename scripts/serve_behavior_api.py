@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Production Server for the AI Behavior Detection API
+Runs ai_behavior_api under gunicorn with the model loaded once in the master process,
+so every forked worker shares the same copy-on-write model pages.
+
+Usage:
+    python scripts/serve_behavior_api.py --workers 4 --threads 8
+"""
+
+import argparse
+import gc
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ai_behavior_api
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # gunicorn is only needed for production serving
+    BaseApplication = object
+
+
+class BehaviorAPIServer(BaseApplication):
+    """Embedded gunicorn application serving the preloaded Flask app"""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return ai_behavior_api.app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Serve the AI Behavior Detection API with gunicorn')
+    parser.add_argument('--host', default=os.environ.get('AI_API_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('AI_API_PORT', 5001)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('AI_API_WORKERS', os.cpu_count() or 2)),
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('AI_API_THREADS', 8)),
+                        help='Threads per worker; concurrent requests in a worker share micro-batches')
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('AI_API_TIMEOUT', 30)))
+    parser.add_argument('--model-path', default=None, help='Override AI_MODEL_PATH')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if BaseApplication is object:
+        print("❌ gunicorn is not installed (pip install gunicorn)")
+        sys.exit(1)
+
+    ai_behavior_api.configure_logging()
+    print("🚀 Starting AI Behavior Detection API (production)...")
+
+    # Load before fork: workers inherit the model instead of unpickling their own copy
+    if not ai_behavior_api.load_model(args.model_path):
+        print("❌ Failed to load AI model. Exiting...")
+        sys.exit(1)
+
+    # Parallelism comes from worker processes, so keep each prediction single-threaded
+    if hasattr(ai_behavior_api.model, 'n_jobs'):
+        ai_behavior_api.model.n_jobs = 1
+
+    # A sync worker serves one request at a time, so there is nothing to micro-batch
+    # and the batching window would only add latency
+    if args.threads <= 1:
+        ai_behavior_api.batcher = None
+
+    # Move the loaded model out of the collector's view so GC passes in the
+    # workers do not touch (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+    options = {
+        'bind': f'{args.host}:{args.port}',
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'timeout': args.timeout,
+        'preload_app': True,
+        'accesslog': None,
+    }
+
+    print(f"🌐 Serving on http://{args.host}:{args.port} "
+          f"({args.workers} workers x {args.threads} threads)")
+    BehaviorAPIServer(options).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Incremental Behavior Feature Accumulator
+Keeps running statistics per waiting-room session so each poll only ingests the new
+events (O(delta)) instead of re-reading the whole history, and yields the same
+62-feature vector as behavior_features.extract_features on the full payload.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from behavior_features import EVENT_FIELDS, FEATURE_COUNT, SCALAR_FIELDS, _columns, _counts, _key_classes
+
+
+class SequenceGap(ValueError):
+    """A delta whose seq is not the next one this process expects for its session"""
+
+    def __init__(self, session_id, expected, received):
+        super().__init__(f"Delta seq {received} for session {session_id} does not follow seq {expected - 1}; "
+                         f"resend the session from seq 0")
+        self.session_id = session_id
+        self.expected = expected
+        self.received = received
+
+
+class RunningStats:
+    """Count, mean, population variance, min and max of a stream of values.
+
+    Deltas are merged with the parallel form of Welford's update (Chan et al.),
+    so a block of n new values costs one NumPy pass over those n values only.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        n = len(values)
+        if n == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    def summary(self):
+        """mean, std, min, max (the order used throughout the feature vector)"""
+        return self.mean, self.std, self.min, self.max
+
+
+class _IntervalStream:
+    """Gaps between consecutive event timestamps, carried across deltas"""
+
+    __slots__ = ('last_timestamp', 'stats')
+
+    def __init__(self):
+        self.last_timestamp = None
+        self.stats = RunningStats()
+
+    def update(self, timestamps):
+        """Add a block of timestamps and return the new intervals (missing pairs skipped)"""
+        if self.last_timestamp is not None:
+            timestamps = np.concatenate(([self.last_timestamp], timestamps))
+        self.last_timestamp = float(timestamps[-1])
+        gaps = np.diff(timestamps)
+        gaps = gaps[~np.isnan(gaps)]
+        self.stats.update(gaps)
+        return gaps
+
+
+class SessionAccumulator:
+    """Running feature state for one session, fed with event deltas"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_seen = time.monotonic()
+        # seq the next delta must carry; anything else means a delta was lost or repeated
+        self.next_seq = 0
+        self.scalars = {name: default for name, default in SCALAR_FIELDS}
+        self.focus_events = 0
+        self.blur_events = 0
+
+        self.mouse_moves = 0
+        self.mouse_velocity = RunningStats()
+        self.mouse_accel = RunningStats()
+        self.fast_movements = self.slow_movements = self.high_pressure_moves = 0
+        self.mouse_jitter_sum = 0.0
+
+        self.keystrokes = 0
+        self.keystroke_intervals = _IntervalStream()
+        self.keystroke_pressure = RunningStats()
+        self.key_classes = [0, 0, 0, 0]
+        self.fast_typing = self.slow_typing = 0
+
+        self.clicks = 0
+        self.click_intervals = _IntervalStream()
+        self.double_clicks = self.right_clicks = 0
+        self.click_accuracy_sum = self.click_pressure_sum = 0.0
+        self.edge_clicks = self.top_clicks = self.fast_clicks = self.slow_clicks = 0
+
+        self.form_interactions = 0
+        self.focus_time = RunningStats()
+        self.dwell_time = RunningStats()
+        self.interaction_types = [0, 0, 0]
+        self.change_count = self.validation_errors = 0.0
+        self.filled_fields = self.tab_navigation = 0
+        self.input_length_sum = 0.0
+
+    @property
+    def event_counts(self):
+        return {
+            'mouseMovements': self.mouse_moves,
+            'clicks': self.clicks,
+            'keystrokes': self.keystrokes,
+            'formInteractions': self.form_interactions
+        }
+
+    def update(self, delta):
+        """Ingest the events posted since the previous update"""
+        self.last_seen = time.monotonic()
+
+        # Session-level values the client reports as current totals rather than as events
+        for name, _ in SCALAR_FIELDS:
+            if name in delta:
+                self.scalars[name] = delta[name]
+        self.focus_events += len(delta.get('focusEvents', []))
+        self.blur_events += len(delta.get('blurEvents', []))
+
+        mouse_movements = delta.get('mouseMovements', [])
+        if mouse_movements:
+            velocity, acceleration, pressure, jitter = _columns(mouse_movements, EVENT_FIELDS['mouseMovements'])
+            self.mouse_moves += len(mouse_movements)
+            self.mouse_velocity.update(velocity)
+            self.mouse_accel.update(acceleration)
+            self.fast_movements += np.count_nonzero(velocity > 1000)
+            self.slow_movements += np.count_nonzero(velocity < 10)
+            self.high_pressure_moves += np.count_nonzero(pressure > 0.5)
+            self.mouse_jitter_sum += float(jitter.sum())
+
+        keystrokes_data = delta.get('keystrokes', [])
+        if keystrokes_data:
+            timestamps, key_pressure = _columns(keystrokes_data, EVENT_FIELDS['keystrokes'])
+            intervals = self.keystroke_intervals.update(timestamps)
+            self.keystrokes += len(keystrokes_data)
+            self.keystroke_pressure.update(key_pressure)
+            for i, count in enumerate(_key_classes(_counts(keystrokes_data, 'key', ''))):
+                self.key_classes[i] += count
+            self.fast_typing += np.count_nonzero(intervals < 100)
+            self.slow_typing += np.count_nonzero(intervals > 2000)
+
+        clicks_data = delta.get('clicks', [])
+        if clicks_data:
+            timestamps, accuracy, pressure, x, y, duration = _columns(clicks_data, EVENT_FIELDS['clicks'])
+            self.click_intervals.update(timestamps)
+            self.clicks += len(clicks_data)
+            self.double_clicks += _counts(clicks_data, 'clickType', None)['double']
+            self.right_clicks += _counts(clicks_data, 'button', None)[2]
+            self.click_accuracy_sum += float(accuracy.sum())
+            self.click_pressure_sum += float(pressure.sum())
+            self.edge_clicks += np.count_nonzero(x < 100)
+            self.top_clicks += np.count_nonzero(y < 100)
+            self.fast_clicks += np.count_nonzero(duration < 50)
+            self.slow_clicks += np.count_nonzero(duration > 500)
+
+        form_data = delta.get('formInteractions', [])
+        if form_data:
+            focus_time, dwell_time, change_count, tab_order, validation_errors = _columns(
+                form_data, EVENT_FIELDS['formInteractions']
+            )
+            values = _counts(form_data, 'value', '')
+            interaction_types = _counts(form_data, 'interactionType', None)
+
+            self.form_interactions += len(form_data)
+            self.focus_time.update(focus_time)
+            self.dwell_time.update(dwell_time)
+            for i, kind in enumerate(('input', 'select', 'textarea')):
+                self.interaction_types[i] += interaction_types[kind]
+            self.change_count += float(change_count.sum())
+            self.filled_fields += len(form_data) - values['']
+            self.input_length_sum += sum(len(str(value)) * count for value, count in values.items())
+            self.tab_navigation += np.count_nonzero(tab_order > 0)
+            self.validation_errors += float(validation_errors.sum())
+
+    def features(self):
+        """Current 62-feature vector, in O(1) from the running state"""
+        features = np.zeros(FEATURE_COUNT, dtype=np.float64)
+        scalars = self.scalars
+        page_view_time = scalars['pageViewTime']
+
+        features[0:6] = (
+            self.mouse_moves,
+            self.clicks,
+            self.keystrokes,
+            self.form_interactions,
+            page_view_time,
+            scalars['suspiciousPatternCount']
+        )
+
+        if self.mouse_moves:
+            features[6:10] = self.mouse_velocity.summary()
+            features[10:14] = self.mouse_accel.summary()
+            features[14:18] = (
+                self.fast_movements,
+                self.slow_movements,
+                self.high_pressure_moves,
+                self.mouse_jitter_sum / self.mouse_moves
+            )
+
+        if self.keystrokes > 1 and self.keystroke_intervals.stats.count:
+            features[18:22] = self.keystroke_intervals.stats.summary()
+            features[22:26] = self.key_classes
+            features[26:30] = (
+                self.keystrokes / (page_view_time / 1000) if page_view_time > 0 else 0,
+                self.fast_typing,
+                self.slow_typing,
+                self.keystroke_pressure.std
+            )
+
+        if self.clicks:
+            if self.click_intervals.stats.count:
+                features[30:34] = self.click_intervals.stats.summary()
+            features[34:42] = (
+                self.double_clicks,
+                self.right_clicks,
+                self.click_accuracy_sum / self.clicks,
+                self.click_pressure_sum / self.clicks,
+                self.edge_clicks,
+                self.top_clicks,
+                self.fast_clicks,
+                self.slow_clicks
+            )
+
+        if self.form_interactions:
+            features[42:54] = (
+                self.focus_time.mean,
+                self.focus_time.std,
+                self.dwell_time.mean,
+                self.dwell_time.std,
+                *self.interaction_types,
+                self.change_count,
+                self.filled_fields,
+                self.input_length_sum / self.form_interactions,
+                self.tab_navigation,
+                self.validation_errors
+            )
+
+        features[54:62] = (
+            scalars['scrollDistance'],
+            scalars['idleTime'],
+            self.focus_events,
+            self.blur_events,
+            scalars['mouseJitter'],
+            scalars['irregularPatterns'],
+            scalars['clickAccuracy'],
+            scalars['typingRhythm']
+        )
+
+        return features
+
+
+class SessionStore:
+    """Thread-safe LRU of session accumulators with an idle timeout.
+
+    State lives in the worker process. Deltas carry a per-session seq, so a delta
+    landing on a worker that missed earlier ones (or after an eviction) is detected
+    by append and the client resends the session from seq 0; session-sticky
+    routing keeps those resends rare.
+    """
+
+    def __init__(self, max_sessions=10000, idle_ttl_s=1800.0):
+        self.max_sessions = max_sessions
+        self.idle_ttl_s = idle_ttl_s
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.sequence_gaps = 0
+
+    def get(self, session_id):
+        """Return the accumulator for a session, creating a fresh one if needed"""
+        now = time.monotonic()
+        with self._lock:
+            accumulator = self._sessions.get(session_id)
+            if accumulator is not None and now - accumulator.last_seen > self.idle_ttl_s:
+                del self._sessions[session_id]
+                self.expirations += 1
+                accumulator = None
+
+            if accumulator is None:
+                accumulator = SessionAccumulator()
+                self._sessions[session_id] = accumulator
+                self.created += 1
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            return accumulator
+
+    def append(self, session_id, seq, parts):
+        """Ingest a session's delta #seq (as one or more event parts) and return its
+        feature vector and event counts.
+
+        seq 0 starts the session over. Any other seq must directly follow the last one
+        ingested here, otherwise the session's state is dropped and SequenceGap raised.
+        """
+        if seq == 0:
+            self.discard(session_id)
+        accumulator = self.get(session_id)
+        with accumulator.lock:
+            if seq != accumulator.next_seq:
+                with self._lock:
+                    if self._sessions.get(session_id) is accumulator:
+                        del self._sessions[session_id]
+                self.sequence_gaps += 1
+                raise SequenceGap(session_id, accumulator.next_seq, seq)
+            for part in parts:
+                accumulator.update(part)
+            accumulator.next_seq += 1
+            return accumulator.features(), accumulator.event_counts
+
+    def discard(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'created': self.created,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'sequence_gaps': self.sequence_gaps
+            }
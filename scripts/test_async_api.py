@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Asyncio API Parity Tests
+Checks that the aiohttp server (ai_behavior_api_async.py) answers /predict-ai, /track-delta,
+/model-info and /health like the Flask app, including error statuses and 503 backpressure
+"""
+
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp.test_utils import TestClient, TestServer
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ai_behavior_api
+from ai_behavior_api_async import AsyncBehaviorAPI
+from behavior_features import session_to_payload
+from behavior_wire import WIRE_CONTENT_TYPE, encode_behavior
+from test_serving_scores import train_classifier
+
+
+def load_payloads():
+    classifier, sessions = train_classifier(RandomForestClassifier(n_estimators=20, random_state=5))
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        assert ai_behavior_api.load_model(path)
+    return [session_to_payload(session) for session in sessions[::30]]
+
+
+@contextlib.contextmanager
+def without_score_cache():
+    """Compare scoring itself: with the cache on, the second server would answer from it"""
+    cache, ai_behavior_api.score_cache = ai_behavior_api.score_cache, None
+    try:
+        yield
+    finally:
+        ai_behavior_api.score_cache = cache
+
+
+async def async_responses(requests, max_pending=16):
+    """(status, json) for each (method, path, kwargs) request against the aiohttp app"""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        api = AsyncBehaviorAPI(executor, pool_size=2, max_pending=max_pending)
+        async with TestClient(TestServer(api.build_app())) as client:
+            responses = []
+            for method, path, kwargs in requests:
+                response = await client.request(method, path, **kwargs)
+                responses.append((response.status, await response.json()))
+            return responses
+
+
+def flask_responses(requests):
+    client = ai_behavior_api.app.test_client()
+    responses = []
+    for method, path, kwargs in requests:
+        if 'data' in kwargs:
+            kwargs = {'data': kwargs['data'], 'content_type': kwargs['headers']['Content-Type']}
+        response = client.open(path, method=method, **kwargs)
+        responses.append((response.status_code, response.get_json()))
+    return responses
+
+
+def test_predictions_and_errors_match_flask():
+    payloads = load_payloads()
+    requests = [('POST', '/predict-ai', {'json': payload}) for payload in payloads]
+    requests += [
+        ('POST', '/predict-ai', {'data': encode_behavior(payloads[0]), 'headers': {'Content-Type': WIRE_CONTENT_TYPE}}),
+        ('POST', '/predict-ai', {'data': b'', 'headers': {'Content-Type': 'application/json'}}),
+        ('POST', '/predict-ai', {'data': b'[1, 2]', 'headers': {'Content-Type': 'application/json'}}),
+        ('POST', '/track-delta', {'json': {'mouseMovements': []}}),
+        ('GET', '/model-info', {})
+    ]
+
+    with without_score_cache():
+        expected = flask_responses(requests)
+        actual = asyncio.run(async_responses(requests))
+    assert [status for status, _ in actual] == [status for status, _ in expected]
+    assert [status for status, _ in expected][-5:] == [200, 400, 400, 400, 200]
+    for (_, got), (_, want) in zip(actual, expected):
+        assert got == want
+
+
+def test_track_delta_matches_flask():
+    payloads = load_payloads()
+    # seq 5 skips ahead: both servers drop the session and ask for a resend from seq 0
+    seqs = [0, 1, 2, 5]
+    deltas = [dict(payload, sessionId=f'{server}-parity', seq=seq) for seq, payload in zip(seqs, payloads)
+              for server in ('flask', 'async')]
+    flask = flask_responses([('POST', '/track-delta', {'json': d}) for d in deltas[::2]])
+    actual = asyncio.run(async_responses([('POST', '/track-delta', {'json': d}) for d in deltas[1::2]]))
+
+    assert [status for status, _ in flask] == [status for status, _ in actual] == [200, 200, 200, 409]
+    for (_, got), (_, want) in zip(actual, flask):
+        assert got.pop('session_id') == 'async-parity' and want.pop('session_id') == 'flask-parity'
+        if 'error' in want:
+            assert got.pop('error').replace('async', 'flask') == want.pop('error')
+        assert got == want
+
+
+def test_health_and_backpressure():
+    load_payloads()
+    (status, health), = asyncio.run(async_responses([('GET', '/health', {})]))
+    assert status == 200
+    assert set(health) - {'async'} == set(ai_behavior_api.app.test_client().get('/health').get_json())
+    assert health['async'] == {'pending': 0, 'max_pending': 16, 'rejected': 0}
+
+    # With no room for pending requests every scoring call is shed with a 503
+    (status, body), = asyncio.run(async_responses([('POST', '/predict-ai', {'json': {}})], max_pending=0))
+    assert status == 503 and body['prediction'] == 'bot'
+
+
+if __name__ == "__main__":
+    test_predictions_and_errors_match_flask()
+    test_track_delta_matches_flask()
+    test_health_and_backpressure()
+    print("✅ All asyncio API parity tests passed")
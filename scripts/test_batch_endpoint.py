@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Batch Endpoint Tests
+Checks that /predict-ai/batch scores each session exactly like a /predict-ai call, in input
+order, that malformed items fail on their own without failing the batch, and that only the
+batch endpoint accepts bodies above the single-session limit
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ai_behavior_api
+from behavior_features import session_to_payload
+from test_serving_scores import train_classifier
+
+
+def load_api():
+    classifier, sessions = train_classifier(RandomForestClassifier(n_estimators=20, random_state=3))
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        assert ai_behavior_api.load_model(path)
+    return ai_behavior_api.app.test_client(), [session_to_payload(session) for session in sessions]
+
+
+def test_batch_matches_single_calls():
+    client, payloads = load_api()
+    payloads = payloads[::15]
+
+    response = client.post('/predict-ai/batch', json={'sessions': payloads})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == body['scored'] == len(payloads)
+    assert body['model_type'] == 'RandomForestClassifier'
+
+    singles = [client.post('/predict-ai', json=payload).get_json() for payload in payloads]
+    for batched, single in zip(body['results'], singles):
+        assert batched['prediction'] == single['prediction']
+        assert batched['trust_score'] == single['trust_score']
+        np.testing.assert_allclose(batched['confidence'], single['confidence'], rtol=0, atol=1e-12)
+
+    # A bare list is accepted too
+    bare = client.post('/predict-ai/batch', json=payloads).get_json()
+    assert [r['confidence'] for r in bare['results']] == [r['confidence'] for r in body['results']]
+
+
+def test_malformed_items_fail_individually():
+    client, payloads = load_api()
+    items = [payloads[0], 42, 'not a session', None, payloads[-1]]
+
+    body = client.post('/predict-ai/batch', json={'sessions': items}).get_json()
+    assert body['count'] == 5 and body['scored'] == 2
+    for i in (1, 2, 3):
+        assert body['results'][i]['error'] == 'Feature extraction failed'
+        assert body['results'][i]['prediction'] == 'bot'
+    for i in (0, 4):
+        assert 'error' not in body['results'][i]
+        assert body['results'][i]['trust_score'] == client.post('/predict-ai', json=items[i]).get_json()['trust_score']
+
+
+def test_empty_and_oversized_batches_are_rejected():
+    client, payloads = load_api()
+    assert client.post('/predict-ai/batch', json={'sessions': []}).status_code == 400
+    assert client.post('/predict-ai/batch', data=b'{not json', content_type='application/json').status_code == 400
+
+    too_many = [{'pageViewTime': 1000}] * (ai_behavior_api.BATCH_MAX_SESSIONS + 1)
+    response = client.post('/predict-ai/batch', json=too_many)
+    assert response.status_code == 413 and response.get_json()['error'].startswith('Too many sessions')
+
+
+def test_streamed_bodies_are_limited_per_endpoint():
+    client, payloads = load_api()
+
+    def post_chunked(path, body):
+        # No Content-Length: the body is only bounded while it is being read
+        return client.post(path, input_stream=io.BytesIO(body), content_type='application/json',
+                           headers={'Transfer-Encoding': 'chunked'}, environ_overrides={'wsgi.input_terminated': True})
+
+    padded = dict(payloads[0], padding='x' * ai_behavior_api.MAX_BODY_BYTES)
+    assert post_chunked('/predict-ai', json.dumps(padded).encode()).status_code == 413
+    assert post_chunked('/track-delta', json.dumps(dict(padded, sessionId='s', seq=0)).encode()).status_code == 413
+    assert post_chunked('/predict-ai', json.dumps(payloads[0]).encode()).status_code == 200
+
+    body = post_chunked('/predict-ai/batch', json.dumps([padded]).encode()).get_json()
+    assert body['count'] == body['scored'] == 1
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_calls()
+    test_malformed_items_fail_individually()
+    test_empty_and_oversized_batches_are_rejected()
+    test_streamed_bodies_are_limited_per_endpoint()
+    print("✅ All batch endpoint tests passed")
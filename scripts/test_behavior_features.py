@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Behavior Feature Extraction Tests
+Checks the vectorized extractor against feature vectors recorded from the original implementation
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from behavior_features import (
+    extract_feature_matrix, extract_features, session_to_payload, FEATURE_COUNT, FEATURE_NAMES
+)
+from payload_decoder import decode_request
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data', 'behavior_payloads.json')
+
+
+def load_recorded_payloads():
+    with open(FIXTURE_PATH, 'r') as f:
+        return json.load(f)
+
+
+def test_feature_names_match_count():
+    assert len(FEATURE_NAMES) == FEATURE_COUNT
+
+
+def test_vectorized_extractor_matches_recorded_features():
+    for i, case in enumerate(load_recorded_payloads()):
+        features = extract_features(case['payload'])
+        assert features.shape == (FEATURE_COUNT,), f"payload {i}"
+        np.testing.assert_allclose(features, case['expected'], rtol=1e-12, atol=1e-9, err_msg=f"payload {i}")
+
+
+def test_training_sessions_map_onto_payload_schema():
+    session = {
+        'session_duration': 42000,
+        'mouse_movements': [{'timestamp': 10, 'x': 1, 'y': 2, 'velocity': 1500, 'acceleration': 3, 'pressure': 0.9}],
+        'keystrokes': [{'timestamp': 100, 'key': 'a'}, {'timestamp': 250, 'key': 'Backspace'}],
+        'clicks': [{'timestamp': 300, 'x': 50, 'y': 500, 'accuracy': 0.7, 'button': 0, 'pressure': 0.4}],
+        'form_interactions': {
+            'email': {'focusTime': 3000, 'completionTime': 3400, 'inputCount': 12, 'corrections': 2,
+                      'fieldType': 'email'},
+            'message': {'focusTime': 9000, 'completionTime': 9000, 'inputCount': 40, 'fieldType': 'message'}
+        },
+        'scroll_events': [{'deltaY': -120}, {'deltaY': 80}],
+        'window_events': [{'type': 'focus'}, {'type': 'blur'}, {'type': 'visibility_change'}],
+        'metrics': {'mouse_jitter': 1.5, 'click_accuracy': 0.8, 'typing_rhythm_consistency': 0.4},
+        'suspicious_patterns': [{'type': 'low_jitter'}],
+        'label': 'bot'
+    }
+    features = dict(zip(FEATURE_NAMES, extract_features(session_to_payload(session))))
+
+    assert (features['mouse_moves'], features['keystrokes'], features['form_interactions']) == (1, 2, 2)
+    assert features['page_view_time'] == 42000 and features['suspicious_patterns'] == 1
+    assert features['fast_movements'] == 1 and features['correction_keys'] == 1
+    assert features['keystroke_interval_mean'] == 150 and features['edge_clicks'] == 1
+    assert features['dwell_time_mean'] == 200 and features['textarea_interactions'] == 1
+    assert features['change_count'] == 52 and features['validation_errors'] == 2
+    assert features['scroll_distance'] == 200
+    assert (features['focus_events'], features['blur_events']) == (1, 1)
+    assert (features['mouse_jitter_metric'], features['typing_rhythm']) == (1.5, 0.4)
+
+
+def test_api_payloads_pass_through_and_batch_matches_rows():
+    payloads = [case['payload'] for case in load_recorded_payloads()]
+    assert all(session_to_payload(payload) is payload for payload in payloads)
+
+    matrix = extract_feature_matrix(payloads)
+    assert matrix.shape == (len(payloads), FEATURE_COUNT)
+    for row, payload in zip(matrix, payloads):
+        np.testing.assert_array_equal(row, extract_features(payload))
+
+
+def test_unhashable_field_values_are_counted():
+    # Valid JSON the original per-event loops accepted: non-string form values and click types
+    payload = {
+        'formInteractions': [
+            {'interactionType': 'select', 'value': ['economy', 'business']},
+            {'interactionType': ['input'], 'value': {'day': 3}},
+            {'interactionType': 'input', 'value': ''},
+            {'interactionType': 'input', 'value': 'Jakarta'}
+        ],
+        'clicks': [{'timestamp': 1000, 'clickType': ['double'], 'button': {'id': 2}}],
+        'pageViewTime': 30000
+    }
+    features = extract_features(payload)
+    names = dict(zip(FEATURE_NAMES, features))
+
+    assert names['filled_fields'] == 3
+    expected_length = len(str(['economy', 'business'])) + len(str({'day': 3})) + len('Jakarta')
+    np.testing.assert_allclose(names['avg_input_length'], expected_length / 4)
+    assert names['input_interactions'] == 2 and names['select_interactions'] == 1
+    assert names['double_clicks'] == 0 and names['right_clicks'] == 0
+    # Same result through the typed request decoder used by the API
+    np.testing.assert_allclose(extract_features(decode_request(json.dumps(payload).encode(), 'application/json')),
+                               features)
+
+
+if __name__ == "__main__":
+    test_feature_names_match_count()
+    test_vectorized_extractor_matches_recorded_features()
+    test_training_sessions_map_onto_payload_schema()
+    test_api_payloads_pass_through_and_batch_matches_rows()
+    test_unhashable_field_values_are_counted()
+    print("✅ All behavior feature tests passed")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Behavior Training Pipeline Tests
+Checks parallel and streamed feature extraction and concurrent model training against the serial paths
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from threadpoolctl import threadpool_info
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from behavior_features import FEATURE_COUNT
+from ai_training.generate_training_data import DEFAULT_SHARDS, BehaviorDataGenerator, generate_shards
+from ai_training.feature_cache import FeatureCache, extractor_fingerprint
+from ai_training.train_behavior_model import BehaviorClassifier, feature_fingerprint
+from ai_training.columnar_corpus import pq
+from ai_training.training_corpus import iter_sessions, iter_training_samples, read_manifest, write_sessions
+from ai_training.training_orchestrator import TrainingOrchestrator
+
+
+class ThreadRecordingLogisticRegression(LogisticRegression):
+    """LogisticRegression noting the native thread pool sizes it was fitted under"""
+
+    pool_threads = []
+
+    def fit(self, X, y):
+        self.pool_threads.extend(pool['num_threads'] for pool in threadpool_info())
+        return super().fit(X, y)
+
+
+def generate_sessions(n=120):
+    return BehaviorDataGenerator(seed=11).generate_training_dataset(human_samples=n // 2, bot_samples=n // 2)
+
+
+def test_seeded_generator_is_reproducible():
+    sessions = generate_sessions(40)
+    assert json.dumps(sessions) == json.dumps(generate_sessions(40))
+    assert json.dumps(sessions) != json.dumps(BehaviorDataGenerator(seed=12).generate_training_dataset(20, 20))
+    assert sum(s['is_human'] for s in sessions) == 20
+
+    for session in sessions:
+        duration = session['session_duration']
+        for events in ('mouse_movements', 'keystrokes', 'clicks', 'scroll_events'):
+            timestamps = [event['timestamp'] for event in session[events]]
+            assert timestamps == sorted(timestamps) and all(0 <= t <= duration for t in timestamps)
+        keystrokes = session['keystrokes']
+        assert session['metrics']['total_corrections'] == sum(k['key'] == 'Backspace' for k in keystrokes)
+        assert all(k['keyCode'] == (8 if k['isCorrection'] else ord(k['key'])) for k in keystrokes)
+        assert set(session['form_interactions']) == {f['fieldType'] for f in session['form_interactions'].values()}
+        generator = BehaviorDataGenerator()
+        assert session['suspicious_patterns'] == generator.calculate_suspicious_patterns(session, session['is_human'])
+
+
+def test_parallel_extraction_matches_serial_in_order():
+    sessions = generate_sessions()
+    X_serial, y_serial = BehaviorClassifier(n_jobs=1, chunk_size=50).prepare_data(sessions)
+    X_parallel, y_parallel = BehaviorClassifier(n_jobs=3, chunk_size=16).prepare_data(sessions)
+
+    assert X_parallel.dtype == np.float32 and X_parallel.shape == (len(sessions), FEATURE_COUNT)
+    np.testing.assert_array_equal(X_parallel, X_serial)
+    np.testing.assert_array_equal(y_parallel, y_serial)
+    np.testing.assert_array_equal(y_parallel, [s['label'] == 'human' for s in sessions])
+
+
+def test_bad_samples_are_skipped():
+    sessions = generate_sessions(40)
+    broken = {key: value for key, value in sessions[5].items() if key != 'label'}
+    data = sessions[:5] + [broken] + sessions[5:]
+
+    X, y = BehaviorClassifier(n_jobs=2, chunk_size=8).prepare_data(data)
+    X_clean, y_clean = BehaviorClassifier(n_jobs=1).prepare_data(sessions)
+    np.testing.assert_array_equal(X, X_clean)
+    np.testing.assert_array_equal(y, y_clean)
+
+
+def test_streamed_corpus_matches_in_memory_list():
+    sessions = generate_sessions(60)
+    X_list, y_list = BehaviorClassifier(n_jobs=1).prepare_data(sessions)
+
+    with tempfile.TemporaryDirectory() as path:
+        corpus = os.path.join(path, 'corpus.ndjson')
+        assert write_sessions(iter(sessions), corpus) == len(sessions)
+        for n_jobs in (1, 2):
+            X, y = BehaviorClassifier(n_jobs=n_jobs, chunk_size=7).prepare_data(iter_sessions(corpus))
+            np.testing.assert_array_equal(X, X_list)
+            np.testing.assert_array_equal(y, y_list)
+
+        with open(corpus, 'a') as f:
+            f.write('{"label": \n')
+        try:
+            list(iter_sessions(corpus))
+            assert False, "truncated line should raise"
+        except ValueError as e:
+            assert f"corpus.ndjson:{len(sessions) + 1}" in str(e)
+
+
+def test_columnar_corpus_round_trips_and_extracts_like_sessions():
+    sessions = generate_sessions(60)
+    X_list, y_list = BehaviorClassifier(n_jobs=1).prepare_data(sessions)
+
+    with tempfile.TemporaryDirectory() as path:
+        for extension in ('.npz', '.parquet') if pq is not None else ('.npz',):
+            corpus = os.path.join(path, f"corpus{extension}")
+            assert write_sessions(iter(sessions), corpus) == len(sessions)
+            assert list(iter_sessions(corpus)) == sessions
+
+            # Training reads ColumnarEvents payloads straight from the columns
+            samples = list(iter_training_samples(corpus))
+            assert 'mouse_movements' not in samples[0] and samples[0]['label'] == sessions[0]['label']
+            for n_jobs in (1, 2):
+                X, y = BehaviorClassifier(n_jobs=n_jobs, chunk_size=7).prepare_data(iter_training_samples(corpus))
+                np.testing.assert_array_equal(X, X_list)
+                np.testing.assert_array_equal(y, y_list)
+
+        empty = os.path.join(path, 'empty.npz')
+        assert write_sessions([], empty) == 0 and list(iter_sessions(empty)) == []
+
+
+def test_feature_cache_reuses_matrix_until_corpus_or_extractor_changes():
+    sessions = generate_sessions(40)
+    X_fresh, y_fresh = BehaviorClassifier(n_jobs=1).prepare_data(sessions)
+
+    with tempfile.TemporaryDirectory() as path:
+        corpus = os.path.join(path, 'corpus.ndjson')
+        cache_dir = os.path.join(path, 'cache')
+        write_sessions(sessions, corpus)
+
+        X, y = BehaviorClassifier(n_jobs=1, cache_dir=cache_dir).prepare_corpus(corpus)
+        X_cached, y_cached = BehaviorClassifier(n_jobs=1, cache_dir=cache_dir).prepare_corpus(corpus)
+        assert not isinstance(X, np.memmap) and isinstance(X_cached, np.memmap)
+        np.testing.assert_array_equal(X_cached, X_fresh)
+        np.testing.assert_array_equal(y_cached, y_fresh)
+
+        cache = FeatureCache(os.path.join(cache_dir, 'features'))
+        assert cache.load(cache.key(corpus, feature_fingerprint())) is not None
+        # The key covers prepare_data and the corpus readers, not just the per-session extractor
+        assert feature_fingerprint() != extractor_fingerprint(BehaviorClassifier.prepare_data)
+        assert cache.load(cache.key(corpus, extractor_fingerprint(generate_sessions))) is None
+
+        write_sessions(sessions[:-1], corpus)
+        X_changed, _ = BehaviorClassifier(n_jobs=1, cache_dir=cache_dir).prepare_corpus(corpus)
+        assert not isinstance(X_changed, np.memmap) and len(X_changed) == len(sessions) - 1
+        assert len(os.listdir(cache.cache_dir)) == 2
+
+
+def test_sharded_generation_is_independent_of_worker_count():
+    with tempfile.TemporaryDirectory() as path:
+        serial = generate_shards(os.path.join(path, 'serial'), 30, 20, shards=3, n_jobs=1, seed=5, batch_size=8)
+        parallel = generate_shards(os.path.join(path, 'parallel'), 30, 20, shards=3, n_jobs=2, seed=5, batch_size=8)
+
+        assert (parallel['sessions'], parallel['humans'], parallel['bots']) == (50, 30, 20)
+        assert [shard['sessions'] for shard in parallel['shards']] == [17, 17, 16]
+        assert [shard['humans'] for shard in parallel['shards']] == [10, 10, 10]
+        assert read_manifest(os.path.join(path, 'parallel'))['shards'] == parallel['shards']
+        for serial_shard, parallel_shard in zip(serial['shards'], parallel['shards']):
+            assert list(iter_sessions(serial_shard['path'])) == list(iter_sessions(parallel_shard['path']))
+
+        sessions = list(iter_sessions(os.path.join(path, 'parallel')))
+        assert len(sessions) == 50 and sum(s['is_human'] for s in sessions) == 30
+        assert len({s['userId'] for s in sessions}) > 45
+
+        # Without a shard count the seed alone fixes the corpus, whatever the worker count
+        one = generate_shards(os.path.join(path, 'default-1'), 20, 20, n_jobs=1, seed=5, batch_size=8)
+        two = generate_shards(os.path.join(path, 'default-2'), 20, 20, n_jobs=2, seed=5, batch_size=8)
+        assert len(one['shards']) == len(two['shards']) == DEFAULT_SHARDS
+        assert list(iter_sessions(os.path.join(path, 'default-1'))) == list(iter_sessions(os.path.join(path, 'default-2')))
+
+
+def test_orchestrator_matches_serial_and_reuses_cached_fits():
+    X, y = BehaviorClassifier(n_jobs=1).prepare_data(generate_sessions(80))
+    candidates = {
+        'RandomForest': RandomForestClassifier(n_estimators=10, random_state=3, n_jobs=-1),
+        'LogisticRegression': LogisticRegression(max_iter=500)
+    }
+    serial = TrainingOrchestrator(n_jobs=1, cv=3).run(candidates, X, y)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = TrainingOrchestrator(n_jobs=2, cv=3, cache_dir=cache_dir).run(candidates, X, y)
+        again = TrainingOrchestrator(n_jobs=2, cv=3, cache_dir=cache_dir).run(candidates, X, y)
+        assert len(os.listdir(cache_dir)) == len(candidates) * 4
+
+    for name in candidates:
+        for result in (first, again):
+            np.testing.assert_array_equal(result[name]['cv_scores'], serial[name]['cv_scores'])
+            np.testing.assert_array_equal(result[name]['model'].predict_proba(X),
+                                          serial[name]['model'].predict_proba(X))
+        assert first[name]['cached_fits'] == 0 and again[name]['cached_fits'] == 4
+        assert serial[name]['wall_clock_seconds'] >= serial[name]['fit_seconds'] > 0
+
+
+def test_orchestrator_fits_identical_candidates_once():
+    X, y = BehaviorClassifier(n_jobs=1).prepare_data(generate_sessions(60))
+    candidates = {
+        'LogisticRegression': LogisticRegression(max_iter=500),
+        'SameLogisticRegression': LogisticRegression(max_iter=500),
+        'RandomForest': RandomForestClassifier(n_estimators=5, random_state=3)
+    }
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = TrainingOrchestrator(n_jobs=1, cv=3, cache_dir=cache_dir).run(candidates, X, y)
+        assert len(os.listdir(cache_dir)) == 2 * 4
+
+    assert results['SameLogisticRegression']['model'] is results['LogisticRegression']['model']
+    np.testing.assert_array_equal(results['SameLogisticRegression']['cv_scores'],
+                                  results['LogisticRegression']['cv_scores'])
+
+
+def test_orchestrator_keeps_fits_within_cpu_budget():
+    X, y = BehaviorClassifier(n_jobs=1).prepare_data(generate_sessions(60))
+    candidates = {
+        'RandomForest': RandomForestClassifier(n_estimators=5, random_state=3, n_jobs=-1),
+        'LogisticRegression': ThreadRecordingLogisticRegression(max_iter=500)
+    }
+    ThreadRecordingLogisticRegression.pool_threads.clear()
+    results = TrainingOrchestrator(n_jobs=1, cv=3).run(candidates, X, y)
+    # A budget of one CPU: no estimator n_jobs=-1 and no multi-threaded BLAS/OpenMP pool
+    assert results['RandomForest']['model'].n_jobs == 1
+    assert ThreadRecordingLogisticRegression.pool_threads
+    assert max(ThreadRecordingLogisticRegression.pool_threads) == 1
+
+    # Fewer tasks than CPUs: each of the 4 concurrent fits gets an equal share of 8
+    results = TrainingOrchestrator(n_jobs=8, cv=3).run({'RandomForest': candidates['RandomForest']}, X, y)
+    assert results['RandomForest']['model'].n_jobs == 2
+
+
+if __name__ == "__main__":
+    test_seeded_generator_is_reproducible()
+    test_parallel_extraction_matches_serial_in_order()
+    test_bad_samples_are_skipped()
+    test_streamed_corpus_matches_in_memory_list()
+    test_columnar_corpus_round_trips_and_extracts_like_sessions()
+    test_feature_cache_reuses_matrix_until_corpus_or_extractor_changes()
+    test_sharded_generation_is_independent_of_worker_count()
+    test_orchestrator_matches_serial_and_reuses_cached_fits()
+    test_orchestrator_fits_identical_candidates_once()
+    test_orchestrator_keeps_fits_within_cpu_budget()
+    print("✅ All behavior training tests passed")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Behavior Wire Format Tests
+Round-trips recorded payloads through the columnar binary encoding
+"""
+
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from behavior_features import ColumnarEvents, extract_features
+from behavior_wire import WIRE_CONTENT_TYPE, decode_behavior, encode_behavior
+from payload_decoder import decode_request
+from payload_limits import cap_events
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data', 'behavior_payloads.json')
+
+
+def load_recorded_payloads():
+    with open(FIXTURE_PATH, 'r') as f:
+        return json.load(f)
+
+
+def test_round_trip_matches_recorded_features():
+    for i, case in enumerate(load_recorded_payloads()):
+        for compress in (False, True):
+            precise = decode_behavior(encode_behavior(case['payload'], compress=compress, precise=True))
+            np.testing.assert_allclose(extract_features(precise), case['expected'], rtol=1e-12, atol=1e-9,
+                                       err_msg=f"payload {i}")
+
+            compact = decode_behavior(encode_behavior(case['payload'], compress=compress))
+            np.testing.assert_allclose(extract_features(compact), case['expected'], rtol=1e-5, atol=1e-4,
+                                       err_msg=f"payload {i} (float32)")
+
+
+def test_columns_are_views_of_the_request_body():
+    payload = max((case['payload'] for case in load_recorded_payloads()),
+                  key=lambda p: len(p.get('mouseMovements', [])))
+    decoded = decode_behavior(encode_behavior(payload, precise=True))
+    velocity = decoded['mouseMovements'].columns['velocity']
+
+    assert isinstance(decoded['mouseMovements'], ColumnarEvents)
+    assert velocity.base is not None and not velocity.flags.owndata
+    assert decoded['pageViewTime'] == payload['pageViewTime']
+
+
+def test_caps_apply_to_columnar_streams():
+    payload = max((case['payload'] for case in load_recorded_payloads()),
+                  key=lambda p: len(p.get('keystrokes', [])))
+    decoded = decode_behavior(encode_behavior(payload, precise=True))
+    limit = len(payload['keystrokes']) // 2
+    capped, truncated = cap_events(decoded, {'keystrokes': (limit, 'window'), 'mouseMovements': (10, 'sample')})
+
+    windowed = dict(payload, keystrokes=payload['keystrokes'][-limit:], mouseMovements=[])
+    expected = extract_features(windowed)
+    np.testing.assert_allclose(extract_features(capped)[18:30], expected[18:30], rtol=1e-12)
+    assert len(capped['mouseMovements']) == 10
+    assert truncated['keystrokes']['kept'] == limit
+
+
+def test_malformed_payloads_are_rejected():
+    raw = encode_behavior(load_recorded_payloads()[1]['payload'])
+    header_len = struct.unpack_from('<I', raw, 8)[0]
+    header = json.loads(raw[12:12 + header_len])
+    header['streams']['mouseMovements']['length'] *= 1000
+    forged = raw[:8] + struct.pack('<I', len(json.dumps(header))) + json.dumps(header).encode() + raw[12 + header_len:]
+
+    for body in (b'', b'BHVC', b'XXXX' + raw[4:], raw[:40], forged):
+        assert decode_request(body, WIRE_CONTENT_TYPE) is None
+
+
+def test_content_type_selects_the_decoder():
+    payload = load_recorded_payloads()[1]['payload']
+    as_json = decode_request(json.dumps(payload).encode(), 'application/json')
+    as_wire = decode_request(encode_behavior(payload, precise=True), WIRE_CONTENT_TYPE)
+
+    np.testing.assert_allclose(extract_features(as_wire), extract_features(as_json), rtol=1e-12, atol=1e-9)
+
+
+if __name__ == "__main__":
+    test_round_trip_matches_recorded_features()
+    test_columns_are_views_of_the_request_body()
+    test_caps_apply_to_columnar_streams()
+    test_malformed_payloads_are_rejected()
+    test_content_type_selects_the_decoder()
+    print("✅ All behavior wire format tests passed")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Candidate Model Comparison Tests
+Checks categorical handling for histogram boosting and the score/latency selection rule
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.metrics import r2_score
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_models import MEDIAN_LATENCY_KEY, categorical_mask, evaluate_candidate, select_candidate
+
+
+def make_demand_frame(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    route = rng.integers(0, 5, n)
+    train_type = rng.integers(0, 3, n)
+    day_of_week = rng.integers(0, 7, n)
+    # Route effects are not monotonic in the code, so ordinal splits need several cuts
+    bookings = np.array([300, 900, 150, 700, 400])[route] * (1 + 0.3 * train_type) \
+        + 80 * (day_of_week >= 5) + rng.normal(0, 20, n)
+    return pd.DataFrame({'RouteEncoded': route, 'TrainTypeEncoded': train_type, 'DayOfWeek': day_of_week}), bookings
+
+
+def r2(model, X, y):
+    return r2_score(y, model.predict(X))
+
+
+def test_categorical_mask_marks_low_cardinality_code_columns():
+    X, _ = make_demand_frame()
+    X['RouteTrain'] = np.arange(len(X))
+    assert categorical_mask(X, ['RouteEncoded', 'TrainTypeEncoded', 'RouteTrain']) == [True, True, False, False]
+
+
+def test_hist_gradient_boosting_splits_categories_natively():
+    X, y = make_demand_frame()
+    model = HistGradientBoostingRegressor(max_iter=50, max_depth=3, random_state=0,
+                                          categorical_features=categorical_mask(X, ['RouteEncoded', 'TrainTypeEncoded']))
+    result = evaluate_candidate(model, X[:2400], y[:2400], X[2400:], y[2400:], r2)
+
+    assert result['score'] > 0.99
+    assert result['fit_seconds'] > 0 and result['batch_rows'] == 600
+    assert 0 < result['single_row_p50_ms'] <= result['single_row_p99_ms']
+    assert 0 < result['batch_p50_ms'] <= result['batch_p99_ms']
+    assert model.is_categorical_.tolist() == [True, True, False]
+
+
+def test_selection_prefers_faster_model_within_tolerance():
+    results = {
+        'slow_best': {'score': 0.951, 'single_row_p99_ms': 2.0, 'fit_seconds': 10.0},
+        'fast_tied': {'score': 0.948, 'single_row_p99_ms': 0.5, 'fit_seconds': 1.0},
+        'fast_worse': {'score': 0.90, 'single_row_p99_ms': 0.1, 'fit_seconds': 0.1},
+    }
+    assert select_candidate(results, tolerance=0.005) == 'fast_tied'
+    assert select_candidate(results, tolerance=0.0) == 'slow_best'
+
+
+def test_median_latency_key_breaks_ties_on_p50():
+    # b has the better median but one slow outlier sample in its p99
+    results = {
+        'a': {'score': 0.95, 'single_row_p50_ms': 1.0, 'single_row_p99_ms': 1.5, 'fit_seconds': 1.0},
+        'b': {'score': 0.95, 'single_row_p50_ms': 0.8, 'single_row_p99_ms': 3.0, 'fit_seconds': 1.0},
+    }
+    assert select_candidate(results) == 'a'
+    assert select_candidate(results, latency_key=MEDIAN_LATENCY_KEY) == 'b'
+
+
+def test_latency_budget_filters_candidates():
+    results = {
+        'slow_best': {'score': 0.99, 'single_row_p99_ms': 12.0, 'fit_seconds': 10.0},
+        'medium': {'score': 0.96, 'single_row_p99_ms': 3.0, 'fit_seconds': 5.0},
+        'fast': {'score': 0.90, 'single_row_p99_ms': 0.2, 'fit_seconds': 0.1},
+    }
+    assert select_candidate(results, tolerance=0.0, latency_budget_ms=5) == 'medium'
+    assert select_candidate(results, tolerance=0.0, latency_budget_ms=50) == 'slow_best'
+    # Nothing fits: fall back to the fastest rather than failing training
+    assert select_candidate(results, tolerance=0.0, latency_budget_ms=0.01) == 'fast'
+
+    X, y = make_demand_frame(600)
+    fitted = {
+        'gb': evaluate_candidate(GradientBoostingRegressor(n_estimators=20, random_state=0),
+                                 X[:500], y[:500], X[500:], y[500:], r2)
+    }
+    assert select_candidate(fitted) == 'gb'
+
+
+if __name__ == "__main__":
+    test_categorical_mask_marks_low_cardinality_code_columns()
+    test_hist_gradient_boosting_splits_categories_natively()
+    test_selection_prefers_faster_model_within_tolerance()
+    test_median_latency_key_breaks_ties_on_p50()
+    test_latency_budget_filters_candidates()
+    print("✅ All candidate model tests passed")
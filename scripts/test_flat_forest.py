@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Flat-Array Forest Tests
+Checks FlatForest probabilities against sklearn's RandomForestClassifier.predict_proba,
+alone and with a StandardScaler folded into the thresholds
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flat_forest import FlatForest
+
+
+def fit_forest():
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(1500, 62)) * 100
+    y = (X[:, 0] + X[:, 5] - X[:, 17] > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=50, max_depth=10, random_state=42).fit(X, y)
+    return model, rng.normal(size=(300, 62)) * 100
+
+
+def test_batch_and_single_row_match_sklearn():
+    model, X = fit_forest()
+    forest = FlatForest.from_sklearn(model)
+
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(forest.predict_proba(X[7]), model.predict_proba(X[7:8]), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(forest.predict(X), model.predict(X))
+
+
+def test_missing_values_follow_sklearn():
+    model, X = fit_forest()
+    X[::5, 0] = np.nan
+    forest = FlatForest.from_sklearn(model)
+
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def rows_at_folded_thresholds(forest, base_row):
+    """One row per split and side: the feature set exactly at the folded threshold and
+    one float64 step either way, everything else taken from base_row"""
+    split = np.flatnonzero(~np.isinf(forest.threshold))
+    threshold, feature = forest.threshold[split], forest.feature[split]
+    rows = np.tile(base_row, (3 * len(split), 1))
+    for k, values in enumerate((threshold, np.nextafter(threshold, -np.inf), np.nextafter(threshold, np.inf))):
+        rows[3 * np.arange(len(split)) + k, feature] = values
+    return rows
+
+
+def test_folded_scaler_matches_scaler_pipeline():
+    rng = np.random.default_rng(7)
+    # Raw features on very different scales and offsets, as the behavior features are
+    spread, offset = rng.uniform(1, 1000, 62), rng.uniform(-500, 500, 62)
+    X = rng.normal(size=(1500, 62)) * spread + offset
+    y = (X[:, 0] / spread[0] + X[:, 5] / spread[5] - X[:, 17] / spread[17] > 0).astype(int)
+    X_new = rng.normal(size=(2000, 62)) * spread + offset
+
+    for with_mean, with_std in ((True, True), (False, True), (True, False), (False, False)):
+        scaler = StandardScaler(with_mean=with_mean, with_std=with_std).fit(X)
+        model = RandomForestClassifier(n_estimators=30, max_depth=10, random_state=7).fit(scaler.transform(X), y)
+        pipeline = make_pipeline(scaler, model)
+        forest = FlatForest.from_sklearn(model, scaler=scaler)
+
+        for rows in (X_new, rows_at_folded_thresholds(forest, X_new[0])):
+            np.testing.assert_allclose(forest.predict_proba(rows), pipeline.predict_proba(rows), rtol=0, atol=1e-12,
+                                       err_msg=f"with_mean={with_mean}, with_std={with_std}")
+        np.testing.assert_allclose(forest.predict_proba(X_new[3]), pipeline.predict_proba(X_new[3:4]),
+                                   rtol=0, atol=1e-12)
+
+
+def test_saved_forest_loads_memory_mapped():
+    model, X = fit_forest()
+    with tempfile.TemporaryDirectory() as path:
+        meta = FlatForest.from_sklearn(model).save(path)
+        forest = FlatForest.load(path, meta, mmap=True)
+
+        assert isinstance(forest.threshold, np.memmap)
+        np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+if __name__ == "__main__":
+    test_batch_and_single_row_match_sklearn()
+    test_missing_values_follow_sklearn()
+    test_folded_scaler_matches_scaler_pipeline()
+    test_saved_forest_loads_memory_mapped()
+    print("✅ All flat forest tests passed")
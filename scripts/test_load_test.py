@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Load Test Harness Tests
+Checks the payload mix, request scheduling and report of load_test_behavior_api.py against
+the API in-process
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from behavior_wire import WIRE_CONTENT_TYPE
+from load_test_behavior_api import (InProcessTarget, build_payload_pool, build_report, check_thresholds,
+                                    lengthen, run_load)
+from test_serving_scores import train_classifier
+
+
+class FailingTarget:
+    name = 'failing'
+
+    def send(self, body, content_type):
+        raise ConnectionRefusedError()
+
+
+def test_payload_pool_mixes_labels_and_sizes():
+    pool = build_payload_pool(200, bot_share=0.25, long_share=0.2, long_factor=5, seed=3)
+    assert len(pool) == 200
+    assert sum(item['label'] == 'bot' for item in pool) == 50
+    long_sizes = [len(item['body']) for item in pool if item['long']]
+    regular_sizes = [len(item['body']) for item in pool if not item['long']]
+    assert 20 < len(long_sizes) < 60
+    assert sorted(long_sizes)[len(long_sizes) // 2] > 3 * sorted(regular_sizes)[len(regular_sizes) // 2]
+    assert [item['body'] for item in build_payload_pool(200, 0.25, 0.2, 5, seed=3)] == [item['body'] for item in pool]
+
+    columnar = build_payload_pool(20, encoding='columnar', seed=3)
+    assert {item['content_type'] for item in columnar} == {WIRE_CONTENT_TYPE}
+
+
+def test_long_sessions_keep_time_moving_forward():
+    payload = {
+        'pageViewTime': 5000,
+        'clicks': [{'timestamp': 100, 'x': 1}, {'timestamp': 400, 'x': 2}, {'timestamp': 1000, 'x': 3}],
+        'focusEvents': [{'type': 'focus', 'timestamp': 50}],
+        'formInteractions': [{'focusTime': 10}]
+    }
+    longer = lengthen(payload, 3)
+
+    assert longer['pageViewTime'] == 15000
+    clicks = [click['timestamp'] for click in longer['clicks']]
+    # Span 900 plus the mean interval 450 between repeats
+    assert clicks == [100, 400, 1000, 1450, 1750, 2350, 2800, 3100, 3700]
+    assert [click['x'] for click in longer['clicks']] == [1, 2, 3] * 3
+    assert [event['timestamp'] for event in longer['focusEvents']] == [50, 5050, 10050]
+    assert longer['formInteractions'] == payload['formInteractions'] * 3
+    assert payload['clicks'][0]['timestamp'] == 100
+
+    pool = build_payload_pool(40, long_share=1.0, long_factor=4, seed=2)
+    for item in pool:
+        for name in ('mouseMovements', 'keystrokes', 'clicks'):
+            timestamps = [event['timestamp'] for event in json.loads(item['body'])[name]]
+            assert np.all(np.diff(timestamps) >= 0), name
+
+
+def test_in_process_run_reports_latency_and_predictions():
+    classifier, _ = train_classifier(LogisticRegression(max_iter=1000))
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        target = InProcessTarget(path)
+
+    pool = build_payload_pool(60, long_share=0.1, seed=5)
+    results, elapsed = run_load(target, pool, rps=200, concurrency=4, requests=100, seed=5)
+    report = build_report(results, elapsed, target=target.name)
+
+    assert report['requests'] == report['succeeded'] == 100 and report['error_rate'] == 0
+    # 100 requests at 200 req/s are spread over at least half a second
+    assert elapsed >= 0.49 and report['achieved_rps'] <= 205
+    latency = report['latency_ms']
+    assert 0 < latency['p50'] <= latency['p95'] <= latency['p99'] <= latency['max']
+    assert report['scheduled_latency_ms']['p99'] >= latency['p50']
+    assert sum(report['predictions_by_label']['human'].values()) + sum(report['predictions_by_label']['bot'].values()) == 100
+    assert report['predictions_by_label']['bot'].get('bot', 0) > report['predictions_by_label']['bot'].get('human', 0)
+    assert check_thresholds(report, max_p99_ms=10_000, max_error_rate=0) == []
+    assert check_thresholds(report, max_p99_ms=0)
+
+
+def test_errors_are_counted_by_kind():
+    pool = build_payload_pool(10, seed=1)
+    results, elapsed = run_load(FailingTarget(), pool, rps=0, concurrency=2, requests=12)
+    report = build_report(results, elapsed, target='failing')
+
+    assert report['errors'] == 12 and report['error_rate'] == 1.0
+    assert report['errors_by_kind'] == {'ConnectionRefusedError': 12}
+    assert report['latency_ms'] is None and report['throughput_rps'] == 0
+    assert check_thresholds(report, max_error_rate=0.01) and check_thresholds(report, max_p99_ms=100)
+
+
+if __name__ == "__main__":
+    test_payload_pool_mixes_labels_and_sizes()
+    test_long_sessions_keep_time_moving_forward()
+    test_in_process_run_reports_latency_and_predictions()
+    test_errors_are_counted_by_kind()
+    print("✅ All load test harness tests passed")
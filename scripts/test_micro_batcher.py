@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Micro-Batcher Tests
+Checks window and size flushing, per-caller results, exception fan-out, timeouts that drop
+abandoned requests (503 from the API), and the worker restart after fork
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ai_behavior_api
+from behavior_features import session_to_payload
+from micro_batcher import BatchTimeout, MicroBatcher
+from test_serving_scores import train_classifier
+
+
+class RecordingScorer:
+    """score_fn returning each row's first value, remembering every batch it was given"""
+
+    def __init__(self, release=None):
+        self.batches = []
+        self.release = release
+
+    def __call__(self, matrix):
+        if self.release is not None:
+            self.release.wait()
+        self.batches.append(matrix[:, 0].tolist())
+        return list(matrix[:, 0])
+
+
+def submit_all(batcher, values):
+    with ThreadPoolExecutor(max_workers=len(values)) as executor:
+        return list(executor.map(lambda v: batcher.submit(np.array([v, 0.0])), values))
+
+
+def test_window_flushes_partial_batch():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, window_ms=200, max_batch_size=64)
+    start = time.monotonic()
+    assert submit_all(batcher, [1.0, 2.0, 3.0]) == [1.0, 2.0, 3.0]
+    # Fewer requests than max_batch_size: they wait out the window, then go as one batch
+    assert time.monotonic() - start >= 0.19
+    assert len(scorer.batches) == 1 and sorted(scorer.batches[0]) == [1.0, 2.0, 3.0]
+    assert batcher.stats()['requests'] == 3
+
+
+def test_full_batch_flushes_before_window():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, window_ms=5000, max_batch_size=4, timeout=2.0)
+    start = time.monotonic()
+    values = [float(v) for v in range(8)]
+    # Each caller gets the result of its own row, whatever batch it landed in
+    assert submit_all(batcher, values) == values
+    assert time.monotonic() - start < 2.0
+    assert [len(batch) for batch in scorer.batches] == [4, 4]
+    assert batcher.stats()['largest_batch'] == 4
+
+
+def test_exception_reaches_every_caller():
+    def failing(matrix):
+        raise ValueError('model exploded')
+
+    batcher = MicroBatcher(failing, window_ms=50, max_batch_size=3)
+    errors = []
+
+    def call(value):
+        try:
+            batcher.submit(np.array([value]))
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call, args=(v,)) for v in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == ['model exploded'] * 3
+
+
+def test_timed_out_request_is_not_scored():
+    release = threading.Event()
+    scorer = RecordingScorer(release)
+    batcher = MicroBatcher(scorer, window_ms=0, max_batch_size=1, timeout=0.1)
+
+    # The first request occupies the model until released
+    blocked = threading.Thread(target=lambda: _ignore_timeout(batcher, 1.0))
+    blocked.start()
+    time.sleep(0.02)
+    try:
+        batcher.submit(np.array([2.0, 0.0]))
+        assert False, 'expected BatchTimeout'
+    except BatchTimeout:
+        pass
+    release.set()
+    blocked.join()
+
+    assert batcher.submit(np.array([3.0, 0.0])) == 3.0
+    assert 2.0 not in sum(scorer.batches, [])
+    assert batcher.stats()['timeouts'] >= 1
+
+
+def _ignore_timeout(batcher, value):
+    try:
+        batcher.submit(np.array([value, 0.0]))
+    except BatchTimeout:
+        pass
+
+
+def test_worker_restarts_after_fork():
+    batcher = MicroBatcher(RecordingScorer(), window_ms=1)
+    assert batcher.submit(np.array([1.0])) == 1.0
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # The parent's worker thread does not exist here; submit must start a new one
+        try:
+            os.write(write_fd, json.dumps(float(batcher.submit(np.array([5.0])))).encode())
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    with os.fdopen(read_fd) as f:
+        assert json.loads(f.read()) == 5.0
+    assert batcher.submit(np.array([2.0])) == 2.0
+
+
+def test_api_answers_503_on_timeout():
+    classifier, sessions = train_classifier(LogisticRegression(max_iter=1000))
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        assert ai_behavior_api.load_model(path)
+
+    release = threading.Event()
+    original, cache = ai_behavior_api.batcher, ai_behavior_api.score_cache
+    ai_behavior_api.batcher = MicroBatcher(RecordingScorer(release), window_ms=0, timeout=0.05)
+    ai_behavior_api.score_cache = None
+    try:
+        response = ai_behavior_api.app.test_client().post('/predict-ai', json=session_to_payload(sessions[0]))
+        assert response.status_code == 503
+        assert response.get_json()['prediction'] == 'bot'
+    finally:
+        release.set()
+        ai_behavior_api.batcher, ai_behavior_api.score_cache = original, cache
+
+
+if __name__ == "__main__":
+    test_window_flushes_partial_batch()
+    test_full_batch_flushes_before_window()
+    test_exception_reaches_every_caller()
+    test_timed_out_request_is_not_scored()
+    test_worker_restarts_after_fork()
+    test_api_answers_503_on_timeout()
+    print("✅ All micro-batcher tests passed")
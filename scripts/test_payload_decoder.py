@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Payload Decoder Tests
+Checks that every decoding backend yields the same features as the stdlib json path
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import payload_decoder
+from behavior_features import extract_features
+from payload_decoder import decode_batch, decode_payload
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data', 'behavior_payloads.json')
+
+
+def available_backends():
+    backends = ['json']
+    if payload_decoder.orjson is not None:
+        backends.append('orjson')
+    if payload_decoder.msgspec is not None:
+        backends.append('msgspec')
+    return backends
+
+
+def with_backend(backend, fn):
+    previous = payload_decoder.JSON_DECODER
+    payload_decoder.JSON_DECODER = backend
+    try:
+        return fn()
+    finally:
+        payload_decoder.JSON_DECODER = previous
+
+
+def test_decoded_payloads_match_recorded_features():
+    with open(FIXTURE_PATH, 'r') as f:
+        cases = json.load(f)
+
+    for backend in available_backends():
+        for i, case in enumerate(cases):
+            decoded = with_backend(backend, lambda: decode_payload(json.dumps(case['payload']).encode()))
+            np.testing.assert_allclose(extract_features(decoded), case['expected'], rtol=1e-12, atol=1e-9,
+                                       err_msg=f"{backend}, payload {i}")
+
+
+def test_schema_mismatch_falls_back_to_plain_json():
+    raw = json.dumps({'mouseMovements': [{'velocity': None}], 'sessionId': 'abc', 'extra': 1}).encode()
+    for backend in available_backends():
+        assert with_backend(backend, lambda: decode_payload(raw)) == json.loads(raw)
+
+
+def test_absent_fields_stay_absent():
+    decoded = decode_payload(b'{"pageViewTime": 1200, "clicks": []}')
+    assert decoded == {'pageViewTime': 1200, 'clicks': []}
+
+
+def test_malformed_bodies_decode_to_none():
+    for backend in available_backends():
+        for raw in (b'', b'{"mouseMovements": [', b'\xff\xfe'):
+            assert with_backend(backend, lambda: decode_payload(raw)) is None
+            assert with_backend(backend, lambda: decode_batch(raw)) is None
+
+
+def test_batch_envelope_and_bare_list():
+    session = {'pageViewTime': 5, 'mouseMovements': [{'velocity': 3.0}]}
+    for backend in available_backends():
+        for body in ({'sessions': [session, session]}, [session, session]):
+            sessions = with_backend(backend, lambda: decode_batch(json.dumps(body).encode()))
+            assert len(sessions) == 2
+            np.testing.assert_array_equal(extract_features(sessions[1]), extract_features(session))
+
+
+if __name__ == "__main__":
+    test_decoded_payloads_match_recorded_features()
+    test_schema_mismatch_falls_back_to_plain_json()
+    test_absent_fields_stay_absent()
+    test_malformed_bodies_decode_to_none()
+    test_batch_envelope_and_bare_list()
+    print("✅ All payload decoder tests passed")
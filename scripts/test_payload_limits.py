@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Payload Limit Tests
+Checks per-stream event caps, the truncation report, count rescaling and the lossless
+splitting of oversized /track-delta deltas
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from behavior_features import extract_features
+from payload_limits import body_too_large, cap_events, rescale_counts, split_events
+from session_accumulator import SessionAccumulator
+
+CAPS = {'mouseMovements': (100, 'sample'), 'keystrokes': (50, 'window')}
+
+
+def make_payload(n_moves, n_keys):
+    rng = np.random.default_rng(3)
+    return {
+        'mouseMovements': [{'velocity': float(v), 'acceleration': 1.0, 'pressure': 0.6, 'jitter': 0.1}
+                           for v in rng.gamma(2.0, 400.0, size=n_moves)],
+        'keystrokes': [{'key': 'a', 'timestamp': 1000 + 150 * i, 'pressure': 0.5} for i in range(n_keys)],
+        'pageViewTime': 60000
+    }
+
+
+def test_small_payload_is_untouched():
+    payload = make_payload(20, 10)
+    capped, truncated = cap_events(payload, CAPS)
+    assert capped is payload
+    assert truncated == {}
+
+
+def test_streams_are_capped_and_reported():
+    payload = make_payload(1000, 400)
+    capped, truncated = cap_events(payload, CAPS)
+
+    assert len(payload['mouseMovements']) == 1000  # caller's payload is not modified
+    assert len(capped['mouseMovements']) == 100
+    assert capped['keystrokes'] == payload['keystrokes'][-50:]
+    assert truncated == {
+        'mouseMovements': {'received': 1000, 'kept': 100, 'strategy': 'sample'},
+        'keystrokes': {'received': 400, 'kept': 50, 'strategy': 'window'}
+    }
+    # Sampling is deterministic, so re-posted snapshots score the same
+    assert cap_events(payload, CAPS)[0]['mouseMovements'] == capped['mouseMovements']
+
+
+def test_rescaled_features_stay_representative():
+    payload = make_payload(1000, 400)
+    capped, truncated = cap_events(payload, CAPS)
+    full = extract_features(payload)
+    features = rescale_counts(extract_features(capped), truncated)
+
+    assert features[0] == 1000 and features[2] == 400
+    assert features[16] == full[16]  # every movement is high pressure
+    np.testing.assert_allclose(features[6], full[6], rtol=0.2)  # sampled mean velocity
+    np.testing.assert_allclose(features[18:22], full[18:22])    # windowed intervals
+
+
+def test_oversized_delta_is_split_not_truncated():
+    payload = make_payload(250, 120)
+    parts = split_events(payload, CAPS)
+
+    assert [len(part['mouseMovements']) for part in parts] == [100, 100, 50]
+    assert [len(part['keystrokes']) for part in parts] == [50, 50, 20]
+    assert sum((part['keystrokes'] for part in parts), []) == payload['keystrokes']
+    assert parts[0]['pageViewTime'] == 60000 and 'pageViewTime' not in parts[1]
+    assert split_events(make_payload(20, 10), CAPS) == [make_payload(20, 10)]
+
+    # Every event reaches the accumulator, so its features equal the uncapped extraction
+    accumulator = SessionAccumulator()
+    for part in parts:
+        accumulator.update(part)
+    np.testing.assert_allclose(accumulator.features(), extract_features(payload), rtol=1e-9, atol=1e-9)
+
+
+def test_body_size_limit():
+    assert body_too_large(10, limit=5)
+    assert not body_too_large(5, limit=5)
+    assert not body_too_large(None, limit=5)
+
+
+if __name__ == "__main__":
+    test_small_payload_is_untouched()
+    test_streams_are_capped_and_reported()
+    test_rescaled_features_stay_representative()
+    test_oversized_delta_is_split_not_truncated()
+    test_body_size_limit()
+    print("✅ All payload limit tests passed")
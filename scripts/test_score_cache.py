@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Score Cache Tests
+Checks LRU eviction, TTL expiry, and that /predict-ai serves repeated bodies from the cache
+without decoding them again, with /health reporting matching hit/miss counters
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from sklearn.linear_model import LogisticRegression
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ai_behavior_api
+from behavior_features import session_to_payload
+from score_cache import ScoreCache, payload_key
+from test_serving_scores import train_classifier
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ScoreCache(max_entries=2, ttl_s=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    # 'b' is now the least recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert stats['hits'] == 3 and stats['misses'] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = ScoreCache(max_entries=10, ttl_s=0.05)
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    time.sleep(0.08)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1 and cache.stats()['entries'] == 0
+
+    # Storing again restarts the TTL
+    cache.put('a', 2)
+    assert cache.get('a') == 2
+
+
+def test_payload_key_hashes_raw_bytes():
+    assert payload_key(b'{"a": 1}') == payload_key(b'{"a": 1}')
+    assert payload_key(b'{"a": 1}') != payload_key(b'{"a":1}')
+
+
+def test_repeated_poll_skips_decoding_and_health_counts_it():
+    classifier, sessions = train_classifier(LogisticRegression(max_iter=1000))
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        assert ai_behavior_api.load_model(path)
+
+    decode_calls = []
+    original_cache, original_decode = ai_behavior_api.score_cache, ai_behavior_api.decode_request
+
+    def counting_decode(raw, mimetype):
+        decode_calls.append(len(raw))
+        return original_decode(raw, mimetype)
+
+    ai_behavior_api.score_cache = ScoreCache(max_entries=100, ttl_s=60)
+    ai_behavior_api.decode_request = counting_decode
+    try:
+        client = ai_behavior_api.app.test_client()
+        payload = session_to_payload(sessions[0])
+
+        first = client.post('/predict-ai', json=payload).get_json()
+        second = client.post('/predict-ai', json=payload).get_json()
+        assert 'cached' not in first and second['cached'] is True
+        assert second['trust_score'] == first['trust_score']
+        assert len(decode_calls) == 1
+
+        # Invalid bodies are never stored, so they are rejected every time
+        for _ in range(2):
+            assert client.post('/predict-ai', data=b'{}', content_type='application/json').status_code == 400
+
+        counters = client.get('/health').get_json()['score_cache']
+        assert counters['hits'] == 1 and counters['misses'] == 3
+        assert counters['entries'] == 1 and counters['hit_rate'] == 0.25
+    finally:
+        ai_behavior_api.score_cache, ai_behavior_api.decode_request = original_cache, original_decode
+
+
+if __name__ == "__main__":
+    test_least_recently_used_entry_is_evicted()
+    test_entries_expire_after_ttl()
+    test_payload_key_hashes_raw_bytes()
+    test_repeated_poll_skips_decoding_and_health_counts_it()
+    print("✅ All score cache tests passed")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Serving Score Regression Tests
+Checks that the API scores raw feature vectors exactly like BehaviorClassifier.predict,
+which applies the training StandardScaler before the model
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import ai_behavior_api
+from behavior_features import FEATURE_SCHEMA_VERSION, session_to_payload
+from ai_training.generate_training_data import BehaviorDataGenerator
+from ai_training.train_behavior_model import BehaviorClassifier
+
+
+def train_classifier(model):
+    sessions = BehaviorDataGenerator(seed=7).generate_training_dataset(human_samples=150, bot_samples=150)
+
+    classifier = BehaviorClassifier()
+    X, y = classifier.prepare_data(sessions)
+    X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+    classifier.best_model = model.fit(classifier.scaler.fit_transform(X), y)
+    classifier.best_model_name = type(model).__name__
+    return classifier, sessions
+
+
+def served_human_probabilities(classifier, sessions):
+    # The API extracts features itself; training and serving share one schema
+    results = [ai_behavior_api.score_behavior(session_to_payload(session)) for session in sessions]
+    return np.array([r['confidence'] if r['prediction'] == 'human' else 1 - r['confidence'] for r in results])
+
+
+def assert_served_matches_predict(classifier, sessions, model_path):
+    assert ai_behavior_api.load_model(model_path)
+    expected = np.array([classifier.predict(session)['confidence'] for session in sessions])
+    np.testing.assert_allclose(served_human_probabilities(classifier, sessions), expected, rtol=0, atol=1e-9)
+
+
+def test_serving_artifact_folds_scaler_into_forest():
+    classifier, sessions = train_classifier(RandomForestClassifier(n_estimators=30, random_state=7))
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        assert_served_matches_predict(classifier, sessions, path)
+        assert ai_behavior_api.predictor.scaler_folded
+        # The flat forest serves alone: the sklearn forest is never unpickled
+        assert ai_behavior_api.model is None
+        assert ai_behavior_api.model_details()['model_type'] == 'RandomForestClassifier'
+        assert ai_behavior_api.score_behavior(session_to_payload(sessions[0]))['model_type'] == 'RandomForestClassifier'
+        assert ai_behavior_api.model_manifest['feature_schema_version'] == FEATURE_SCHEMA_VERSION
+        assert ai_behavior_api.model_feature_schema == FEATURE_SCHEMA_VERSION
+
+
+def test_artifact_checksums_are_verified_on_load():
+    classifier, _ = train_classifier(RandomForestClassifier(n_estimators=10, random_state=7))
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+        assert {'model', 'scaler', 'forest_threshold'} <= set(manifest['checksums'])
+
+        with open(os.path.join(path, manifest['flat_forest']['files']['threshold']), 'r+b') as f:
+            f.seek(-8, os.SEEK_END)
+            f.write(b'\x00' * 8)
+        assert not ai_behavior_api.load_model(path)
+
+
+def test_artifact_with_inexact_fold_is_refolded():
+    classifier, sessions = train_classifier(RandomForestClassifier(n_estimators=30, random_state=7))
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        # Artifacts exported before exact folding carry no fold_version
+        manifest_path = os.path.join(path, 'manifest.json')
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        del manifest['flat_forest']['fold_version']
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+
+        assert_served_matches_predict(classifier, sessions, path)
+        # The stored forest is skipped and the sklearn forest folded again on load
+        assert ai_behavior_api.model is not None and ai_behavior_api.predictor.scaler_folded
+
+
+def test_training_pickle_uses_scaler():
+    classifier, sessions = train_classifier(RandomForestClassifier(n_estimators=30, random_state=7))
+    with tempfile.TemporaryDirectory() as path:
+        model_path = os.path.join(path, 'model')
+        classifier.models = {classifier.best_model_name: classifier.best_model}
+        classifier.save_model(model_path, export_serving=False)
+        assert_served_matches_predict(classifier, sessions, f"{model_path}.pkl")
+
+
+def test_non_forest_model_runs_as_pipeline():
+    classifier, sessions = train_classifier(LogisticRegression(max_iter=1000))
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        assert_served_matches_predict(classifier, sessions, path)
+        assert type(ai_behavior_api.predictor).__name__ == 'Pipeline'
+        # Responses name the model that scored them
+        assert ai_behavior_api.score_behavior(session_to_payload(sessions[0]))['model_type'] == 'LogisticRegression'
+
+
+def test_selected_model_latency_is_stored_and_reported():
+    classifier, sessions = train_classifier(LogisticRegression(max_iter=1000))
+    classifier.latency_budget_ms = 1000
+    X, y = classifier.prepare_data(sessions)
+    X_scaled = classifier.scaler.transform(np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0))
+    results = classifier.train_models(X_scaled[:240], X_scaled[240:], y[:240], y[240:])
+
+    latency = classifier.latency
+    assert latency['budget_ms'] == 1000 and latency['single_row_p99_ms'] <= 1000
+    assert 0 < latency['single_row_p50_ms'] <= latency['single_row_p99_ms']
+    assert latency['predictor'] == ('FlatForest' if classifier.best_model_name == 'RandomForest' else 'Pipeline')
+    assert set(classifier.candidate_results) == set(results)
+
+    with tempfile.TemporaryDirectory() as path:
+        classifier.export_serving_artifact(path)
+        assert ai_behavior_api.load_model(path)
+        assert ai_behavior_api.model_details()['latency'] == latency
+
+
+if __name__ == "__main__":
+    test_serving_artifact_folds_scaler_into_forest()
+    test_artifact_checksums_are_verified_on_load()
+    test_artifact_with_inexact_fold_is_refolded()
+    test_training_pickle_uses_scaler()
+    test_non_forest_model_runs_as_pipeline()
+    test_selected_model_latency_is_stored_and_reported()
+    print("✅ All serving score tests passed")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Session Accumulator Tests
+Checks that features accumulated from event deltas match a full re-extraction
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from behavior_features import extract_features
+from session_accumulator import RunningStats, SequenceGap, SessionAccumulator, SessionStore
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data', 'behavior_payloads.json')
+EVENT_LISTS = ('mouseMovements', 'clicks', 'keystrokes', 'formInteractions', 'focusEvents', 'blurEvents')
+
+
+def split_into_deltas(payload, n_deltas, rng):
+    """Cut every event list at random points; scalars go out with the last delta"""
+    deltas = [{} for _ in range(n_deltas)]
+    for name in EVENT_LISTS:
+        events = payload.get(name, [])
+        cuts = np.sort(rng.integers(0, len(events) + 1, size=n_deltas - 1))
+        for delta, chunk in zip(deltas, np.split(np.arange(len(events)), cuts)):
+            delta[name] = [events[i] for i in chunk]
+    deltas[-1].update({key: value for key, value in payload.items() if key not in EVENT_LISTS})
+    return deltas
+
+
+def test_running_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.normal(50, 20, size=1000)
+    stats = RunningStats()
+    for chunk in np.array_split(values, 17):
+        stats.update(chunk)
+
+    np.testing.assert_allclose(stats.summary(), (values.mean(), values.std(), values.min(), values.max()), rtol=1e-12)
+
+
+def test_accumulated_features_match_full_extraction():
+    rng = np.random.default_rng(1)
+    with open(FIXTURE_PATH, 'r') as f:
+        cases = json.load(f)
+
+    for i, case in enumerate(cases):
+        for n_deltas in (1, 3, 10):
+            accumulator = SessionAccumulator()
+            for delta in split_into_deltas(case['payload'], n_deltas, rng):
+                accumulator.update(delta)
+            np.testing.assert_allclose(accumulator.features(), extract_features(case['payload']),
+                                       rtol=1e-9, atol=1e-9, err_msg=f"payload {i}, {n_deltas} deltas")
+
+
+def test_store_evicts_least_recent_session():
+    store = SessionStore(max_sessions=2)
+    first = store.get('a')
+    second = store.get('b')
+    assert store.get('a') is first
+    store.get('c')
+
+    assert store.stats()['evictions'] == 1
+    assert store.get('a') is first
+    assert store.get('b') is not second
+
+
+def test_deltas_split_across_workers_are_detected():
+    with open(FIXTURE_PATH, 'r') as f:
+        payload = json.load(f)[0]['payload']
+    deltas = split_into_deltas(payload, 4, np.random.default_rng(2))
+    # Two worker processes, each with its own store; round-robin routing
+    workers = [SessionStore(), SessionStore()]
+
+    workers[0].append('s', 0, [deltas[0]])
+    try:
+        workers[1].append('s', 1, [deltas[1]])
+        assert False, 'expected SequenceGap'
+    except SequenceGap as gap:
+        assert gap.expected == 0 and gap.received == 1
+    assert workers[1].stats()['sessions'] == 0 and workers[1].stats()['sequence_gaps'] == 1
+
+    # The first worker missed nothing yet, but cannot skip ahead to seq 2 either
+    try:
+        workers[0].append('s', 2, [deltas[2]])
+        assert False, 'expected SequenceGap'
+    except SequenceGap:
+        pass
+    assert workers[0].stats()['sessions'] == 0
+
+    # Resending everything as seq 0 rebuilds the exact state on whichever worker gets it
+    workers[1].append('s', 0, deltas[:3])
+    features, _ = workers[1].append('s', 1, [deltas[3]])
+    np.testing.assert_allclose(features, extract_features(payload), rtol=1e-9, atol=1e-9)
+
+    # A repeated delta (a client retry) is a gap too
+    try:
+        workers[1].append('s', 1, [deltas[3]])
+        assert False, 'expected SequenceGap'
+    except SequenceGap:
+        pass
+
+
+if __name__ == "__main__":
+    test_running_stats_match_numpy()
+    test_accumulated_features_match_full_extraction()
+    test_store_evicts_least_recent_session()
+    test_deltas_split_across_workers_are_detected()
+    print("✅ All session accumulator tests passed")
@@ -14,16 +14,22 @@ import pickle
 import json
 from datetime import datetime, timedelta
 from sklearn.model_selection import TimeSeriesSplit, GridSearchCV
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.base import clone
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 import matplotlib.pyplot as plt
 import seaborn as sns
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_models import MEDIAN_LATENCY_KEY, categorical_mask, evaluate_candidate, print_comparison, select_candidate
+
 class TrainDemandPredictor:
     def __init__(self, data_path, model_save_path):
         """
@@ -39,6 +45,7 @@ class TrainDemandPredictor:
         self.preprocessors = {}
         self.feature_importance = {}
         self.performance_metrics = {}
+        self.candidate_results = {}
         
         # Create model directory if not exists
         os.makedirs(model_save_path, exist_ok=True)
@@ -218,18 +225,30 @@ class TrainDemandPredictor:
         
         return preprocessor
     
-    def train_models(self, X, y):
-        """Train demand prediction model using best hyperparameters from previous optimization"""
-        
-        print("🤖 Training demand prediction model...")
-        print("📊 Using Gradient Boosting with optimized hyperparameters")
-        
-        # Handle categorical variables manually
+    def _one_hot(self, X):
+        """Exact-split boosting input: categorical columns expanded into dummies"""
         X_processed = X.copy()
         for cat_col in self.categorical_features:
             dummies = pd.get_dummies(X_processed[cat_col], prefix=cat_col)
             X_processed = pd.concat([X_processed, dummies], axis=1)
             X_processed = X_processed.drop(cat_col, axis=1)
+        return X_processed
+    
+    def _category_codes(self, X):
+        """Histogram boosting input: categorical columns as integer codes, split on natively"""
+        X_processed = X.copy()
+        for cat_col in self.categorical_features:
+            categories = self.preprocessors.setdefault(
+                f'{cat_col}_categories', sorted(X_processed[cat_col].astype(str).unique())
+            )
+            X_processed[cat_col] = pd.Categorical(X_processed[cat_col].astype(str), categories=categories).codes
+        return X_processed
+    
+    def train_models(self, X, y):
+        """Train demand prediction candidates and keep the best on accuracy, training time and latency"""
+        
+        print("🤖 Training demand prediction model...")
+        print("📊 Comparing Gradient Boosting (one-hot) with Histogram Gradient Boosting (native categoricals)")
         
         # Use best hyperparameters from previous optimization
         best_params = {
@@ -242,10 +261,39 @@ class TrainDemandPredictor:
         
         print(f"🔧 Hyperparameters: {best_params}")
         
-        # Initialize and train the model
-        self.best_model = GradientBoostingRegressor(**best_params)
+        X_codes = self._category_codes(X)
+        candidates = {
+            'gradient_boosting': (GradientBoostingRegressor(**best_params), self._one_hot(X)),
+            'hist_gradient_boosting': (HistGradientBoostingRegressor(
+                learning_rate=best_params['learning_rate'],
+                max_depth=best_params['max_depth'],
+                max_iter=best_params['n_estimators'],
+                categorical_features=categorical_mask(X_codes, self.categorical_features),
+                random_state=42
+            ), X_codes)
+        }
+        
+        # Compare on the same time-based split evaluate_model uses
+        train_mask = (self.df['date'] < pd.to_datetime('2024-01-01')).values
+        results = {}
+        for name, (candidate, X_candidate) in candidates.items():
+            print(f"🔄 Training {name}...")
+            results[name] = evaluate_candidate(
+                clone(candidate), X_candidate[train_mask], y[train_mask], X_candidate[~train_mask], y[~train_mask],
+                lambda fitted, X_eval, y_eval: r2_score(y_eval, fitted.predict(X_eval))
+            )
+        
+        self.best_model_name = select_candidate(results, latency_key=MEDIAN_LATENCY_KEY)
+        self.candidate_results = {
+            name: {key: value for key, value in result.items() if key != 'model'}
+            for name, result in results.items()
+        }
+        print("⚖️  Candidate comparison (R² on 2024-2025):")
+        print_comparison(results, 'R²', self.best_model_name)
         
-        print("🔄 Training Gradient Boosting model...")
+        # Refit the selected candidate on all data
+        candidate, X_processed = candidates[self.best_model_name]
+        self.best_model = candidate
         self.best_model.fit(X_processed, y)
         
         # Calculate training score for validation
@@ -255,10 +303,9 @@ class TrainDemandPredictor:
         print(f"✅ Model trained successfully!")
         print(f"📊 Training MAE: {train_mae:.2f}")
         
-        self.best_model_name = 'gradient_boosting'
-        self.models = {'gradient_boosting': self.best_model}
+        self.models = {self.best_model_name: self.best_model}
         
-        # Feature importance
+        # Feature importance (histogram boosting has no impurity importances)
         if hasattr(self.best_model, 'feature_importances_'):
             feature_names = X_processed.columns
             importance = self.best_model.feature_importances_
@@ -326,9 +373,13 @@ class TrainDemandPredictor:
         # Create model info
         model_info = {
             'model_name': self.best_model_name,
+            'model_class': type(self.best_model).__name__,
+            'candidates': self.candidate_results,
             'feature_columns': self.feature_columns,
             'numeric_features': self.numeric_features,
             'categorical_features': self.categorical_features,
+            # Code order of each categorical column when the model splits on them natively
+            'category_levels': self.preprocessors if self.best_model_name == 'hist_gradient_boosting' else {},
             'performance_metrics': self.performance_metrics,
             'feature_importance': dict(sorted(self.feature_importance.items(), key=lambda x: x[1], reverse=True)[:20]),
             'training_date': datetime.now().isoformat(),
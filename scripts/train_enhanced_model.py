@@ -18,16 +18,23 @@ import pickle
 import json
 from datetime import datetime, timedelta
 from sklearn.model_selection import TimeSeriesSplit, GridSearchCV
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
+from sklearn.base import clone
+from sklearn.inspection import permutation_importance
 import matplotlib.pyplot as plt
 import seaborn as sns
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_models import MEDIAN_LATENCY_KEY, categorical_mask, evaluate_candidate, print_comparison, select_candidate
+
 class IslamicCalendarFeatures:
     """Helper class for Islamic calendar calculations"""
     
@@ -146,6 +153,8 @@ class EnhancedTrainDemandPredictor:
         self.preprocessors = {}
         self.feature_importance = {}
         self.performance_metrics = {}
+        self.best_model_name = 'gradient_boosting'
+        self.candidate_results = {}
         self.islamic_features = IslamicCalendarFeatures()
         
         # Create model directory if not exists
@@ -305,29 +314,56 @@ class EnhancedTrainDemandPredictor:
         
         print(f"Training on {len(X)} samples")
         
-        # Time series split for validation
-        tscv = TimeSeriesSplit(n_splits=5)
+        # Candidates; histogram boosting splits the label-encoded route and train type natively
+        candidates = {
+            'gradient_boosting': GradientBoostingRegressor(
+                n_estimators=200,
+                learning_rate=0.1,
+                max_depth=8,
+                subsample=0.8,
+                random_state=42
+            ),
+            'hist_gradient_boosting': HistGradientBoostingRegressor(
+                max_iter=200,
+                learning_rate=0.1,
+                max_depth=8,
+                categorical_features=categorical_mask(X, categorical_features),
+                random_state=42
+            )
+        }
         
-        # Train Gradient Boosting model
-        gb_model = GradientBoostingRegressor(
-            n_estimators=200,
-            learning_rate=0.1,
-            max_depth=8,
-            subsample=0.8,
-            random_state=42
-        )
+        # Compare on the most recent time-series fold (rows are sorted by date)
+        train_index, test_index = list(TimeSeriesSplit(n_splits=5).split(X))[-1]
+        results = {
+            name: evaluate_candidate(
+                candidate, X.iloc[train_index], y.iloc[train_index], X.iloc[test_index], y.iloc[test_index],
+                lambda fitted, X_eval, y_eval: r2_score(y_eval, fitted.predict(X_eval))
+            )
+            for name, candidate in candidates.items()
+        }
+        self.best_model_name = select_candidate(results, latency_key=MEDIAN_LATENCY_KEY)
+        self.candidate_results = {
+            name: {key: value for key, value in result.items() if key != 'model'}
+            for name, result in results.items()
+        }
+        print("⚖️  Candidate comparison (R² on the last time-series fold):")
+        print_comparison(results, 'R²', self.best_model_name)
         
-        # Fit model
-        gb_model.fit(X, y)
+        # Refit the selected candidate on all data
+        gb_model = clone(candidates[self.best_model_name]).fit(X, y)
         
         # Store model and features
-        self.models['gradient_boosting'] = gb_model
+        self.models[self.best_model_name] = gb_model
         self.feature_columns = available_features
         
-        # Calculate feature importance
+        # Calculate feature importance (permutation-based for histogram boosting, which has no impurity importances)
+        importances = getattr(gb_model, 'feature_importances_', None)
+        if importances is None:
+            sample = X.iloc[test_index[-2000:]], y.iloc[test_index[-2000:]]
+            importances = permutation_importance(gb_model, *sample, n_repeats=3, random_state=42).importances_mean
         feature_importance = pd.DataFrame({
             'feature': available_features,
-            'importance': gb_model.feature_importances_
+            'importance': importances
         }).sort_values('importance', ascending=False)
         
         self.feature_importance = feature_importance
@@ -357,11 +393,13 @@ class EnhancedTrainDemandPredictor:
         # Save main model
         model_path = os.path.join(self.model_save_path, 'demand_prediction_model.pkl')
         with open(model_path, 'wb') as f:
-            pickle.dump(self.models['gradient_boosting'], f)
+            pickle.dump(self.models[self.best_model_name], f)
         
         # Save model metadata
         model_info = {
-            'model_name': 'enhanced_gradient_boosting_with_islamic_calendar',
+            'model_name': f'enhanced_{self.best_model_name}_with_islamic_calendar',
+            'model_class': type(self.models[self.best_model_name]).__name__,
+            'candidates': self.candidate_results,
             'feature_columns': self.feature_columns,
             'performance_metrics': self.performance_metrics,
             'islamic_calendar_features': True,
@@ -418,7 +456,7 @@ class EnhancedTrainDemandPredictor:
         
         # Convert to model input format and predict
         # This would need proper feature engineering
-        prediction = self.models['gradient_boosting'].predict([list(features.values())])[0]
+        prediction = self.models[self.best_model_name].predict([list(features.values())])[0]
         
         return prediction
 
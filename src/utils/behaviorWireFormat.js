@@ -0,0 +1,145 @@
+/**
+ * Columnar Binary Wire Format for the AI Behavior API
+ * Browser-side encoder for scripts/behavior_wire.py: one typed array per field the
+ * scorer reads, delta-encoded timestamps, dictionary-encoded categorical fields and
+ * optional deflate. Field names are sent once per stream instead of once per event.
+ *
+ * Usage:
+ *   const body = await encodeBehaviorPayload(payload, { compress: true });
+ *   fetch(`${AI_API_URL}/predict-ai`, { method: 'POST', headers: { 'Content-Type': WIRE_CONTENT_TYPE }, body });
+ */
+
+export const WIRE_CONTENT_TYPE = 'application/vnd.behavior-columns';
+
+const MAGIC = [0x42, 0x48, 0x56, 0x43]; // 'BHVC'
+const WIRE_VERSION = 1;
+const FLAG_DEFLATE = 1;
+const PREAMBLE_SIZE = 12;
+
+// Must match EVENT_FIELDS / EVENT_CATEGORIES in scripts/behavior_features.py
+const EVENT_FIELDS = {
+  mouseMovements: [['velocity', 0], ['acceleration', 0], ['pressure', 0], ['jitter', 0]],
+  keystrokes: [['timestamp', NaN], ['pressure', 0]],
+  clicks: [['timestamp', NaN], ['accuracy', 0.5], ['pressure', 0], ['x', 0], ['y', 0], ['duration', 0]],
+  formInteractions: [['focusTime', 0], ['dwellTime', 0], ['changeCount', 0], ['tabOrder', 0], ['validationErrors', 0]],
+};
+const EVENT_CATEGORIES = {
+  keystrokes: [['key', '']],
+  clicks: [['clickType', null], ['button', null]],
+  formInteractions: [['interactionType', null], ['value', '']],
+};
+const COUNTED_STREAMS = ['focusEvents', 'blurEvents'];
+
+function readField(event, name, fallback) {
+  const value = event[name];
+  return value === undefined ? fallback : value;
+}
+
+// Whole-millisecond timestamps become int32 gaps from the first one; anything else stays float64
+function encodeTimestamps(values) {
+  const deltas = new Int32Array(values.length);
+  for (let i = 0; i < values.length; i++) {
+    const delta = values[i] - (i > 0 ? values[i - 1] : values[0]);
+    if (!Number.isInteger(values[i]) || Math.abs(delta) >= 2 ** 31) {
+      return { array: Float64Array.from(values), dtype: '<f8' };
+    }
+    deltas[i] = delta;
+  }
+  return { array: deltas, dtype: '<i4', deltaBase: values[0] };
+}
+
+function encodeCategories(values) {
+  const index = new Map();
+  const codes = values.map((value) => {
+    if (!index.has(value)) index.set(value, index.size);
+    return index.get(value);
+  });
+  const [ArrayType, dtype] = index.size <= 2 ** 8 ? [Uint8Array, '|u1']
+    : index.size <= 2 ** 16 ? [Uint16Array, '<u2'] : [Uint32Array, '<u4'];
+  return { array: ArrayType.from(codes), dtype, categories: [...index.keys()] };
+}
+
+async function deflate(bytes) {
+  const stream = new Blob([bytes]).stream().pipeThrough(new CompressionStream('deflate'));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+/**
+ * Encode a scoring payload ({ mouseMovements: [...], keystrokes: [...], pageViewTime, ... })
+ * @param {object} payload - same shape as the JSON body of /predict-ai or /track-delta
+ * @param {{compress?: boolean, precise?: boolean}} options - deflate the body; send float64 instead of float32
+ * @returns {Promise<Uint8Array>}
+ */
+export async function encodeBehaviorPayload(payload, { compress = false, precise = false } = {}) {
+  const FloatArray = precise ? Float64Array : Float32Array;
+  const header = { fields: {}, streams: {} };
+  const buffers = [];
+  let size = 0;
+
+  // Typed arrays are little-endian on every platform browsers run on, matching the '<' dtypes
+  const append = (array) => {
+    size += (8 - (size % 8)) % 8;
+    const offset = size;
+    buffers.push({ offset, bytes: new Uint8Array(array.buffer, array.byteOffset, array.byteLength) });
+    size += array.byteLength;
+    return offset;
+  };
+
+  Object.entries(payload).forEach(([name, value]) => {
+    if (!(name in EVENT_FIELDS) && !COUNTED_STREAMS.includes(name)) {
+      header.fields[name] = value;
+    }
+  });
+
+  [...Object.keys(EVENT_FIELDS), ...COUNTED_STREAMS].forEach((name) => {
+    const events = payload[name];
+    if (events === undefined || events === null) return;
+    if (!Array.isArray(events)) throw new Error(`${name} must be an array`);
+
+    const columns = [];
+    if (events.length > 0 && name in EVENT_FIELDS) {
+      EVENT_FIELDS[name].forEach(([field, fallback]) => {
+        const values = events.map((event) => Number(readField(event, field, fallback)));
+        const column = { name: field };
+        let encoded;
+        if (field === 'timestamp') {
+          encoded = encodeTimestamps(values);
+          if (encoded.deltaBase !== undefined) column.delta_base = encoded.deltaBase;
+        } else {
+          encoded = { array: FloatArray.from(values), dtype: precise ? '<f8' : '<f4' };
+        }
+        column.dtype = encoded.dtype;
+        column.offset = append(encoded.array);
+        columns.push(column);
+      });
+
+      (EVENT_CATEGORIES[name] || []).forEach(([field, fallback]) => {
+        const encoded = encodeCategories(events.map((event) => readField(event, field, fallback)));
+        columns.push({ name: field, dtype: encoded.dtype, offset: append(encoded.array), categories: encoded.categories });
+      });
+    }
+
+    header.streams[name] = { length: events.length, columns };
+  });
+
+  let body = new Uint8Array(size);
+  buffers.forEach(({ offset, bytes }) => body.set(bytes, offset));
+
+  let flags = 0;
+  if (compress && typeof CompressionStream !== 'undefined') {
+    body = await deflate(body);
+    flags |= FLAG_DEFLATE;
+  }
+
+  const headerBytes = new TextEncoder().encode(JSON.stringify(header));
+  const output = new Uint8Array(PREAMBLE_SIZE + headerBytes.length + body.length);
+  const view = new DataView(output.buffer);
+  MAGIC.forEach((byte, i) => view.setUint8(i, byte));
+  view.setUint8(4, WIRE_VERSION);
+  view.setUint8(5, flags);
+  view.setUint16(6, 0, true);
+  view.setUint32(8, headerBytes.length, true);
+  output.set(headerBytes, PREAMBLE_SIZE);
+  output.set(body, PREAMBLE_SIZE + headerBytes.length);
+  return output;
+}